@@ -0,0 +1,100 @@
+import copy
+import logging
+from api.cache import LocalTTLCache
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authtoken.models import Token
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions, authentication
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'auth-token:'
+
+# Attributes populated by permission checks during a request; never cached.
+_REQUEST_LOCAL_ATTRS = ('_perm_cache', '_user_perm_cache', '_group_perm_cache', '_compiled_perm_cache')
+
+_local_cache = LocalTTLCache(
+    max_entries=getattr(settings, 'TOKEN_AUTH_CACHE_MAX_ENTRIES', 10000),
+    ttl=getattr(settings, 'TOKEN_AUTH_CACHE_TTL', 60),
+)
+
+def _shared_cache():
+    alias = getattr(settings, 'TOKEN_AUTH_CACHE_ALIAS', None)
+    return caches[alias] if alias else None
+
+def _detach(user):
+    """Return a copy of `user` without request-scoped permission caches."""
+    user = copy.copy(user)
+    for attr in _REQUEST_LOCAL_ATTRS:
+        user.__dict__.pop(attr, None)
+    return user
+
+def get_cached_user(key):
+    shared = _shared_cache()
+    if shared is not None:
+        try:
+            return shared.get(CACHE_KEY_PREFIX + key)
+        except Exception as e:
+            logger.warning(f"Token cache lookup failed, falling back to the database: {e}")
+            return None
+    user = _local_cache.get(key)
+    return _detach(user) if user is not None else None
+
+def cache_user(key, user):
+    shared = _shared_cache()
+    if shared is not None:
+        try:
+            shared.set(CACHE_KEY_PREFIX + key, _detach(user), settings.TOKEN_AUTH_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to cache token lookup: {e}")
+        return
+    _local_cache.set(key, _detach(user))
+
+def invalidate_token(key):
+    """Drop a token key from the authentication cache."""
+    _local_cache.delete(key)
+    shared = _shared_cache()
+    if shared is not None:
+        try:
+            shared.delete(CACHE_KEY_PREFIX + key)
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached token: {e}", exc_info=True)
+
+def invalidate_user_tokens(user):
+    """Drop every cached token belonging to `user`."""
+    for key in Token.objects.filter(user=user).values_list('key', flat=True):
+        invalidate_token(key)
+
+def rotate_token(user):
+    """
+    Replace the user's token with a fresh one, invalidating the old key first.
+    """
+    invalidate_user_tokens(user)
+    Token.objects.filter(user=user).delete()
+    return Token.objects.create(user=user)
+
+def revoke_token(user):
+    """Delete the user's token and its cache entry."""
+    invalidate_user_tokens(user)
+    Token.objects.filter(user=user).delete()
+
+class CachedTokenAuthentication(authentication.TokenAuthentication):
+    """
+    Drop-in replacement for TokenAuthentication that keeps token -> user lookups
+    in a bounded TTL cache. Entries live in a per-process LRU, or in the Django
+    cache named by TOKEN_AUTH_CACHE_ALIAS when one is configured so that
+    invalidation is visible to every worker.
+    """
+
+    def authenticate_credentials(self, key):
+        user = get_cached_user(key)
+        if user is None:
+            user, token = super().authenticate_credentials(key)
+            cache_user(key, user)
+            return (user, token)
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (user, Token(key=key, user=user))
@@ -0,0 +1,125 @@
+import time
+import logging
+from django.db.models import Q
+from api.cache import LocalTTLCache
+from django.conf import settings
+from django.core.cache import caches
+from django.contrib.auth.models import Permission
+from django.contrib.auth.backends import ModelBackend
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_VERSION_KEY = 'permissions:version'
+USER_VERSION_KEY = 'permissions:user-version:{}'
+
+# Compiled permission sets keyed by (kind, id, global version, user version).
+# Entries for old versions are never read again and age out of the LRU.
+_compiled = LocalTTLCache(
+    max_entries=getattr(settings, 'PERMISSION_CACHE_MAX_ENTRIES', 10000),
+    ttl=getattr(settings, 'PERMISSION_CACHE_TTL', 3600),
+)
+
+def _version_cache():
+    return caches[getattr(settings, 'PERMISSION_CACHE_ALIAS', 'default')]
+
+def _new_version():
+    # Versions seeded after a key was lost must not repeat a value that sets
+    # were compiled under before, so they start from the clock, not from 1.
+    return time.time_ns()
+
+def _bump(key):
+    cache = _version_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Key missing or evicted.
+        cache.set(key, _new_version(), None)
+    except Exception as e:
+        logger.error(f"Failed to bump permission version '{key}': {e}", exc_info=True)
+        _compiled.clear()
+
+def bump_permission_version():
+    """Invalidate every compiled permission set (role or group permissions changed)."""
+    _bump(GLOBAL_VERSION_KEY)
+
+def bump_user_permission_version(user_id):
+    """Invalidate the compiled permission set of a single user."""
+    _bump(USER_VERSION_KEY.format(user_id))
+
+def get_permission_versions(user_id=None):
+    """
+    Return (global_version, user_version), normally with a single cache
+    round-trip. Missing keys are seeded with a fresh version first.
+    """
+    keys = [GLOBAL_VERSION_KEY]
+    if user_id is not None:
+        keys.append(USER_VERSION_KEY.format(user_id))
+    cache = _version_cache()
+    try:
+        values = cache.get_many(keys)
+        for key in keys:
+            if key not in values:
+                version = _new_version()
+                # add() keeps a version another worker seeded first.
+                values[key] = version if cache.add(key, version, None) else cache.get(key, version)
+    except Exception as e:
+        logger.warning(f"Permission version lookup failed: {e}")
+        return None
+    return tuple(values[key] for key in keys)
+
+def compile_user_permissions(user):
+    """
+    Resolve the user's direct, role and group permissions with one query and
+    return them as a frozenset of 'app_label.codename' strings.
+    """
+    permissions = Permission.objects.all()
+    if not user.is_superuser:
+        permissions = permissions.filter(
+            Q(user=user) | Q(role__user=user) | Q(group__user=user)
+        )
+    return frozenset(
+        f"{app_label}.{codename}"
+        for app_label, codename in permissions.values_list('content_type__app_label', 'codename').distinct()
+    )
+
+def get_compiled_permissions(user):
+    """Return the user's compiled permission set, memoised per request and per version."""
+    memo = getattr(user, '_compiled_perm_cache', None)
+    if memo is not None:
+        return memo
+
+    versions = get_permission_versions(user.pk)
+    key = ('user', user.pk, versions)
+    perms = _compiled.get(key) if versions is not None else None
+    if perms is None:
+        perms = compile_user_permissions(user)
+        if versions is not None:
+            _compiled.set(key, perms)
+
+    user._compiled_perm_cache = perms
+    return perms
+
+def get_role_permission_codenames(role):
+    """Return the codenames granted by `role` as a cached frozenset."""
+    versions = get_permission_versions()
+    key = ('role', role.pk, versions)
+    codenames = _compiled.get(key) if versions is not None else None
+    if codenames is None:
+        codenames = frozenset(role.permissions.values_list('codename', flat=True))
+        if versions is not None:
+            _compiled.set(key, codenames)
+    return codenames
+
+class CachedPermissionBackend(ModelBackend):
+    """
+    ModelBackend whose permission checks are set lookups against a compiled,
+    version-keyed permission set instead of per-request permission queries.
+    """
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return get_compiled_permissions(user_obj)
+
+    def has_perm(self, user_obj, perm, obj=None):
+        return user_obj.is_active and perm in self.get_all_permissions(user_obj, obj=obj)
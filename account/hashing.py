@@ -0,0 +1,102 @@
+import os
+import logging
+import threading
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from rest_framework import exceptions, status
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher, check_password, identify_hasher, make_password,
+)
+
+logger = logging.getLogger(__name__)
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from PASSWORD_HASH_ITERATIONS.
+    It keeps the 'pbkdf2_sha256' algorithm name, so existing hashes still
+    verify and are re-encoded at the configured cost on the next login.
+    """
+    iterations = getattr(settings, 'PASSWORD_HASH_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+class HashingBusy(exceptions.APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Too many sign-in attempts are being processed. Please retry shortly.')
+    default_code = 'hashing_busy'
+
+    def __init__(self, detail=None, code=None, wait=1):
+        super().__init__(detail, code)
+        # DRF's exception handler turns this into a Retry-After header.
+        self.wait = wait
+
+class HashingPool:
+    """
+    Bounded thread pool for password hashing. hashlib releases the GIL while
+    hashing, so `workers` threads use up to that many cores. At most
+    `workers + queue_depth` jobs are admitted; beyond that submit() fails
+    immediately with HashingBusy instead of queueing requests behind the CPU.
+    """
+
+    def __init__(self, workers, queue_depth, timeout):
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+
+    def run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Password hashing pool is full; rejecting request.")
+            raise HashingBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            raise HashingBusy()
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_hashing_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    workers=getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1,
+                    queue_depth=getattr(settings, 'PASSWORD_HASH_QUEUE_DEPTH', 32),
+                    timeout=getattr(settings, 'PASSWORD_HASH_TIMEOUT', 10),
+                )
+    return _pool
+
+def _needs_upgrade(encoded):
+    try:
+        return identify_hasher(encoded).must_update(encoded)
+    except ValueError:
+        return False
+
+def authenticate_user(user, password):
+    """
+    Verify `password` for `user` on the hashing pool and return the user, or
+    None when the password is wrong, the account is inactive or `user` is None.
+    Unknown users still pay for one hash so response time does not reveal
+    which accounts exist. On success an outdated hash is re-encoded (also on
+    the pool) and only the password column is written.
+    """
+    pool = get_hashing_pool()
+    if user is None or not user.password:
+        pool.run(make_password, password)
+        return None
+
+    if not pool.run(check_password, password, user.password):
+        return None
+    if not user.is_active:
+        return None
+
+    if _needs_upgrade(user.password):
+        user.password = pool.run(make_password, password)
+        user.save(update_fields=['password'])
+    return user
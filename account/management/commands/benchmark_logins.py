@@ -0,0 +1,49 @@
+import os
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import check_password
+from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
+from account.hashing import TunablePBKDF2PasswordHasher
+
+class Command(BaseCommand):
+    help = (
+        "Measure password verifications per second (and per core) at one or more "
+        "PBKDF2 iteration counts, using the same thread pool model as the login views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, action='append', help='PBKDF2 iteration count to test (repeatable). Defaults to PASSWORD_HASH_ITERATIONS.')
+        parser.add_argument('--workers', type=int, default=None, help='Hashing threads. Defaults to PASSWORD_HASH_WORKERS or the core count.')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run.')
+
+    def handle(self, *args, **options):
+        cores = os.cpu_count() or 1
+        workers = options['workers'] or getattr(settings, 'PASSWORD_HASH_WORKERS', None) or cores
+        counts = options['iterations'] or [TunablePBKDF2PasswordHasher.iterations]
+        self.stdout.write(f"{cores} core(s), {workers} hashing worker(s), {options['seconds']:.0f}s per run")
+
+        for iterations in counts:
+            hasher = TunablePBKDF2PasswordHasher()
+            hasher.iterations = iterations
+            encoded = hasher.encode('Benchmark!7', hasher.salt())
+            rate = self.run(encoded, workers, options['seconds'])
+            self.stdout.write(
+                f"  {iterations:>8} iterations: {rate:8.1f} logins/s  ({rate / min(workers, cores):.1f}/s per core)"
+            )
+
+    def run(self, encoded, workers, seconds):
+        done = 0
+        deadline = time.monotonic() + seconds
+
+        def worker():
+            count = 0
+            while time.monotonic() < deadline:
+                check_password('Benchmark!7', encoded)
+                count += 1
+            return count
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            done = sum(pool.map(lambda _: worker(), range(workers)))
+        return done / (time.monotonic() - started)
@@ -0,0 +1,23 @@
+import time
+from account.models import Role
+from account.utils import propagate_role_permissions
+from django.core.management.base import BaseCommand, CommandError
+
+class Command(BaseCommand):
+    help = "Copy role permissions into the direct permissions of every user holding the role."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', type=int, action='append', dest='roles', help='Role id to propagate (repeatable). Defaults to all roles.')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of users diffed and written per batch.')
+
+    def handle(self, *args, **options):
+        roles = options['roles']
+        if roles:
+            missing = set(roles) - set(Role.objects.filter(pk__in=roles).values_list('pk', flat=True))
+            if missing:
+                raise CommandError(f"Unknown role id(s): {', '.join(map(str, sorted(missing)))}")
+
+        started = time.monotonic()
+        written = propagate_role_permissions(roles=roles, chunk_size=options['chunk_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Granted {written} missing permission(s) ({elapsed:.1f}s)."))
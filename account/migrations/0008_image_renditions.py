@@ -0,0 +1,24 @@
+# Generated by Django 5.0 on 2026-10-19 01:00
+
+import account.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0007_role_permissions_user_username'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Generated renditions per image field, written by the process_images worker'),
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to=account.models.user_image_path),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0 on 2026-10-19 01:02
+
+import account.models
+import api.renditions
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0008_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='image',
+            field=api.renditions.RenditionImageField(blank=True, null=True, upload_to=account.models.user_image_path),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-19 01:04
+
+import account.models
+import api.renditions
+import system.storage
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account', '0009_rendition_image_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='image',
+            field=api.renditions.RenditionImageField(blank=True, null=True, storage=system.storage.content_addressed_storage, upload_to=account.models.user_image_path),
+        ),
+    ]
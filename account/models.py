@@ -2,10 +2,11 @@ import os
 import random
 from django.db import models
 from account.managers import *
+from api.tracking import DirtyFieldsMixin
+from api.renditions import RenditionImageField
+from system.storage import content_addressed_storage
 from django.utils import timezone
 from django.utils.text import slugify
-from imagekit.processors import ResizeToFill
-from imagekit.models import ProcessedImageField
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, Permission
 
 class Role(models.Model):
@@ -15,13 +16,13 @@ class Role(models.Model):
 
     def has_permission(self, permission_codename):
         """Check if the given permission codename exists in the stored permissions."""
-        return self.permissions.filter(codename=permission_codename).exists()
+        from account.backends import get_role_permission_codenames
+        return permission_codename in get_role_permission_codenames(self)
 
     def update_users_with_role_permissions(self):
         """Update all users who have this role with the current permissions."""
-        users_with_role = User.objects.filter(role=self)
-        for user in users_with_role:
-            user.assign_role_permissions()
+        from account.utils import propagate_role_permissions
+        return propagate_role_permissions(roles=[self])
 
     def __str__(self):
         return self.name or "Unnamed Role"
@@ -30,20 +31,15 @@ def user_image_path(instance, filename):
     base_filename, file_extension = os.path.splitext(filename)
     return f'users/user_{slugify(instance.name)}_{instance.phone_number}_{instance.email}{file_extension}'
 
-class User(AbstractBaseUser, PermissionsMixin):
+class User(DirtyFieldsMixin, AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255, null=True, blank=True)
     email = models.EmailField(unique=True, null=True, blank=True)
     username = models.CharField(unique=True, max_length=255, null=True, blank=True)
     phone_number = models.CharField(unique=True, max_length=20, null=True, blank=True)
     role = models.ForeignKey(Role, on_delete=models.CASCADE, null=True, blank=True)
-    image = ProcessedImageField(
-        upload_to=user_image_path,
-        processors=[ResizeToFill(1270, 1270)],
-        format='JPEG',
-        options={'quality': 90},
-        null=True,
-        blank=True
-    )
+    # Stored as uploaded; resized renditions are produced by the process_images worker.
+    image = RenditionImageField(upload_to=user_image_path, storage=content_addressed_storage, null=True, blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True, help_text='Generated renditions per image field, written by the process_images worker')
     password = models.CharField(max_length=255, null=True, blank=True)
     reset_otp = models.CharField(max_length=7, null=True, blank=True)
     otp_created_at = models.DateTimeField(null=True, blank=True)
@@ -65,20 +61,25 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def assign_role_permissions(self):
         """Assign or update permissions based on the user's role."""
-        if self.role:
-            role_permissions = self.role.permissions.all()
+        if self.role_id:
+            from account.utils import propagate_role_permissions
             # Add new permissions without removing existing ones
-            for perm in role_permissions:
-                self.user_permissions.add(perm)
+            propagate_role_permissions(user_ids=[self.pk])
 
     def save(self, *args, **kwargs):
+        is_new = self._state.adding
+        role_changed = is_new or self.has_changed('role')
+
         # If username is not set or name has changed, regenerate the username
-        if not self.username or self.name and self.pk:
+        if not self.username or (not is_new and self.has_changed('name')):
             self.username = self.generate_username()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'username'}
 
         # Save the user object first, then assign permissions
         super(User, self).save(*args, **kwargs)
-        self.assign_role_permissions()
+        if role_changed:
+            self.assign_role_permissions()
 
     def __str__(self):
         return f"{self.name}"
\ No newline at end of file
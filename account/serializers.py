@@ -3,6 +3,7 @@ from account.models import *
 from django.db.models import Q
 from datetime import timedelta
 from rest_framework import serializers
+from api.fields import ImageRenditionsField, RenditionURLField
 from django.contrib.auth.models import Permission
 
 class LoginSerializer(serializers.Serializer):
@@ -61,12 +62,14 @@ class UserSerializer(serializers.ModelSerializer):
     role_name = serializers.CharField(source='role.name', read_only=True)
     user_permissions = serializers.SerializerMethodField()
     role_permissions = serializers.SerializerMethodField()
-    image = serializers.ImageField(required=False)
+    image = RenditionURLField(required=False, detail_rendition='medium')
+    image_renditions = ImageRenditionsField('image')
 
     class Meta:
         model = User
         fields = (
-            'id', 'name', 'email', 'phone_number', 'role', 'role_name', 'image', 'password', 'user_permissions', 'role_permissions'
+            'id', 'name', 'email', 'phone_number', 'role', 'role_name', 'image', 'image_renditions', 'password',
+            'user_permissions', 'role_permissions'
         )
         extra_kwargs = {
             'password': {'write_only': True}
@@ -87,35 +90,25 @@ class UserSerializer(serializers.ModelSerializer):
         user = User(**validated_data)
         if password:
             user.set_password(password)
+        # User.save assigns the role permissions for new users
         user.save()
-        user.assign_role_permissions()
 
         return user
 
     def update(self, instance, validated_data):
         """
         Update user details and hash the password if provided.
+        Only the changed columns are written; role permissions are
+        reassigned by User.save when the role changed.
         """
-        old_role = instance.role
         password = validated_data.pop('password', None)
-        instance = super().update(instance, validated_data)
 
-        # Handle image upload separately if provided
-        if 'image' in validated_data:
-            instance.image = validated_data.pop('image')
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
 
         # If a password is provided, hash it using set_password
         if password:
             instance.set_password(password)
-            instance.save()
 
-        # If the role has changed, update permissions
-        if old_role != instance.role:
-            instance.assign_role_permissions()
-
-        # Update the remaining fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-
-        instance.save()
+        instance.save_dirty()
         return instance
\ No newline at end of file
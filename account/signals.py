@@ -0,0 +1,60 @@
+from django.dispatch import receiver
+from account.models import Role, User
+from django.contrib.auth.models import Group
+from rest_framework.authtoken.models import Token
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from account.utils import schedule_role_propagation
+from account.authentication import invalidate_token, invalidate_user_tokens
+from account.backends import bump_permission_version, bump_user_permission_version
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """Tokens deleted outside login/logout (admin, cascades) must stop authenticating."""
+    invalidate_token(instance.key)
+
+# Fields that feed into the compiled permission set.
+PERMISSION_FIELDS = ('role', 'is_active', 'is_superuser')
+
+@receiver(post_save, sender=User)
+def invalidate_saved_user_tokens(sender, instance, created, raw=False, **kwargs):
+    """Cached users would otherwise keep stale fields such as is_active or role."""
+    if not created and not raw and instance.has_changed():
+        invalidate_user_tokens(instance)
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def bump_on_role_permissions_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_permission_version()
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def propagate_added_role_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    """Newly granted role permissions are copied to the role's users after commit."""
+    if action != 'post_add' or not pk_set:
+        return
+    for role_id in (pk_set if reverse else [instance.pk]):
+        schedule_role_propagation(role_id)
+
+@receiver(post_delete, sender=Role)
+@receiver(post_delete, sender=Group)
+def bump_on_role_delete(sender, instance, **kwargs):
+    bump_permission_version()
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+def bump_on_user_permissions_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        bump_user_permission_version(instance.pk)
+    elif pk_set:
+        # Changed from the Permission/Group side: every listed user is affected.
+        for user_id in pk_set:
+            bump_user_permission_version(user_id)
+    else:
+        bump_permission_version()
+
+@receiver(post_save, sender=User)
+def bump_on_user_save(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw and instance.has_changed(*PERMISSION_FIELDS):
+        bump_user_permission_version(instance.pk)
@@ -0,0 +1,173 @@
+import logging
+from collections import defaultdict
+from django.conf import settings
+from django.db import connection, transaction
+from account.models import Role, User
+from django.contrib.auth.models import Permission
+from concurrent.futures import ThreadPoolExecutor
+from account.backends import bump_permission_version, bump_user_permission_version
+
+logger = logging.getLogger(__name__)
+
+UserPermission = User.user_permissions.through
+RolePermission = Role.permissions.through
+
+# Propagation for large roles runs here, one role at a time, off the request path.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='role-permissions')
+
+def iter_role_user_chunks(roles=None, user_ids=None, chunk_size=1000):
+    """
+    Yield {user_id: role_id} dicts for users holding a role, walking the
+    user table by primary key.
+    """
+    users = User.objects.filter(role__isnull=False)
+    if roles is not None:
+        users = users.filter(role__in=roles)
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+
+    last_id = 0
+    while True:
+        rows = list(users.filter(pk__gt=last_id).order_by('pk').values_list('pk', 'role_id')[:chunk_size])
+        if not rows:
+            return
+        yield dict(rows)
+        last_id = rows[-1][0]
+
+def missing_role_permission_pairs(user_roles):
+    """
+    Return the (user_id, permission_id) pairs granted by each user's role but
+    not yet present in their direct permissions. `user_roles` maps user ids to
+    role ids. Uses two queries regardless of how many users or permissions.
+    """
+    role_permissions = defaultdict(set)
+    for role_id, permission_id in RolePermission.objects.filter(
+        role_id__in=set(user_roles.values())
+    ).values_list('role_id', 'permission_id'):
+        role_permissions[role_id].add(permission_id)
+
+    wanted = {
+        (user_id, permission_id)
+        for user_id, role_id in user_roles.items()
+        for permission_id in role_permissions[role_id]
+    }
+    if not wanted:
+        return set()
+
+    existing = set(
+        UserPermission.objects.filter(user_id__in=list(user_roles)).values_list('user_id', 'permission_id')
+    )
+    return wanted - existing
+
+def propagate_role_permissions(roles=None, user_ids=None, chunk_size=1000):
+    """
+    Copy role permissions into users' direct permissions without removing
+    existing ones. Each chunk of users costs three queries: the user page, the
+    diff, and one bulk INSERT on the through table. Returns the number of
+    permission rows written.
+    """
+    written = 0
+    touched = set()
+    for user_roles in iter_role_user_chunks(roles, user_ids, chunk_size):
+        missing = missing_role_permission_pairs(user_roles)
+        if not missing:
+            continue
+        UserPermission.objects.bulk_create(
+            [UserPermission(user_id=user_id, permission_id=permission_id) for user_id, permission_id in missing],
+            batch_size=chunk_size,
+            ignore_conflicts=True,
+        )
+        written += len(missing)
+        touched.update(user_id for user_id, _ in missing)
+
+    # bulk_create bypasses m2m_changed, so invalidate compiled permissions here.
+    bump_users_permission_version(touched)
+    return written
+
+def bump_users_permission_version(user_ids):
+    """
+    Invalidate compiled permissions after a bulk write that skipped m2m_changed.
+    The bump waits for commit so other workers cannot recompile stale rows.
+    """
+    user_ids = set(user_ids)
+    if len(user_ids) == 1:
+        transaction.on_commit(lambda user_id=user_ids.pop(): bump_user_permission_version(user_id))
+    elif user_ids:
+        transaction.on_commit(bump_permission_version)
+
+def resolve_permission_codenames(codenames):
+    """
+    Resolve codenames given as 'codename' or 'app_label.codename' with one query.
+    Returns ({codename: permission_id}, {codename: error}); bare codenames
+    that exist in several apps are reported as ambiguous.
+    """
+    bare = {codename.split('.', 1)[-1] for codename in codenames}
+    matches = defaultdict(list)
+    for permission_id, app_label, codename in Permission.objects.filter(codename__in=bare).values_list(
+        'id', 'content_type__app_label', 'codename'
+    ):
+        matches[codename].append((app_label, permission_id))
+
+    resolved, errors = {}, {}
+    for requested in codenames:
+        app_label, _, codename = requested.rpartition('.')
+        candidates = [pid for label, pid in matches.get(codename, []) if not app_label or label == app_label]
+        if len(candidates) == 1:
+            resolved[requested] = candidates[0]
+        elif candidates:
+            errors[requested] = 'Ambiguous codename; use "app_label.codename".'
+        else:
+            errors[requested] = 'Permission not found.'
+    return resolved, errors
+
+def grant_user_permissions(user_ids, permission_ids):
+    """
+    Give every user every permission, inserting only the missing through-table
+    rows in one bulk INSERT. Returns the number of rows written.
+    """
+    existing = set(
+        UserPermission.objects.filter(user_id__in=user_ids, permission_id__in=permission_ids)
+        .values_list('user_id', 'permission_id')
+    )
+    missing = {(u, p) for u in user_ids for p in permission_ids} - existing
+    UserPermission.objects.bulk_create(
+        [UserPermission(user_id=user_id, permission_id=permission_id) for user_id, permission_id in missing],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+    bump_users_permission_version(user_id for user_id, _ in missing)
+    return len(missing)
+
+def revoke_user_permissions(user_ids, permission_ids):
+    """Remove the permissions from every user with one DELETE. Returns the rows removed."""
+    rows = UserPermission.objects.filter(user_id__in=user_ids, permission_id__in=permission_ids)
+    affected = set(rows.values_list('user_id', flat=True).distinct())
+    removed, _ = rows.delete()
+    bump_users_permission_version(affected)
+    return removed
+
+def _propagate_in_background(role_id):
+    try:
+        written = propagate_role_permissions(roles=[role_id])
+        logger.info(f"Propagated {written} permission(s) to users of role {role_id}.")
+    except Exception as e:
+        logger.error(f"Failed to propagate permissions for role {role_id}: {e}", exc_info=True)
+    finally:
+        connection.close()
+
+def schedule_role_propagation(role):
+    """
+    Propagate `role` permissions to its users once the current transaction
+    commits. Roles with more than ROLE_PROPAGATION_SYNC_LIMIT users are handed
+    to a background worker instead of blocking the request.
+    """
+    role_id = role.pk if isinstance(role, Role) else role
+    limit = getattr(settings, 'ROLE_PROPAGATION_SYNC_LIMIT', 500)
+
+    def run():
+        if User.objects.filter(role_id=role_id)[:limit + 1].count() > limit:
+            _executor.submit(_propagate_in_background, role_id)
+        else:
+            propagate_role_permissions(roles=[role_id])
+
+    transaction.on_commit(run)
@@ -1,16 +1,20 @@
 from account.serializers import *
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.contrib.auth import authenticate
 from rest_framework.authtoken.models import Token
 from rest_framework.generics import GenericAPIView
 from rest_framework.exceptions import PermissionDenied
 from rest_framework import generics, permissions, status
+from account.hashing import authenticate_user
+from account.authentication import rotate_token, revoke_token
+from api.throttling import ScopedIPThrottle, ScopedIdentifierThrottle
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
 class LoginView(GenericAPIView):  # Change to GenericAPIView
     permission_classes = [permissions.AllowAny]
     serializer_class = LoginSerializer  # Ensure serializer is set
+    throttle_classes = [ScopedIPThrottle, ScopedIdentifierThrottle]
+    throttle_scope = 'login'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)  # Use get_serializer method
@@ -19,12 +23,12 @@ class LoginView(GenericAPIView):  # Change to GenericAPIView
         email = serializer.validated_data['email']
         password = serializer.validated_data['password']
 
-        user = authenticate(username=email, password=password)
+        # Hash verification runs on the bounded hashing pool
+        user = authenticate_user(User.objects.filter(email=email).first(), password)
 
         if user:
-            # Delete old token and generate a new one
-            Token.objects.filter(user=user).delete()
-            token, created = Token.objects.get_or_create(user=user)
+            # Delete old token (and its cache entry) and generate a new one
+            token = rotate_token(user)
 
             return Response({
                 'token': token.key,
@@ -62,8 +66,7 @@ class LogoutView(APIView):
 
     def post(self, request, *args, **kwargs):
         try:
-            if hasattr(request.user, 'auth_token'):
-                request.user.auth_token.delete()
+            revoke_token(request.user)
             return Response({
                 "message": "Logout successful."
             }, status=status.HTTP_200_OK)
@@ -0,0 +1,51 @@
+from rest_framework import serializers
+from api.renditions import rendition_url, rendition_urls
+
+class RenditionURLField(serializers.ImageField):
+    """
+    ImageField that accepts uploads as usual but represents the image as the
+    URL of the rendition suited to the context instead of the original upload:
+    `list_rendition` when serialized inside a list (many=True), otherwise
+    `detail_rendition`. A serializer context key 'image_rendition' overrides
+    both, e.g. for an admin or export view.
+    """
+
+    def __init__(self, list_rendition='thumbnail', detail_rendition='full', extension='jpeg', **kwargs):
+        self.list_rendition = list_rendition
+        self.detail_rendition = detail_rendition
+        self.extension = extension
+        super().__init__(**kwargs)
+
+    def _in_list(self):
+        field = self
+        while field.parent is not None:
+            if isinstance(field.parent, serializers.ListSerializer):
+                return True
+            field = field.parent
+        return False
+
+    def get_rendition(self):
+        if self.context.get('image_rendition'):
+            return self.context['image_rendition']
+        return self.list_rendition if self._in_list() else self.detail_rendition
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        return rendition_url(value, self.get_rendition(), self.extension, self.context.get('request'))
+
+class ImageRenditionsField(serializers.Field):
+    """
+    Read-only URLs of every rendition of `image_field`, keyed by rendition name
+    ({'thumbnail': {'width', 'height', 'webp', 'jpeg'}, ...}), plus a
+    'srcset' string per format for responsive clients. None when there is no image.
+    """
+
+    def __init__(self, image_field='image', **kwargs):
+        self.image_field = image_field
+        kwargs['source'] = '*'
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return rendition_urls(instance, self.image_field, self.context.get('request'))
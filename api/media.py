@@ -0,0 +1,156 @@
+import os
+import re
+import stat
+import mimetypes
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.http import FileResponse, Http404, HttpResponse
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+_DIGEST = re.compile(r'^[0-9a-f]{64}$')
+
+# Content-addressed blobs (system/storage.py) and their renditions never change
+# under the same name, so caches may keep them for good.
+IMMUTABLE_PREFIXES = ('cas/', 'renditions/cas/')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+class _FileRange:
+    """
+    Read-only view of `length` bytes of an open file starting at its current
+    position. It exposes fileno() so a WSGI server's file_wrapper (gunicorn)
+    can sendfile() the range straight from the page cache; otherwise read()
+    stops at the end of the range. No tell()/seek(), so FileResponse leaves
+    Content-Length to the caller.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+def is_immutable(name):
+    return name.startswith(IMMUTABLE_PREFIXES)
+
+def cache_control(name):
+    if is_immutable(name):
+        return IMMUTABLE_CACHE_CONTROL
+    return f"public, max-age={getattr(settings, 'MEDIA_CACHE_SECONDS', 3600)}"
+
+def file_etag(name, st):
+    """
+    Strong ETag: the SHA-256 digest for content-addressed blobs, otherwise
+    derived from inode, size and nanosecond mtime, which change on any rewrite.
+    """
+    stem = os.path.splitext(os.path.basename(name))[0]
+    if name.startswith('cas/') and _DIGEST.match(stem):
+        return f'"{stem}"'
+    return f'"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+def parse_range(header, size):
+    """
+    (start, end) inclusive for a single-range `Range` header, None to serve the
+    whole file (absent, malformed or multi-range), or False if unsatisfiable.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last or int(last) == 0:
+            return False
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+def _offload(response, name, path):
+    offload = getattr(settings, 'MEDIA_OFFLOAD', None)
+    if offload == 'x-accel-redirect':
+        prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        response['X-Accel-Redirect'] = f"{prefix.rstrip('/')}/{name}"
+    elif offload == 'x-sendfile':
+        response['X-Sendfile'] = path
+    else:
+        return False
+    return True
+
+def serve_file(request, name):
+    """
+    Serve the media file `name` (relative to MEDIA_ROOT) for GET/HEAD.
+
+    Conditional requests are answered with 304/412 before the file is opened.
+    With MEDIA_OFFLOAD set, the body is left to the proxy (nginx
+    X-Accel-Redirect or Apache/lighttpd X-Sendfile), which handles ranges
+    itself. Otherwise a single byte range is honoured with 206, and the body is
+    a FileResponse the WSGI server can sendfile().
+    """
+    try:
+        path = safe_join(settings.MEDIA_ROOT, name)
+        st = os.stat(path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404('File not found.')
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404('File not found.')
+
+    etag = file_etag(name, st)
+    last_modified = int(st.st_mtime)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': cache_control(name),
+        'Accept-Ranges': 'bytes',
+    }
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+        return not_modified
+
+    content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    response = HttpResponse(content_type=content_type)
+    if _offload(response, name, path):
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    size = st.st_size
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        byte_range = None
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    status = 206 if byte_range else 200
+    if request.method == 'HEAD':
+        response = HttpResponse(status=status, content_type=content_type)
+    else:
+        file = open(path, 'rb')
+        file.seek(start)
+        response = FileResponse(_FileRange(file, end - start + 1), status=status, content_type=content_type)
+    response['Content-Length'] = end - start + 1
+    if byte_range:
+        headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+    for header, value in headers.items():
+        response[header] = value
+    return response
@@ -0,0 +1,172 @@
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """
+    Messages for one channel, consumed from a single event loop. The queue is
+    bounded. When a slow client falls behind, the oldest message is dropped, or
+    with drop_oldest=False the subscription is marked `overflowed` so the
+    consumer can disconnect the client and let it resync on reconnect.
+    """
+
+    def __init__(self, broker, channel, loop, max_queue, drop_oldest=True):
+        self.broker = broker
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(max_queue)
+        self.drop_oldest = drop_oldest
+        self.overflowed = False
+
+    def put(self, message):
+        """Queue `message`. Must be called from the subscriber's loop."""
+        if self.queue.full():
+            if not self.drop_oldest:
+                self.overflowed = True
+                return
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    def deliver(self, message):
+        """Hand `message` to the subscriber's loop. Safe from any thread."""
+        try:
+            self.loop.call_soon_threadsafe(self.put, message)
+        except RuntimeError:
+            # The loop is closed; the subscription is about to be removed.
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+class _Shard:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+class LocalBroker:
+    """
+    In-process pub/sub: publish() fans a message out to the subscriptions on
+    its channel. Only reaches subscribers in the same process, so it serves as
+    the stand-in for tests and single-process deployments.
+
+    Channels are spread over `shards`, each with its own lock, so connects,
+    disconnects and deliveries from event threads for different channels
+    rarely contend even with many thousands of open connections.
+    """
+
+    def __init__(self, max_queue=None, shards=None):
+        self.max_queue = max_queue or getattr(settings, 'EVENT_STREAM_QUEUE_SIZE', 100)
+        self._shards = [_Shard() for _ in range(shards or getattr(settings, 'EVENT_STREAM_SHARDS', 16))]
+
+    def _shard(self, channel):
+        return self._shards[hash(channel) % len(self._shards)]
+
+    def subscribe(self, channel, max_queue=None, drop_oldest=True):
+        """Subscribe the running event loop to `channel`."""
+        subscription = Subscription(
+            self, channel, asyncio.get_running_loop(), max_queue or self.max_queue, drop_oldest,
+        )
+        shard = self._shard(channel)
+        with shard.lock:
+            shard.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        shard = self._shard(subscription.channel)
+        with shard.lock:
+            subscriptions = shard.subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del shard.subscriptions[subscription.channel]
+
+    def subscriber_count(self):
+        count = 0
+        for shard in self._shards:
+            with shard.lock:
+                count += sum(len(subscriptions) for subscriptions in shard.subscriptions.values())
+        return count
+
+    def deliver(self, channel, message):
+        shard = self._shard(channel)
+        with shard.lock:
+            subscriptions = list(shard.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+class RedisBroker(LocalBroker):
+    """
+    Cross-worker pub/sub over Redis PUBLISH/PSUBSCRIBE. Messages are JSON. Each
+    process runs one listener thread that relays every message under `prefix`
+    to its local subscriptions, so publishers and open streams or sockets can
+    live in different workers.
+    """
+
+    def __init__(self, url, prefix='events:', max_queue=None, shards=None):
+        import redis
+
+        super().__init__(max_queue, shards)
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url)
+        self._listener = None
+        self._listener_lock = threading.Lock()
+
+    def subscribe(self, channel, max_queue=None, drop_oldest=True):
+        self._start_listener()
+        return super().subscribe(channel, max_queue, drop_oldest)
+
+    def publish(self, channel, message):
+        self.client.publish(f"{self.prefix}{channel}", json.dumps(message))
+
+    def _start_listener(self):
+        if self._listener is None:
+            with self._listener_lock:
+                if self._listener is None:
+                    self._listener = threading.Thread(target=self._listen, name='event-stream-listener', daemon=True)
+                    self._listener.start()
+
+    def _listen(self):
+        backoff = 1
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(f"{self.prefix}*")
+                backoff = 1
+                for item in pubsub.listen():
+                    channel = item['channel'].decode()[len(self.prefix):]
+                    self.deliver(channel, json.loads(item['data']))
+            except Exception as e:
+                logger.error(f"Event stream listener lost Redis ({e}); reconnecting in {backoff}s.")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+def build_broker(backend=None):
+    """Create a broker for EVENT_STREAM_BACKEND ('local' or 'redis')."""
+    backend = backend or getattr(settings, 'EVENT_STREAM_BACKEND', 'local')
+    if backend == 'redis':
+        return RedisBroker(settings.REDIS_URL)
+    return LocalBroker()
+
+_broker = None
+_broker_lock = threading.Lock()
+
+def get_broker():
+    """Per-process broker shared by publishers and streams, created on first use."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = build_broker()
+    return _broker
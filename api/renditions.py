@@ -0,0 +1,208 @@
+import io
+import os
+import threading
+import logging
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db.models.fields.files import ImageField, ImageFieldFile
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# name -> (max width, max height, crop to fill). Sizes are never upscaled.
+DEFAULT_RENDITIONS = {
+    'thumbnail': (160, 160, True),
+    'medium': (640, 640, False),
+    'full': (1270, 1270, False),
+}
+
+DEFAULT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+def get_renditions():
+    return getattr(settings, 'IMAGE_RENDITIONS', DEFAULT_RENDITIONS)
+
+def get_formats():
+    return getattr(settings, 'IMAGE_RENDITION_FORMATS', DEFAULT_FORMATS)
+
+def rendition_name(source, rendition, extension):
+    """Storage name of one rendition: renditions/<source dir>/<source stem>/<rendition>.<ext>."""
+    stem, _ = os.path.splitext(source)
+    return f"renditions/{stem}/{rendition}.{extension}"
+
+def _resize(image, width, height, crop):
+    if crop:
+        width, height = min(width, image.width), min(height, image.height)
+        return ImageOps.fit(image, (width, height), Image.LANCZOS)
+    resized = image.copy()
+    resized.thumbnail((width, height), Image.LANCZOS)
+    return resized
+
+def _save(name, data):
+    # Re-rendering the same source overwrites its files instead of adding
+    # suffixed copies. Objects sharing a content-addressed source render the
+    # same names, possibly at once, so local files are swapped in atomically.
+    try:
+        path = default_storage.path(name)
+    except NotImplementedError:
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        return default_storage.save(name, ContentFile(data))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, 'wb') as f:
+        f.write(data)
+    os.replace(temporary, path)
+    return name
+
+def _open_source(source):
+    with default_storage.open(source, 'rb') as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        return image.convert('RGB')
+
+def _encode(image, extension):
+    pil_format, options = get_formats()[extension]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+def render_renditions(source):
+    """
+    Decode the stored upload `source` once and write every configured
+    rendition in every configured format. Returns
+    {'source': source, <rendition>: {'width', 'height', <format>: storage name}}.
+
+    Only Pillow and the storage backend are used, so this runs in worker
+    processes without touching the database.
+    """
+    image = _open_source(source)
+    result = {'source': source}
+    for rendition, (width, height, crop) in get_renditions().items():
+        resized = _resize(image, width, height, crop)
+        entry = {'width': resized.width, 'height': resized.height}
+        for extension in get_formats():
+            entry[extension] = _save(rendition_name(source, rendition, extension), _encode(resized, extension))
+        result[rendition] = entry
+    return result
+
+def render_rendition(source, rendition, extension):
+    """Write a single rendition of `source` and return its storage name."""
+    width, height, crop = get_renditions()[rendition]
+    resized = _resize(_open_source(source), width, height, crop)
+    return _save(rendition_name(source, rendition, extension), _encode(resized, extension))
+
+def find_source(stem):
+    """Storage name of the upload whose name without extension is `stem`, or None."""
+    directory, base = os.path.split(stem)
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return None
+    for name in files:
+        if os.path.splitext(name)[0] == base:
+            return os.path.join(directory, name)
+    return None
+
+def delete_renditions(renditions):
+    """Remove the files listed in a render_renditions() result."""
+    for rendition, entry in renditions.items():
+        if not isinstance(entry, dict):
+            continue
+        for extension in get_formats():
+            if entry.get(extension):
+                try:
+                    default_storage.delete(entry[extension])
+                except Exception as e:
+                    logger.warning(f"Failed to delete rendition {entry[extension]}: {e}")
+
+def init_worker():
+    """ProcessPoolExecutor initializer; needed when workers are spawned rather than forked."""
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+        django.setup()
+
+def recorded_renditions(file):
+    """Renditions the worker recorded for the current upload in `file`, or {}."""
+    renditions = (getattr(file.instance, 'image_renditions', None) or {}).get(file.field.name) or {}
+    return renditions if renditions.get('source') == file.name else {}
+
+def rendition_entries(file):
+    """
+    Every configured rendition of `file` as {name: {'width', 'height', <format>: storage name}}.
+    Renditions not rendered yet are generated on first request by
+    rendition_view, so their names are always usable; until then the width and
+    height are the configured maximums.
+    """
+    recorded = recorded_renditions(file)
+    entries = {}
+    for rendition, (width, height, _) in get_renditions().items():
+        entry = recorded.get(rendition) or {'width': width, 'height': height}
+        entries[rendition] = {
+            'width': entry['width'],
+            'height': entry['height'],
+            **{extension: rendition_name(file.name, rendition, extension) for extension in get_formats()},
+        }
+    return entries
+
+def _absolute(url, request):
+    return request.build_absolute_uri(url) if request is not None else url
+
+def rendition_url(file, rendition, extension='jpeg', request=None):
+    """URL of one rendition of `file`, or None when the field is empty."""
+    if not file:
+        return None
+    return _absolute(file.storage.url(rendition_name(file.name, rendition, extension)), request)
+
+def srcset(file, extension='jpeg', request=None):
+    """
+    `srcset` attribute value listing the renditions of `file` with their width
+    descriptors. Cropped renditions are left out since their aspect ratio differs.
+    """
+    if not file:
+        return None
+    crop = {rendition for rendition, (_, _, cropped) in get_renditions().items() if cropped}
+    entries = sorted(
+        (entry for rendition, entry in rendition_entries(file).items() if rendition not in crop),
+        key=lambda entry: entry['width'],
+    )
+    return ', '.join(f"{_absolute(file.storage.url(entry[extension]), request)} {entry['width']}w" for entry in entries)
+
+def rendition_urls(instance, field, request=None):
+    """
+    URLs of every rendition of `instance.<field>` plus a `srcset` per format,
+    or None when the field is empty.
+    """
+    file = getattr(instance, field)
+    if not file:
+        return None
+    result = {
+        rendition: {
+            'width': entry['width'],
+            'height': entry['height'],
+            **{extension: _absolute(file.storage.url(entry[extension]), request) for extension in get_formats()},
+        }
+        for rendition, entry in rendition_entries(file).items()
+    }
+    result['srcset'] = {extension: srcset(file, extension, request) for extension in get_formats()}
+    return result
+
+class RenditionFieldFile(ImageFieldFile):
+    def rendition_url(self, rendition, extension='jpeg'):
+        return rendition_url(self, rendition, extension)
+
+    def srcset(self, extension='jpeg'):
+        return srcset(self, extension)
+
+class RenditionImageField(ImageField):
+    """
+    ImageField that stores the upload as-is and whose files expose
+    rendition_url(name, extension) and srcset(extension). Renditions are
+    produced by the process_images worker, or on first request.
+    """
+    attr_class = RenditionFieldFile
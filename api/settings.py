@@ -106,9 +106,79 @@ else:
 }
 
 
+# Cache
+# Set REDIS_URL to share caches (token lookups, etc.) between workers.
+# 'shared' holds state every worker must agree on (permission versions, rider
+# profiles):
+# Redis when configured, else a database table (created by web migration 0011).
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+            # Keep culling rare; evicted permission versions are reseeded.
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        },
+    }
+
+
+# Authentication backends
+# Permission checks are answered from compiled, version-keyed permission sets.
+
+AUTHENTICATION_BACKENDS = [
+    'account.backends.CachedPermissionBackend',
+]
+
+# Cache alias holding the permission version counters. It must be shared by
+# every worker for permission changes to reach all of them immediately.
+# Without REDIS_URL 'shared' is the database cache, so the first permission
+# check of each request costs one extra query.
+PERMISSION_CACHE_ALIAS = 'shared'
+
+# Roles with more users than this propagate new permissions on a background
+# worker after commit instead of inside the request.
+ROLE_PROPAGATION_SYNC_LIMIT = 500
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
+# Password hashing
+# PBKDF2 cost is tunable; stored hashes are re-encoded at this cost on login.
+# Login hash checks run on a bounded pool of PASSWORD_HASH_WORKERS threads
+# (default: one per core) and are rejected with 503 once
+# PASSWORD_HASH_QUEUE_DEPTH more jobs are waiting.
+
+# The tunable hasher is the only 'pbkdf2_sha256' entry: identify_hasher() picks
+# the last hasher with a matching algorithm name, so listing Django's stock
+# PBKDF2PasswordHasher as well would flag every fresh hash for upgrade.
+PASSWORD_HASHERS = [
+    'account.hashing.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+PASSWORD_HASH_ITERATIONS = int(os.getenv('PASSWORD_HASH_ITERATIONS', 720000))
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0)) or None
+PASSWORD_HASH_QUEUE_DEPTH = int(os.getenv('PASSWORD_HASH_QUEUE_DEPTH', 32))
+PASSWORD_HASH_TIMEOUT = 10
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -148,6 +218,14 @@ STATICFILES_DIRS = (
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+# Media is served by api.media.serve_file() with ETags, ranges and cache headers.
+# Behind nginx set MEDIA_OFFLOAD = 'x-accel-redirect' and map an internal
+# location at MEDIA_ACCEL_REDIRECT_PREFIX to MEDIA_ROOT; behind Apache or
+# lighttpd use 'x-sendfile'. Content-addressed files are cached for a year,
+# everything else for MEDIA_CACHE_SECONDS.
+MEDIA_OFFLOAD = os.getenv('MEDIA_OFFLOAD') or None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+MEDIA_CACHE_SECONDS = 3600
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 WHITENOISE_AUTOREFRESH = True
 
@@ -163,13 +241,43 @@ APPEND_SLASH = False
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'account.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Sliding-window limits for public endpoints (see api/throttling.py).
+    # '<scope>' is keyed by client IP, '<scope>_identifier' by email/phone
+    # (or rider code for 'rider_session').
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '20/min',
+        'login_identifier': '5/min',
+        'password_reset': '10/hour',
+        'password_reset_identifier': '3/hour',
+        'password_reset_confirm': '20/hour',
+        'password_reset_confirm_identifier': '5/hour',
+        'rider_code_search': '60/min',
+        'rider_session': '20/min',
+        'rider_session_identifier': '5/min',
+        'contact': '5/hour',
+        'contact_identifier': '3/hour',
+    },
+    # Client IPs come from REMOTE_ADDR unless the app sits behind this many
+    # trusted reverse proxies (set NUM_PROXIES=1 behind nginx); X-Forwarded-For
+    # is never trusted beyond them, so it cannot be used to dodge the limits.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
 }
 
+# Throttle counters live in this cache alias so limits hold across workers;
+# without it each process counts on its own.
+THROTTLE_CACHE_ALIAS = 'default' if REDIS_URL else None
+
+# Token authentication cache. Without a shared alias each worker keeps its own
+# LRU, so a token revoked in one worker stays valid elsewhere for up to the TTL.
+TOKEN_AUTH_CACHE_ALIAS = 'default' if REDIS_URL else None
+TOKEN_AUTH_CACHE_TTL = int(os.getenv('TOKEN_AUTH_CACHE_TTL', 60))
+TOKEN_AUTH_CACHE_MAX_ENTRIES = 10000
+
 CSRF_TRUSTED_ORIGINS = [
     'http://localhost:5173'
     'https://www.api.pelekaap.com',
@@ -195,16 +303,115 @@ CORS_ALLOW_HEADERS = [
     'content-type'
 ]
 
+# Threads attaching images during bulk rider imports (default: one per core).
+RIDER_IMPORT_IMAGE_WORKERS = None
+
+# Uploaded images are stored as-is and rendered by the process_images worker
+# into these sizes, (max width, max height, crop to fill), each as WebP and JPEG.
+IMAGE_RENDITIONS = {
+    'thumbnail': (160, 160, True),
+    'medium': (640, 640, False),
+    'full': (1270, 1270, False),
+}
+IMAGE_WORKERS = None  # worker processes (default: one per core)
+IMAGE_JOB_MAX_ATTEMPTS = 3
+IMAGE_JOB_LEASE_SECONDS = 300
+
+# Image fields are checked while the multipart body streams in (api/uploads.py):
+# format from the first bytes, pixel count from the header, size per chunk.
+# field name -> (max bytes, max pixels). Other uploads use Django's handlers.
+FILE_UPLOAD_HANDLERS = [
+    'api.uploads.ImageUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+IMAGE_UPLOAD_LIMITS = {
+    'image': (10 * 1024 * 1024, 40_000_000),
+    'permit_image': (10 * 1024 * 1024, 40_000_000),
+}
+IMAGE_UPLOAD_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+
+# Uploaded images are stored once per distinct content under media/cas/
+# (system/storage.py). collect_media removes unreferenced blobs untouched for
+# this long.
+MEDIA_BLOB_GRACE_SECONDS = 86400
+
+# Compact rider profiles served at rider login, invalidated on Rider save.
+# The alias is shared so an invalidation in one worker reaches all of them.
+RIDER_PROFILE_CACHE_ALIAS = 'shared'
+RIDER_PROFILE_CACHE_TTL = 300
+
+# Password reset OTPs are stored as HMAC digests keyed by OTP_SECRET_KEY (a
+# dedicated secret, since SECRET_KEY above is public), one row per user and
+# purpose with a locked attempt counter (web/otp.py).
+OTP_SECRET_KEY = os.getenv('OTP_SECRET_KEY')
+OTP_TTL_SECONDS = 600
+OTP_MAX_ATTEMPTS = 5
+
 # Twilio Credentials
 TWILIO_ACCOUNT_SID = os.getenv('TWILIO_ACCOUNT_SID')
 TWILIO_AUTH_TOKEN = os.getenv('TWILIO_AUTH_TOKEN')
 TWILIO_PHONE_NUMBER = os.getenv('TWILIO_PHONE_NUMBER')
 
+# SMS delivery: 'twilio', 'http' (JSON POST to SMS_HTTP_URL, e.g. the
+# fake_message_sinks command) or 'console'.
+SMS_BACKEND = os.getenv('SMS_BACKEND', 'twilio')
+SMS_HTTP_URL = os.getenv('SMS_HTTP_URL', 'http://127.0.0.1:8098/')
+# Concurrent requests per process; also the size of the keep-alive pool.
+SMS_CONCURRENCY = int(os.getenv('SMS_CONCURRENCY', 8))
+
+# Push notifications: 'console' or 'http' (JSON POST of {to: user id, body}
+# to a push gateway at PUSH_HTTP_URL).
+PUSH_BACKEND = os.getenv('PUSH_BACKEND', 'console')
+PUSH_HTTP_URL = os.getenv('PUSH_HTTP_URL', 'http://127.0.0.1:8099/')
+
+# Domain events (system/events.py) are handled after commit on this many
+# background threads per process.
+EVENT_WORKERS = 2
+
+# Status-change notifications: channels to use, and how long a new message
+# waits for later updates to the same delivery before it is sent.
+NOTIFICATION_CHANNELS = ['sms', 'email', 'push']
+NOTIFICATION_COALESCE_SECONDS = 10
+
+# Live status stream (GET /api/web/events/, Server-Sent Events). Serve it from
+# api.asgi under an ASGI server so idle connections cost a coroutine, not a
+# worker. 'redis' relays events
+# between processes; 'local' only reaches streams in the publishing process.
+EVENT_STREAM_BACKEND = 'redis' if REDIS_URL else 'local'
+EVENT_STREAM_HEARTBEAT_SECONDS = 15
+EVENT_STREAM_RETRY_MS = 3000
+EVENT_STREAM_QUEUE_SIZE = 100
+# Channels are spread over this many independently locked shards per process.
+EVENT_STREAM_SHARDS = 16
+
+# Rider socket (ws /ws/riders/, system/sockets.py). Offers expire after
+# RIDER_OFFER_TTL_SECONDS. Heartbeats are written to Rider.last_seen_at in
+# batches every RIDER_HEARTBEAT_FLUSH_SECONDS; riders seen within
+# RIDER_ONLINE_SECONDS count as online. Silent sockets are closed after RIDER_SOCKET_IDLE_SECONDS, and
+# clients that fall RIDER_SOCKET_QUEUE_SIZE messages behind are disconnected.
+RIDER_OFFER_TTL_SECONDS = 60
+RIDER_HEARTBEAT_FLUSH_SECONDS = 5
+RIDER_ONLINE_SECONDS = 90
+RIDER_SOCKET_IDLE_SECONDS = 60
+RIDER_SOCKET_QUEUE_SIZE = 32
+
+# Outbox worker (process_outbox): retry with exponential backoff, then dead-letter.
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_BACKOFF_BASE = 30
+OUTBOX_BACKOFF_MAX = 3600
+OUTBOX_LEASE_SECONDS = 300
+
+# Flutterwave
+FLUTTERWAVE_SECRET_HASH = os.getenv('FLUTTERWAVE_SECRET_HASH')
+FLUTTERWAVE_SECRET_KEY = os.getenv('FLUTTERWAVE_SECRET_KEY')
+FLUTTERWAVE_API_URL = os.getenv('FLUTTERWAVE_API_URL', 'https://api.flutterwave.com/v3')
+
 # Email Backend Configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+EMAIL_BACKEND = os.getenv('EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT', 587))
-EMAIL_USE_TLS = True
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'True') == 'True'
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 # DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'Your App <no-reply@yourapp.com>')
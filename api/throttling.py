@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.throttling import SimpleRateThrottle
+
+logger = logging.getLogger(__name__)
+
+class LocalWindowStore:
+    """
+    In-process window counters. Used when no shared cache is configured and as
+    the fallback when the shared store is unreachable. Keys are kept in
+    least-recently-hit order, so at `max_entries` the stalest one is evicted
+    in constant time.
+    """
+
+    def __init__(self, max_entries=50000):
+        self.max_entries = max_entries
+        self._counts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, current_key, previous_key, ttl):
+        now = time.monotonic()
+        with self._lock:
+            count, expires = self._counts.get(current_key, (0, now + ttl))
+            if expires <= now:
+                count, expires = 0, now + ttl
+            self._counts[current_key] = (count + 1, expires)
+            self._counts.move_to_end(current_key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+            previous, previous_expires = self._counts.get(previous_key, (0, 0))
+            return count + 1, previous if previous_expires > now else 0
+
+class CacheWindowStore:
+    """Window counters kept in any Django cache backend."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def hit(self, current_key, previous_key, ttl):
+        if self.cache.add(current_key, 1, ttl):
+            current = 1
+        else:
+            try:
+                current = self.cache.incr(current_key)
+            except ValueError:
+                # Expired between add() and incr().
+                self.cache.set(current_key, 1, ttl)
+                current = 1
+        return current, self.cache.get(previous_key) or 0
+
+class RedisWindowStore:
+    """
+    Window counters in Redis: INCR, EXPIRE and GET in one pipelined round-trip,
+    on a client of its own for the cache's server.
+    """
+
+    def __init__(self, url):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+
+    def hit(self, current_key, previous_key, ttl):
+        pipe = self.client.pipeline(transaction=False)
+        pipe.incr(current_key)
+        pipe.expire(current_key, int(ttl))
+        pipe.get(previous_key)
+        current, _, previous = pipe.execute()
+        return current, int(previous or 0)
+
+_local_store = LocalWindowStore()
+_stores = {}
+
+def get_window_store():
+    """Return the store for THROTTLE_CACHE_ALIAS, or the in-process store when unset."""
+    alias = getattr(settings, 'THROTTLE_CACHE_ALIAS', None)
+    if not alias:
+        return _local_store
+    store = _stores.get(alias)
+    if store is None:
+        cache = caches[alias]
+        if isinstance(cache, RedisCache):
+            location = settings.CACHES[alias]['LOCATION']
+            # Writes go to the first server, as with RedisCache itself.
+            store = RedisWindowStore(location.split(',')[0] if isinstance(location, str) else location[0])
+        else:
+            store = CacheWindowStore(cache)
+        _stores[alias] = store
+    return store
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Sliding-window counter throttle driven by the view's `throttle_scope`.
+
+    Each key keeps a counter per fixed window; the request rate is estimated
+    as the current window plus the previous window weighted by how much of it
+    still overlaps the sliding window. Rates come from DEFAULT_THROTTLE_RATES
+    under '<throttle_scope><scope_suffix>'; scopes without a rate are not limited.
+    Requests are counted per client IP unless get_ident_key() says otherwise.
+    """
+    scope_suffix = ''
+    cache_format = 'throttle:{scope}:{ident}:{window}'
+
+    def __init__(self):
+        # The rate depends on the view, so it is resolved in allow_request().
+        pass
+
+    def get_ident_key(self, request, view):
+        """The key requests are counted under, or None to skip throttling."""
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return True
+        self.scope = scope + self.scope_suffix
+        self.rate = self.THROTTLE_RATES.get(self.scope)
+        if self.rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        ident = self.get_ident_key(request, view)
+        if ident is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        self.elapsed = now - window * self.duration
+        current_key = self.cache_format.format(scope=self.scope, ident=ident, window=window)
+        previous_key = self.cache_format.format(scope=self.scope, ident=ident, window=window - 1)
+        try:
+            current, previous = get_window_store().hit(current_key, previous_key, self.duration * 2)
+        except Exception as e:
+            logger.warning(f"Throttle store unavailable, using in-process counters: {e}")
+            current, previous = _local_store.hit(current_key, previous_key, self.duration * 2)
+
+        weight = 1 - self.elapsed / self.duration
+        return (current - 1) + previous * weight < self.num_requests
+
+    def wait(self):
+        return self.duration - self.elapsed
+
+class ScopedIPThrottle(SlidingWindowThrottle):
+    """
+    Limits requests per client IP for the view's throttle scope. The IP comes
+    from REMOTE_ADDR, or from X-Forwarded-For behind NUM_PROXIES trusted proxies.
+    """
+
+class ScopedIdentifierThrottle(SlidingWindowThrottle):
+    """
+    Limits requests per submitted account identifier (email or phone number),
+    regardless of which IP they come from. Uses the '<scope>_identifier' rate.
+    """
+    scope_suffix = '_identifier'
+    identifier_fields = ('email_or_phone', 'email', 'phone_number')
+
+    def get_ident_key(self, request, view):
+        data = request.data if hasattr(request.data, 'get') else {}
+        for field in getattr(view, 'throttle_identifier_fields', self.identifier_fields):
+            value = data.get(field)
+            if isinstance(value, str) and value.strip():
+                # Hashed so cache keys hold neither PII nor arbitrary characters.
+                return hashlib.sha256(value.strip().lower().encode()).hexdigest()[:32]
+        return None
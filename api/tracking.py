@@ -0,0 +1,90 @@
+import copy
+from django.db.models import DEFERRED
+from django.db.models.fields.files import FieldFile
+
+def _snapshot(value):
+    # Files compare by name; mutable JSON values must not alias the live attribute.
+    if isinstance(value, FieldFile):
+        return value.name
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+class DirtyFieldsMixin:
+    """
+    Model mixin that remembers the concrete field values an instance was loaded
+    with, so save hooks can tell which fields actually changed and callers can
+    write only those columns with `save_dirty()`.
+
+    Instances that were not loaded from the database (new objects, or objects
+    built by hand) report every field as dirty.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {
+            attname: _snapshot(value) for attname, value in zip(field_names, values) if value is not DEFERRED
+        }
+        return instance
+
+    def _tracked_fields(self):
+        return [field for field in self._meta.concrete_fields if not field.primary_key]
+
+    def get_dirty_fields(self):
+        """Return {field name: loaded value} for every field that differs from the database."""
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or self._state.adding:
+            return {field.name: None for field in self._tracked_fields()}
+
+        dirty = {}
+        for field in self._tracked_fields():
+            if field.attname in loaded and getattr(self, field.attname) != loaded[field.attname]:
+                dirty[field.name] = loaded[field.attname]
+        return dirty
+
+    def has_changed(self, *field_names):
+        """True when any of `field_names` (or any field, if none given) changed."""
+        dirty = self.get_dirty_fields()
+        if not field_names:
+            return bool(dirty)
+        return any(name in dirty for name in field_names)
+
+    def save_dirty(self, **kwargs):
+        """
+        Save only the changed fields. New instances are saved in full.
+        Returns False when there was nothing to write.
+        """
+        if self._state.adding or getattr(self, '_loaded_values', None) is None:
+            self.save(**kwargs)
+            return True
+
+        update_fields = set(self.get_dirty_fields())
+        if not update_fields:
+            return False
+        # auto_now columns are set in pre_save and must be written with the rest.
+        update_fields.update(
+            field.name for field in self._tracked_fields() if getattr(field, 'auto_now', False)
+        )
+        self.save(update_fields=update_fields, **kwargs)
+        return True
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        deferred = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: _snapshot(getattr(self, field.attname))
+            for field in self._tracked_fields() if field.attname not in deferred
+        }
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None or update_fields is None:
+            loaded = self._loaded_values = {}
+            fields = self._tracked_fields()
+        else:
+            fields = [self._meta.get_field(name) for name in update_fields]
+        for field in fields:
+            loaded[field.attname] = _snapshot(getattr(self, field.attname))
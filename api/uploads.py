@@ -0,0 +1,129 @@
+import io
+from django.conf import settings
+from PIL import Image, UnidentifiedImageError
+from django.http.multipartparser import MultiPartParserError
+from django.core.files.uploadhandler import StopFutureHandlers, TemporaryFileUploadHandler
+
+# field name -> (max bytes, max pixels)
+DEFAULT_IMAGE_UPLOAD_LIMITS = {
+    'image': (10 * 1024 * 1024, 40_000_000),
+    'permit_image': (10 * 1024 * 1024, 40_000_000),
+}
+
+DEFAULT_IMAGE_UPLOAD_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+
+# File extension stored for each accepted format.
+IMAGE_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+
+# Leading bytes of each accepted format. WEBP also needs b'WEBP' at offset 8.
+_SIGNATURES = {
+    'JPEG': b'\xff\xd8\xff',
+    'PNG': b'\x89PNG\r\n\x1a\n',
+    'GIF': b'GIF8',
+    'WEBP': b'RIFF',
+}
+
+# Dimensions are normally in the first few KB; JPEGs with a large EXIF block
+# can push them further out. Past this, give up rather than buffer more.
+MAX_HEADER_BYTES = 512 * 1024
+
+class UploadRejected(MultiPartParserError):
+    """
+    An upload broke an image limit. Raised while the body is still being read,
+    so the rest is never spooled. Django and DRF answer a MultiPartParserError
+    with 400.
+    """
+
+def get_image_upload_limits():
+    return getattr(settings, 'IMAGE_UPLOAD_LIMITS', DEFAULT_IMAGE_UPLOAD_LIMITS)
+
+def get_image_upload_formats():
+    return getattr(settings, 'IMAGE_UPLOAD_FORMATS', DEFAULT_IMAGE_UPLOAD_FORMATS)
+
+def sniff_format(header):
+    """The accepted format `header` starts with, or None."""
+    for format, signature in _SIGNATURES.items():
+        if header.startswith(signature) and format in get_image_upload_formats():
+            if format == 'WEBP' and header[8:12] != b'WEBP':
+                continue
+            return format
+    return None
+
+def read_dimensions(header, format):
+    """
+    (width, height) from the image header, or None if more bytes are needed.
+    Raises Image.DecompressionBombError for images past Pillow's own limit.
+    """
+    try:
+        with Image.open(io.BytesIO(header), formats=[format]) as image:
+            return image.size
+    except (UnidentifiedImageError, OSError, SyntaxError, ValueError):
+        return None
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """
+    Streams image fields listed in IMAGE_UPLOAD_LIMITS to a temporary file,
+    checking them as chunks arrive: the format from the first bytes, the pixel
+    count as soon as the header is complete, and the size on every chunk.
+    Pillow only reads the header here, and the file is never held in memory.
+
+    Any other field (CSV and archive imports) is passed on to the next handler
+    in FILE_UPLOAD_HANDLERS.
+    """
+
+    def new_file(self, field_name, *args, **kwargs):
+        self.limits = get_image_upload_limits().get(field_name)
+        if self.limits is None:
+            return
+        super().new_file(field_name, *args, **kwargs)
+        self.received = 0
+        self.header = b''
+        self.format = None
+        self.checked = False
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.limits is None:
+            return raw_data
+        max_bytes, max_pixels = self.limits
+        self.received += len(raw_data)
+        if self.received > max_bytes:
+            self._reject(f"is larger than {max_bytes // (1024 * 1024)} MB")
+        if not self.checked:
+            self._check_header(raw_data, max_pixels)
+        self.file.write(raw_data)
+
+    def _check_header(self, raw_data, max_pixels):
+        self.header += raw_data
+        if self.format is None:
+            if len(self.header) < 12:
+                return
+            self.format = sniff_format(self.header)
+            if self.format is None:
+                formats = ', '.join(get_image_upload_formats())
+                self._reject(f"is not a supported image. Upload one of: {formats}")
+        try:
+            dimensions = read_dimensions(self.header, self.format)
+        except Image.DecompressionBombError:
+            self._reject(f"is too large; images may have at most {max_pixels // 1_000_000} megapixels")
+        if dimensions is None:
+            if len(self.header) > MAX_HEADER_BYTES:
+                self._reject("has an unreadable image header")
+            return
+        width, height = dimensions
+        if width * height > max_pixels:
+            self._reject(f"is {width}x{height}; images may have at most {max_pixels // 1_000_000} megapixels")
+        self.checked = True
+        self.header = b''
+
+    def file_complete(self, file_size):
+        if self.limits is None:
+            return None
+        if not self.checked:
+            # Shorter than its own header: a truncated or non-image file.
+            self._reject("is not a complete image")
+        return super().file_complete(file_size)
+
+    def _reject(self, reason):
+        self.file.close()
+        raise UploadRejected(f"'{self.file_name}' {reason}.")
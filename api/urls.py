@@ -2,6 +2,7 @@ from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
+from api.views import rendition_view, serve_media
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -9,4 +10,7 @@ urlpatterns = [
     path('api/web/', include('web.urls')),
     path('api/auth/', include('account.urls')),
     path('api/transactions/', include('transactions.urls')),
-] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    # Before the media pattern: renders missing renditions on first request.
+    path(f"{settings.MEDIA_URL.lstrip('/')}renditions/<path:path>", rendition_view, name='imageRendition'),
+    path(f"{settings.MEDIA_URL.lstrip('/')}<path:path>", serve_media, name='media'),
+] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
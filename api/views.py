@@ -0,0 +1,54 @@
+import os
+import logging
+import threading
+from django.http import Http404
+from api.media import serve_file
+from django.core.files.storage import default_storage
+from django.views.decorators.http import require_safe
+from api.renditions import find_source, get_formats, get_renditions, render_rendition
+
+logger = logging.getLogger(__name__)
+
+_render_locks = {}
+_render_locks_guard = threading.Lock()
+
+def _render_lock(name):
+    with _render_locks_guard:
+        return _render_locks.setdefault(name, threading.Lock())
+
+@require_safe
+def rendition_view(request, path):
+    """
+    Serve media/renditions/<source stem>/<rendition>.<ext>, rendering it from
+    the original upload on first request and keeping it in storage, so later
+    requests (and a proxy serving MEDIA_ROOT) find the file on disk.
+    """
+    stem, filename = os.path.split(path)
+    rendition, _, extension = filename.partition('.')
+    if (
+        not stem or '..' in path.split('/') or os.path.isabs(path)
+        or rendition not in get_renditions() or extension not in get_formats()
+    ):
+        raise Http404('Unknown rendition.')
+
+    name = f"renditions/{path}"
+    if not default_storage.exists(name):
+        with _render_lock(name):
+            if not default_storage.exists(name):
+                source = find_source(stem)
+                if source is None:
+                    raise Http404('Image not found.')
+                try:
+                    render_rendition(source, rendition, extension)
+                except Exception as e:
+                    logger.error(f"Failed to render {name} from {source}: {e}", exc_info=True)
+                    raise Http404('Image could not be rendered.')
+        with _render_locks_guard:
+            _render_locks.pop(name, None)
+
+    return serve_file(request, name)
+
+@require_safe
+def serve_media(request, path):
+    """Serve an uploaded file under MEDIA_ROOT. See api.media.serve_file()."""
+    return serve_file(request, path)
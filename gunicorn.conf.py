@@ -0,0 +1,33 @@
+"""
+Gunicorn settings, read automatically when `gunicorn` is started from the
+project root. Workers run the ASGI application (api/asgi.py) under uvicorn, so
+Server-Sent Events (/api/web/events/) and rider sockets (/ws/riders/) are
+served as suspended coroutines and plain views run as usual.
+
+With the 'local' event stream backend (no REDIS_URL), events only reach
+streams and sockets open in the process that published them, so more than one
+worker requires EVENT_STREAM_BACKEND = 'redis'; startup fails otherwise. Set
+WEB_CONCURRENCY=1 to run a single worker without Redis.
+"""
+
+import os
+
+wsgi_app = 'api.asgi:application'
+worker_class = 'uvicorn.workers.UvicornWorker'
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', (os.cpu_count() or 1) * 2 + 1))
+# Streams and sockets stay open; only restart workers that stop responding.
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+
+def on_starting(server):
+    if server.cfg.workers <= 1:
+        return
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api.settings')
+    from django.conf import settings
+
+    if getattr(settings, 'EVENT_STREAM_BACKEND', 'local') != 'redis':
+        raise RuntimeError(
+            f"{server.cfg.workers} workers need EVENT_STREAM_BACKEND = 'redis' (set REDIS_URL) so events "
+            "reach streams and sockets in every worker; set WEB_CONCURRENCY=1 to run without Redis."
+        )
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from system.models import Rider, DistancePricing, DeliveryRequest, RiderDelivery
+from system.models import Rider, DistancePricing, DeliveryRequest, RiderDelivery, ImageJob, MediaBlob, JobOffer
 from django.utils.html import format_html
 
 class ReadOnlyAdmin(admin.ModelAdmin):
@@ -23,16 +23,21 @@ class RiderAdmin(admin.ModelAdmin):
     list_filter = ('created_at', 'updated_at')
     ordering = ('-created_at',)
 
-    def image_tag(self, obj):
-        if obj.image:
-            return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;"/>', obj.image.url)
+    def thumbnail_tag(self, image):
+        # The thumbnail rendition (rendered on first request if needed), never the original upload.
+        if image:
+            return format_html(
+                '<img src="{}" width="50" height="50" loading="lazy" style="object-fit: cover;"/>',
+                image.rendition_url('thumbnail'),
+            )
         return "-"
+
+    def image_tag(self, obj):
+        return self.thumbnail_tag(obj.image)
     image_tag.short_description = 'Image'
 
     def permit_image_tag(self, obj):
-        if obj.permit_image:
-            return format_html('<img src="{}" width="50" height="50" style="object-fit: cover;"/>', obj.permit_image.url)
-        return "-"
+        return self.thumbnail_tag(obj.permit_image)
     permit_image_tag.short_description = 'Permit Image'
 
 
@@ -51,3 +56,24 @@ class RiderDeliveryAdmin(admin.ModelAdmin):
     list_filter = ('delivered', 'assigned_at', 'in_progress_at', 'delivered_at')
     search_fields = ('rider__name', 'delivery_request__id')
     ordering = ('-assigned_at',)
+
+
+@admin.register(ImageJob)
+class ImageJobAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'content_type', 'object_id', 'field', 'source', 'status', 'attempts', 'next_attempt_at', 'finished_at')
+    search_fields = ('source',)
+    list_filter = ('status', 'content_type')
+    ordering = ('-id',)
+
+@admin.register(MediaBlob)
+class MediaBlobAdmin(ReadOnlyAdmin):
+    list_display = ('name', 'size', 'refcount', 'created_at', 'updated_at')
+    search_fields = ('name',)
+    ordering = ('-updated_at',)
+
+@admin.register(JobOffer)
+class JobOfferAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'rider', 'delivery_request', 'book_rider', 'status', 'created_at', 'expires_at', 'responded_at')
+    list_filter = ('status',)
+    search_fields = ('rider__name', 'rider__code')
+    ordering = ('-id',)
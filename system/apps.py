@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SystemConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'system'
+
+    def ready(self):
+        from system import signals  # noqa: F401
+        from system import notifications  # noqa: F401
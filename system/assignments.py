@@ -0,0 +1,133 @@
+import logging
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.utils import timezone
+from transactions.models import Transaction, TransactionHistory
+from system.events import BookingStatusChanged, DeliveryStatusChanged, publish
+from system.models import BookRiderAssignment, RiderDelivery
+
+logger = logging.getLogger(__name__)
+
+class RiderUnavailable(Exception):
+    """The rider already has an active, undelivered assignment."""
+
+    def __init__(self, message="This rider is not available at the moment."):
+        super().__init__(message)
+        self.message = message
+
+def _to_price(value, label):
+    try:
+        return Decimal(str(value)) if value else Decimal('0.00')
+    except (InvalidOperation, TypeError) as conv_err:
+        logger.error(f"Error converting {label} '{value}' to Decimal: {conv_err}")
+        return Decimal('0.00')
+
+def dispatch_earnings(rider, price, **history):
+    """
+    Split `price` between the rider (90%) and their commissioner (3%) and boss
+    (7%), or the boss alone (10%) when there is no commissioner. The shares are
+    added to the matching Transaction wallet and recorded as a
+    TransactionHistory row carrying `history` (delivery_request or book_rider).
+    """
+    rider_share = (price * Decimal('0.90')).quantize(Decimal('0.01'))
+    commissioner_user = rider.commissioner
+    boss_user = rider.boss
+
+    if commissioner_user:
+        commission_share = (price * Decimal('0.03')).quantize(Decimal('0.01'))
+        boss_share = (price * Decimal('0.07')).quantize(Decimal('0.01'))
+    else:
+        commission_share = Decimal('0.00')
+        boss_share = (price * Decimal('0.10')).quantize(Decimal('0.01'))
+
+    logger.debug(f"Calculated shares: rider_share={rider_share}, commission_share={commission_share}, boss_share={boss_share}")
+
+    transaction_obj, created = Transaction.objects.get_or_create(
+        rider=rider.user,
+        commissioner=commissioner_user,
+        boss=boss_user,
+        defaults={
+            'rider_total': Decimal('0.00'),
+            'commissioner_total': Decimal('0.00'),
+            'boss_total': Decimal('0.00')
+        }
+    )
+    transaction_obj.rider_total += rider_share
+    if commissioner_user:
+        transaction_obj.commissioner_total += commission_share
+    transaction_obj.boss_total += boss_share
+    transaction_obj.save()
+    logger.debug(f"Transaction record updated: {transaction_obj}")
+
+    TransactionHistory.objects.create(
+        transaction=transaction_obj,
+        rider_amount=rider_share,
+        commissioner_amount=commission_share,
+        boss_amount=boss_share,
+        **history
+    )
+    logger.debug("TransactionHistory record created successfully.")
+
+def assign_delivery(rider, delivery_request):
+    """
+    Assign `rider` to `delivery_request`: create the RiderDelivery, mark the
+    request 'Accepted', publish the status change and dispatch the delivery
+    price split. Raises RiderUnavailable if the rider has an undelivered job.
+    Used by AddRiderDeliveryView and by riders accepting a job offer.
+    """
+    with transaction.atomic():
+        if RiderDelivery.objects.filter(rider=rider, delivered=False).exists():
+            raise RiderUnavailable()
+
+        now = timezone.now()
+        rider_delivery = RiderDelivery.objects.create(
+            rider=rider,
+            delivery_request=delivery_request,
+            delivered=False,
+            assigned_at=now,
+            last_assigned_at=now
+        )
+
+        previous_status = delivery_request.status
+        delivery_request.status = 'Accepted'
+        delivery_request.save()
+        publish(DeliveryStatusChanged(
+            delivery_request_id=delivery_request.pk, status='Accepted',
+            previous_status=previous_status, rider_id=rider.pk,
+        ))
+
+        price = _to_price(delivery_request.delivery_price, 'delivery_price')
+        logger.debug(f"Delivery price converted to Decimal: {price}")
+        dispatch_earnings(rider, price, delivery_request=delivery_request)
+    return rider_delivery
+
+def assign_booking(rider, book_rider):
+    """
+    Assign `rider` to `book_rider`: create the BookRiderAssignment, mark the
+    booking 'Accepted', publish the status change and dispatch the booking
+    price split. Raises RiderUnavailable if the rider has an undelivered job.
+    Used by AddBookRiderAssignmentView and by riders accepting a job offer.
+    """
+    with transaction.atomic():
+        if BookRiderAssignment.objects.filter(rider=rider, delivered=False).exists():
+            raise RiderUnavailable()
+
+        rider_booking = BookRiderAssignment.objects.create(
+            rider=rider,
+            book_rider=book_rider,
+            delivered=False,
+            assigned_at=timezone.now(),
+        )
+
+        previous_status = book_rider.status
+        book_rider.status = 'Accepted'
+        book_rider.save()
+        publish(BookingStatusChanged(
+            book_rider_id=book_rider.pk, status='Accepted',
+            previous_status=previous_status, rider_id=rider.pk,
+        ))
+
+        price = _to_price(book_rider.booking_price, 'booking_price')
+        logger.debug(f"Booking price converted to Decimal: {price}")
+        dispatch_earnings(rider, price, book_rider=book_rider)
+    return rider_booking
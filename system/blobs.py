@@ -0,0 +1,125 @@
+import os
+import logging
+from datetime import timedelta
+from collections import Counter
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+from django.db import IntegrityError, transaction
+from django.db.models.fields.files import FileField
+from system.storage import CAS_PREFIX, content_addressed_storage, is_content_addressed
+from system.models import MediaBlob
+
+logger = logging.getLogger(__name__)
+
+def blob_fields(model):
+    """File fields of `model` that use the content-addressed storage."""
+    storage = content_addressed_storage()
+    return [
+        field for field in model._meta.concrete_fields
+        if isinstance(field, FileField) and field.storage is storage
+    ]
+
+def retain(names):
+    """Add one reference per occurrence of each content-addressed name."""
+    for name, count in Counter(filter(is_content_addressed, names)).items():
+        if MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + count):
+            continue
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(name=name, size=content_addressed_storage().size(name), refcount=count)
+        except IntegrityError:
+            MediaBlob.objects.filter(name=name).update(refcount=F('refcount') + count)
+
+def release(names):
+    """Drop one reference per occurrence. Files are only removed later, by collect_garbage()."""
+    for name, count in Counter(filter(is_content_addressed, names)).items():
+        MediaBlob.objects.filter(name=name).update(refcount=F('refcount') - count)
+
+def track_saved_blobs(instance, created, update_fields=None):
+    """
+    Adjust reference counts after `instance` was saved, using dirty tracking
+    to find the file fields whose value changed.
+    """
+    fields = blob_fields(type(instance))
+    if update_fields is not None:
+        fields = [field for field in fields if field.name in update_fields]
+    if not fields:
+        return
+
+    dirty = {} if created else instance.get_dirty_fields()
+    added, removed = [], []
+    for field in fields:
+        if created:
+            added.append(getattr(instance, field.attname).name)
+        elif field.name in dirty:
+            added.append(getattr(instance, field.attname).name)
+            removed.append(dirty[field.name])
+    retain(name for name in added if name)
+    release(name for name in removed if name)
+
+def release_deleted_blobs(instance):
+    release(
+        getattr(instance, field.attname).name
+        for field in blob_fields(type(instance)) if getattr(instance, field.attname)
+    )
+
+def _delete_blob_files(storage, name):
+    storage.delete(name)
+    # Renditions live under renditions/<name without extension>/ (api/renditions.py).
+    rendition_dir = f"renditions/{os.path.splitext(name)[0]}"
+    try:
+        _, files = storage.listdir(rendition_dir)
+    except FileNotFoundError:
+        return
+    for filename in files:
+        storage.delete(f"{rendition_dir}/{filename}")
+    try:
+        os.rmdir(storage.path(rendition_dir))
+    except OSError:
+        pass
+
+def _older_than(storage, name, cutoff):
+    try:
+        return storage.get_modified_time(name) < cutoff
+    except FileNotFoundError:
+        return True
+
+def collect_garbage(grace_seconds=None, dry_run=False):
+    """
+    Delete blobs nobody references any more, plus stray files in cas/ with no
+    MediaBlob row (uploads whose transaction rolled back) and abandoned
+    temporary files. Only files untouched for `grace_seconds` are removed, since
+    the storage refreshes a blob's mtime whenever an upload is deduplicated
+    onto it. Returns (files removed, bytes freed).
+    """
+    grace = grace_seconds if grace_seconds is not None else getattr(settings, 'MEDIA_BLOB_GRACE_SECONDS', 86400)
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    storage = content_addressed_storage()
+    removed = freed = 0
+
+    for blob_id in MediaBlob.objects.filter(refcount__lte=0, updated_at__lt=cutoff).values_list('id', flat=True):
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(id=blob_id, refcount__lte=0).first()
+            if blob is None or not _older_than(storage, blob.name, cutoff):
+                continue
+            removed += 1
+            freed += blob.size
+            if not dry_run:
+                blob.delete()
+                _delete_blob_files(storage, blob.name)
+
+    known = set(MediaBlob.objects.values_list('name', flat=True))
+    root = storage.path(CAS_PREFIX)
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            name = os.path.relpath(os.path.join(directory, filename), storage.location).replace(os.sep, '/')
+            if name in known or not _older_than(storage, name, cutoff):
+                continue
+            removed += 1
+            freed += storage.size(name)
+            if not dry_run:
+                _delete_blob_files(storage, name)
+
+    logger.info(f"Media collection: {removed} file(s), {freed} byte(s){' (dry run)' if dry_run else ''}.")
+    return removed, freed
@@ -0,0 +1,57 @@
+import logging
+import secrets
+from django.db import IntegrityError, transaction
+from system.models import Rider
+
+logger = logging.getLogger(__name__)
+
+CODE_SPACE = 10 ** 8  # 8-digit numeric suffix
+MAX_ATTEMPTS = 5
+
+def format_rider_code(name, number):
+    """Code = first two name initials + 8-digit number."""
+    initials = ''.join([part[0].upper() for part in (name or '').split() if part])[:2]
+    return f"{initials}{number:08d}"
+
+def _random_codes(names):
+    # Codes are used to sign in, so they are drawn from a CSPRNG and cannot be
+    # derived from one another or from any configuration value.
+    return [format_rider_code(name, secrets.randbelow(CODE_SPACE)) for name in names]
+
+def allocate_rider_codes(names):
+    """
+    Draw one random code per name. Codes already taken, or drawn twice in the
+    batch, are redrawn after one lookup per round; an insert can still race
+    another writer, which callers handle with create_with_rider_code().
+    """
+    names = list(names)
+    codes = _random_codes(names)
+    for _ in range(MAX_ATTEMPTS):
+        seen = set()
+        clashes = set(Rider.objects.filter(code__in=codes).values_list('code', flat=True))
+        redraw = []
+        for index, code in enumerate(codes):
+            if code in clashes or code in seen:
+                redraw.append(index)
+            seen.add(code)
+        if not redraw:
+            break
+        for index, code in zip(redraw, _random_codes([names[index] for index in redraw])):
+            codes[index] = code
+    return codes
+
+def create_with_rider_code(name, create):
+    """
+    Call `create(code)` inside a savepoint with a freshly drawn code. If the
+    insert fails because the code is taken, another code is tried instead.
+    Any other integrity error is raised.
+    """
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        code = format_rider_code(name, secrets.randbelow(CODE_SPACE))
+        try:
+            with transaction.atomic():
+                return create(code)
+        except IntegrityError as e:
+            if attempt == MAX_ATTEMPTS or not Rider.objects.filter(code=code).exists():
+                raise
+            logger.warning(f"Rider code {code} rejected ({e}); drawing another.")
@@ -0,0 +1,85 @@
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from django.conf import settings
+from django.db import connection, transaction
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True, kw_only=True)
+class Event:
+    """Base class for domain events. Subscribers to Event receive every event."""
+
+@dataclass(frozen=True, kw_only=True)
+class StatusChanged(Event):
+    status: str
+    previous_status: str = None
+    rider_id: int = None
+
+@dataclass(frozen=True, kw_only=True)
+class DeliveryStatusChanged(StatusChanged):
+    delivery_request_id: int
+
+@dataclass(frozen=True, kw_only=True)
+class BookingStatusChanged(StatusChanged):
+    book_rider_id: int
+
+_subscribers = defaultdict(list)
+_durable_subscribers = defaultdict(list)
+_executor = None
+_executor_lock = threading.Lock()
+
+def subscribe(event_type, durable=False):
+    """
+    Decorator registering a handler for `event_type` and its subclasses.
+    Durable handlers run inside the publishing transaction, so what they write
+    (outbox messages for notifications) commits or rolls back with the change
+    and survives a crash. Others are best-effort fan-out after commit.
+    """
+    def register(handler):
+        (_durable_subscribers if durable else _subscribers)[event_type].append(handler)
+        return handler
+    return register
+
+def _handlers(registry, event):
+    for event_type in type(event).__mro__:
+        yield from registry.get(event_type, ())
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'EVENT_WORKERS', 2), thread_name_prefix='domain-events',
+                )
+    return _executor
+
+def dispatch(event):
+    """Run every handler subscribed to the event's type or a base type. A failing handler does not stop the others."""
+    try:
+        for handler in _handlers(_subscribers, event):
+            try:
+                handler(event)
+            except Exception as e:
+                logger.error(f"Event handler {handler.__qualname__} failed for {event}: {e}", exc_info=True)
+    finally:
+        connection.close()
+
+def publish(event):
+    """
+    Emit `event`; call it inside the transaction making the change. Durable
+    handlers run right away, each in a savepoint so a failing one neither
+    stops the others nor the change. The rest run on background threads once
+    the transaction commits (immediately outside one), so they add no latency
+    to the request and never see a rolled-back change.
+    """
+    for handler in _handlers(_durable_subscribers, event):
+        try:
+            with transaction.atomic():
+                handler(event)
+        except Exception as e:
+            logger.error(f"Durable event handler {handler.__qualname__} failed for {event}: {e}", exc_info=True)
+    transaction.on_commit(lambda: _get_executor().submit(dispatch, event))
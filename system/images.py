@@ -0,0 +1,146 @@
+import logging
+import multiprocessing
+from datetime import timedelta
+from django.apps import apps
+from django.conf import settings
+from django.utils import timezone
+from django.db import connections, transaction
+from django.contrib.contenttypes.models import ContentType
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from api.renditions import delete_renditions, init_worker, render_renditions
+from system.storage import is_content_addressed
+from system.profiles import invalidate_rider_profile
+from system.models import ImageJob
+
+logger = logging.getLogger(__name__)
+
+# Image fields that get renditions, per model.
+IMAGE_FIELDS = {
+    'account.User': ('image',),
+    'system.Rider': ('image', 'permit_image'),
+    'system.DeliveryRequest': ('image',),
+}
+
+def image_fields(model):
+    return IMAGE_FIELDS.get(model._meta.label, ())
+
+def enqueue_image_job(instance, field):
+    """Queue rendition work for the current upload in `instance.<field>`."""
+    return ImageJob.objects.create(
+        content_type=ContentType.objects.get_for_model(instance),
+        object_id=instance.pk,
+        field=field,
+        source=getattr(instance, field).name,
+    )
+
+def enqueue_changed_images(instance, created):
+    """Queue a job for every image field that was set on create or changed since load."""
+    for field in image_fields(type(instance)):
+        if getattr(instance, field) and (created or instance.has_changed(field)):
+            enqueue_image_job(instance, field)
+
+def backfill_image_jobs():
+    """Queue jobs for stored images that have no renditions for their current file. Returns the count."""
+    queued = 0
+    for label, fields in IMAGE_FIELDS.items():
+        model = apps.get_model(label)
+        for instance in model.objects.only('pk', 'image_renditions', *fields).iterator():
+            for field in fields:
+                file = getattr(instance, field)
+                if file and (instance.image_renditions.get(field) or {}).get('source') != file.name:
+                    enqueue_image_job(instance, field)
+                    queued += 1
+    return queued
+
+def claim_jobs(batch_size):
+    """
+    Lease up to `batch_size` due jobs, like the outbox worker: rows are locked
+    with SKIP LOCKED only long enough to push next_attempt_at past the lease.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'IMAGE_JOB_LEASE_SECONDS', 300))
+    with transaction.atomic():
+        jobs = list(
+            ImageJob.objects.select_for_update(skip_locked=True)
+            .select_related('content_type')
+            .filter(status='Pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        for job in jobs:
+            job.attempts += 1
+            job.next_attempt_at = now + lease
+        ImageJob.objects.bulk_update(jobs, ['attempts', 'next_attempt_at'])
+    return jobs
+
+def apply_renditions(job, renditions):
+    """
+    Record `renditions` on the job's object. If the object is gone or its field
+    now holds a different upload, the renditions are stale for it. They are
+    deleted unless the source is a content-addressed blob: other objects may
+    hold the same blob and its renditions, which collect_media removes with
+    the blob once its MediaBlob refcount drops to zero.
+    """
+    model = job.content_type.model_class()
+    with transaction.atomic():
+        instance = model.objects.select_for_update().filter(pk=job.object_id).first()
+        if instance is None or getattr(instance, job.field).name != job.source:
+            if not is_content_addressed(job.source):
+                delete_renditions(renditions)
+            return False
+        stored = dict(instance.image_renditions or {})
+        stored[job.field] = renditions
+        # update() skips save() and its signals; the upload itself did not change.
+        model.objects.filter(pk=instance.pk).update(image_renditions=stored)
+    if model._meta.label == 'system.Rider':
+        invalidate_rider_profile(instance.code)
+    return True
+
+def _fail(job, error):
+    max_attempts = getattr(settings, 'IMAGE_JOB_MAX_ATTEMPTS', 3)
+    job.last_error = str(error)[:2000]
+    if job.attempts >= max_attempts:
+        job.status = 'Failed'
+        job.finished_at = timezone.now()
+        logger.error(f"Image job {job.id} ({job.source}) failed after {job.attempts} attempt(s): {error}")
+    else:
+        job.next_attempt_at = timezone.now() + timedelta(seconds=30 * 2 ** (job.attempts - 1))
+        logger.warning(f"Image job {job.id} ({job.source}) failed (attempt {job.attempts}): {error}")
+
+def process_image_jobs(pool, batch_size=20):
+    """
+    Render one batch of due jobs on `pool` (a process pool, since decoding and
+    encoding are CPU-bound) and record the results. Returns (done, failed).
+    """
+    jobs = claim_jobs(batch_size)
+    if not jobs:
+        return 0, 0
+
+    done = failed = 0
+    futures = {pool.submit(render_renditions, job.source): job for job in jobs}
+    for future in as_completed(futures):
+        job = futures[future]
+        try:
+            apply_renditions(job, future.result())
+        except Exception as e:
+            failed += 1
+            _fail(job, e)
+        else:
+            done += 1
+            job.status = 'Done'
+            job.finished_at = timezone.now()
+            job.last_error = None
+
+    ImageJob.objects.bulk_update(jobs, ['status', 'next_attempt_at', 'last_error', 'finished_at'])
+    logger.info(f"Image batch: {done} done, {failed} failed.")
+    return done, failed
+
+def image_process_pool(workers=None):
+    """
+    Process pool for render_renditions(). Database connections are closed
+    first so forked workers never share the parent's sockets.
+    """
+    connections.close_all()
+    return ProcessPoolExecutor(
+        max_workers=workers or getattr(settings, 'IMAGE_WORKERS', None) or multiprocessing.cpu_count(),
+        initializer=init_worker,
+    )
@@ -0,0 +1,302 @@
+import io
+import os
+import re
+import csv
+import logging
+import zipfile
+from PIL import Image
+from itertools import islice
+from django.conf import settings
+from django.utils.text import slugify
+from django.db import IntegrityError, connection, transaction
+from django.core.files.base import ContentFile
+from django.core.validators import validate_email
+from django.core.exceptions import ValidationError
+from django.contrib.auth.hashers import make_password
+from concurrent.futures import ThreadPoolExecutor
+from system.codes import allocate_rider_codes, create_with_rider_code
+from system.images import enqueue_image_job
+from system.blobs import retain
+from api.uploads import IMAGE_EXTENSIONS, get_image_upload_limits, read_dimensions, sniff_format
+from system.models import Rider
+from account.models import User
+
+logger = logging.getLogger(__name__)
+
+PHONE_REGEX = re.compile(r'^\+?1?\d{9,15}$')
+REQUIRED_COLUMNS = ('name', 'email', 'phone_number')
+IMAGE_COLUMNS = ('image', 'permit_image')
+TEXT_COLUMNS = ('name', 'email', 'phone_number', 'address', 'nid', 'plate_number', 'insurance')
+DEFAULT_PASSWORD = 'Password!7'
+
+# Runs image processing for imports started from the API, off the request path.
+_background = ThreadPoolExecutor(max_workers=1, thread_name_prefix='rider-import')
+
+def iter_rows(fileobj, filename):
+    """
+    Yield one dict per data row of a CSV or XLSX upload, with lower-cased
+    header names and stripped string values. Rows are read lazily.
+    """
+    if filename.lower().endswith('.xlsx'):
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ValueError('XLSX import requires the openpyxl package; upload a CSV file instead.')
+        sheet = load_workbook(fileobj, read_only=True, data_only=True).active
+        rows = sheet.iter_rows(values_only=True)
+        header = [str(cell or '').strip().lower() for cell in next(rows, [])]
+        for values in rows:
+            yield {key: '' if value is None else str(value).strip() for key, value in zip(header, values)}
+        return
+
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    for row in csv.DictReader(text):
+        yield {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+
+def _max_lengths():
+    """The tightest max_length of the User and Rider fields each text column is stored in."""
+    lengths = {}
+    for model in (User, Rider):
+        for field in model._meta.fields:
+            if field.name in TEXT_COLUMNS and field.max_length:
+                lengths[field.name] = min(field.max_length, lengths.get(field.name, field.max_length))
+    return lengths
+
+MAX_LENGTHS = _max_lengths()
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _row_errors(row, seen):
+    errors = {}
+    for column in REQUIRED_COLUMNS:
+        if not row.get(column):
+            errors[column] = 'This field is required.'
+    if row.get('email'):
+        try:
+            validate_email(row['email'])
+        except ValidationError:
+            errors['email'] = 'Invalid email address.'
+    if row.get('phone_number') and not PHONE_REGEX.match(row['phone_number']):
+        errors['phone_number'] = 'Invalid phone number format.'
+    for column, max_length in MAX_LENGTHS.items():
+        if len(row.get(column) or '') > max_length:
+            errors[column] = f'Ensure this field has no more than {max_length} characters.'
+    for column in ('email', 'phone_number', 'nid'):
+        value = row.get(column)
+        if value and value.lower() in seen[column]:
+            errors[column] = 'Duplicate value in this file.'
+    return errors
+
+def _existing_values(rows):
+    """
+    Values of the chunk that already exist on a User or Rider, using one query
+    per column and model (both tables hold unique emails and phone numbers).
+    """
+    emails = [row['email'] for row in rows]
+    phones = [row['phone_number'] for row in rows]
+    nids = [row['nid'] for row in rows if row.get('nid')]
+    taken = {
+        'email': {value.lower() for value in User.objects.filter(email__in=emails).values_list('email', flat=True)},
+        'phone_number': set(User.objects.filter(phone_number__in=phones).values_list('phone_number', flat=True)),
+        'nid': set(Rider.objects.filter(nid__in=nids).values_list('nid', flat=True)) if nids else set(),
+    }
+    taken['email'] |= {value.lower() for value in Rider.objects.filter(email__in=emails).values_list('email', flat=True)}
+    taken['phone_number'] |= set(Rider.objects.filter(phone_number__in=phones).values_list('phone_number', flat=True))
+    return taken
+
+def validate_chunk(numbered_rows, seen, errors):
+    """
+    Validate (line number, row) pairs. Invalid rows are appended to `errors`;
+    valid ones are returned and their unique values remembered in `seen`.
+    """
+    candidates = []
+    for line, row in numbered_rows:
+        row_errors = _row_errors(row, seen)
+        if row_errors:
+            errors.append({'row': line, 'errors': row_errors})
+            continue
+        for column in ('email', 'phone_number', 'nid'):
+            if row.get(column):
+                seen[column].add(row[column].lower())
+        candidates.append((line, row))
+
+    if not candidates:
+        return []
+    taken = _existing_values([row for _, row in candidates])
+    valid = []
+    for line, row in candidates:
+        row_errors = {
+            column: 'Already exists.'
+            for column in ('email', 'phone_number', 'nid')
+            if row.get(column) and (row[column].lower() if column == 'email' else row[column]) in taken[column]
+        }
+        if row_errors:
+            errors.append({'row': line, 'errors': row_errors})
+        else:
+            valid.append((line, row))
+    return valid
+
+def _build_user(row, code, hashed_password):
+    return User(
+        name=row['name'],
+        email=row['email'],
+        phone_number=row['phone_number'],
+        # The rider code is unique, so usernames derived from it are too.
+        username=f"{slugify(row['name']) or 'user'}-{code.lower()}",
+        password=hashed_password,
+    )
+
+def _build_rider(row, code, user):
+    return Rider(
+        name=row['name'],
+        email=row['email'],
+        phone_number=row['phone_number'],
+        address=row.get('address') or None,
+        nid=row.get('nid') or None,
+        plate_number=row.get('plate_number') or None,
+        insurance=row.get('insurance') or None,
+        code=code,
+        user=user,
+    )
+
+def create_riders(rows, hashed_password):
+    """
+    Create a User and a Rider per row with one bulk INSERT each. Returns the
+    created riders, in row order. Raises IntegrityError, creating nothing, if
+    any row conflicts with an existing record.
+    """
+    codes = allocate_rider_codes([row['name'] for row in rows])
+    with transaction.atomic():
+        users = User.objects.bulk_create([_build_user(row, code, hashed_password) for row, code in zip(rows, codes)])
+        return Rider.objects.bulk_create([_build_rider(row, code, user) for row, code, user in zip(rows, codes, users)])
+
+def _save_rider(row, code, hashed_password):
+    user = _build_user(row, code, hashed_password)
+    user.save()
+    rider = _build_rider(row, code, user)
+    rider.save()
+    return rider
+
+def create_riders_one_by_one(numbered_rows, hashed_password, errors):
+    """
+    Fallback for a chunk whose bulk insert failed: create each row in its own
+    savepoint so only the conflicting rows (a value written since validation,
+    or a taken rider code, which gets a fresh one) are appended to `errors`.
+    Returns (line, row, rider) for the created rows.
+    """
+    created = []
+    for line, row in numbered_rows:
+        try:
+            rider = create_with_rider_code(row['name'], lambda code: _save_rider(row, code, hashed_password))
+        except IntegrityError as e:
+            logger.warning(f"Rider import: row {line} conflicts with an existing record: {e}")
+            errors.append({'row': line, 'errors': {'non_field_errors': 'Conflicts with an existing user or rider.'}})
+        else:
+            created.append((line, row, rider))
+    return created
+
+def import_riders(rows, password=DEFAULT_PASSWORD, chunk_size=500, dry_run=False):
+    """
+    Validate and create riders from an iterable of row dicts in chunks. The
+    shared initial password is hashed once for the whole import.
+
+    Returns a dict with the row, valid and created counts, per-row errors and the
+    image jobs ((rider_id, field, archive member) tuples) left to process.
+    """
+    hashed_password = make_password(password)
+    seen = {'email': set(), 'phone_number': set(), 'nid': set()}
+    result = {'rows': 0, 'valid': 0, 'created': 0, 'errors': [], 'image_jobs': []}
+
+    # Line 1 is the header row.
+    for chunk in _chunks(enumerate(rows, start=2), chunk_size):
+        result['rows'] += len(chunk)
+        valid = validate_chunk(chunk, seen, result['errors'])
+        result['valid'] += len(valid)
+        if not valid or dry_run:
+            continue
+        try:
+            riders = create_riders([row for _, row in valid], hashed_password)
+            created = [(line, row, rider) for (line, row), rider in zip(valid, riders)]
+        except IntegrityError:
+            created = create_riders_one_by_one(valid, hashed_password, result['errors'])
+        result['created'] += len(created)
+        for _, row, rider in created:
+            for field in IMAGE_COLUMNS:
+                if row.get(field):
+                    result['image_jobs'].append((rider.pk, field, row[field]))
+    return result
+
+def read_image_member(archive, member, field):
+    """
+    Read an archive member for image `field` under the same IMAGE_UPLOAD_LIMITS
+    and formats as an API upload. Returns (data, file name with the extension
+    of the detected format); raises ValueError for anything else. At most the
+    byte limit is decompressed, whatever size the archive claims.
+    """
+    max_bytes, max_pixels = get_image_upload_limits()[field]
+    info = archive.getinfo(member)
+    if info.file_size > max_bytes:
+        raise ValueError(f"is larger than {max_bytes // (1024 * 1024)} MB")
+    with archive.open(info) as source:
+        data = source.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ValueError(f"is larger than {max_bytes // (1024 * 1024)} MB")
+
+    format = sniff_format(data[:12])
+    if format is None:
+        raise ValueError("is not a supported image")
+    try:
+        dimensions = read_dimensions(data, format)
+    except Image.DecompressionBombError:
+        dimensions = (max_pixels + 1, 1)
+    if dimensions is None:
+        raise ValueError("has an unreadable image header")
+    if dimensions[0] * dimensions[1] > max_pixels:
+        raise ValueError(f"exceeds {max_pixels // 1_000_000} megapixels")
+
+    stem = os.path.splitext(os.path.basename(member))[0] or field
+    return data, f"{stem}.{IMAGE_EXTENSIONS[format]}"
+
+def _process_image(archive, rider_id, field, member):
+    try:
+        data, name = read_image_member(archive, member, field)
+        rider = Rider.objects.get(pk=rider_id)
+        # Stored as uploaded, like an API upload; the process_images worker renders it.
+        getattr(rider, field).save(name, ContentFile(data), save=False)
+        Rider.objects.filter(pk=rider_id).update(**{field: getattr(rider, field).name})
+        # update() sends no signals, so count the reference here.
+        retain([getattr(rider, field).name])
+        enqueue_image_job(rider, field)
+        return None
+    except Exception as e:
+        logger.warning(f"Rider import: failed to attach {member} to rider {rider_id}: {e}")
+        return {'rider_id': rider_id, 'field': field, 'file': member, 'error': str(e)}
+    finally:
+        connection.close()
+
+def process_import_images(archive_path, jobs, workers=None):
+    """
+    Attach images from a zip archive to imported riders using a thread pool
+    and queue their renditions. Returns failures.
+    """
+    workers = workers or getattr(settings, 'RIDER_IMPORT_IMAGE_WORKERS', None) or os.cpu_count() or 1
+    with zipfile.ZipFile(archive_path) as archive, ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda job: _process_image(archive, *job), jobs)
+        failures = [failure for failure in results if failure]
+    logger.info(f"Rider import: processed {len(jobs)} image(s), {len(failures)} failed.")
+    return failures
+
+def schedule_import_images(archive_path, jobs):
+    """Process import images in the background, then delete the archive."""
+    def run():
+        try:
+            process_import_images(archive_path, jobs)
+        except Exception as e:
+            logger.error(f"Rider import image processing failed: {e}", exc_info=True)
+        finally:
+            os.unlink(archive_path)
+
+    _background.submit(run)
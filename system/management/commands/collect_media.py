@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from system.blobs import collect_garbage
+
+class Command(BaseCommand):
+    help = "Delete content-addressed media no longer referenced by any model field, with their renditions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=int, default=None, help='Only remove files untouched for this many seconds (default: MEDIA_BLOB_GRACE_SECONDS).')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be removed without deleting anything.')
+
+    def handle(self, *args, **options):
+        removed, freed = collect_garbage(options['grace'], dry_run=options['dry_run'])
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {removed} file(s), {freed / 1024 / 1024:.1f} MB."))
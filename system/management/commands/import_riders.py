@@ -0,0 +1,54 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from system.imports import DEFAULT_PASSWORD, import_riders, iter_rows, process_import_images
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create riders and their user accounts from a CSV/XLSX file with columns "
+        "name, email, phone_number and optional address, nid, plate_number, insurance, "
+        "image, permit_image (file names inside --images)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or XLSX file to import.')
+        parser.add_argument('--images', help='Zip archive containing the files named in the image columns.')
+        parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Initial password for every created user.')
+        parser.add_argument('--chunk-size', type=int, default=500, help='Rows validated and inserted per batch.')
+        parser.add_argument('--workers', type=int, default=None, help='Image processing threads.')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; create nothing.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        try:
+            with open(options['path'], 'rb') as fileobj:
+                result = import_riders(
+                    iter_rows(fileobj, options['path']),
+                    password=options['password'],
+                    chunk_size=options['chunk_size'],
+                    dry_run=options['dry_run'],
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+
+        for error in result['errors'][:50]:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if len(result['errors']) > 50:
+            self.stderr.write(f"... and {len(result['errors']) - 50} more invalid row(s).")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['rows']} row(s), {result['valid']} valid, {result['created']} rider(s) created ({elapsed:.1f}s)."
+        ))
+
+        if result['image_jobs']:
+            if not options['images']:
+                self.stdout.write(self.style.WARNING(f"{len(result['image_jobs'])} image(s) referenced but no --images archive given."))
+                return
+            started = time.monotonic()
+            failures = process_import_images(options['images'], result['image_jobs'], options['workers'])
+            for failure in failures:
+                self.stderr.write(f"Image {failure['file']} for rider {failure['rider_id']}: {failure['error']}")
+            elapsed = time.monotonic() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"Attached {len(result['image_jobs']) - len(failures)} image(s), {len(failures)} failed ({elapsed:.1f}s)."
+            ))
@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from system.images import backfill_image_jobs, image_process_pool, process_image_jobs
+
+class Command(BaseCommand):
+    help = "Generate thumbnail, medium and full renditions (WebP and JPEG) for uploaded images."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: IMAGE_WORKERS or one per core).')
+        parser.add_argument('--batch-size', type=int, default=20, help='Number of jobs leased per batch.')
+        parser.add_argument('--loop', action='store_true', help='Keep polling for jobs instead of exiting once nothing is due.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep between polls when nothing is due.')
+        parser.add_argument('--backfill', action='store_true', help='First queue jobs for existing images without renditions.')
+
+    def handle(self, *args, **options):
+        if options['backfill']:
+            self.stdout.write(f"Queued {backfill_image_jobs()} image(s) for processing.")
+
+        started = time.monotonic()
+        total_done = total_failed = 0
+        with image_process_pool(options['workers']) as pool:
+            while True:
+                done, failed = process_image_jobs(pool, batch_size=options['batch_size'])
+                total_done += done
+                total_failed += failed
+                if done or failed:
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {total_done} image(s); {total_failed} failed attempt(s) in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,217 @@
+import json
+import time
+import random
+import asyncio
+import statistics
+from django.db import transaction
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+from system.models import DeliveryRequest, Rider
+from system.offers import send_offer
+from account.models import User
+from api.pubsub import get_broker
+
+LOADTEST_DOMAIN = 'loadtest.invalid'
+
+class InProcessSocket:
+    """Drives the ASGI application directly, without a server or network."""
+
+    def __init__(self, application, token):
+        self.inbound = asyncio.Queue()
+        self.outbound = asyncio.Queue()
+        scope = {
+            'type': 'websocket', 'path': '/ws/riders/', 'query_string': f"token={token}".encode(),
+            'headers': [], 'subprotocols': [], 'asgi': {'version': '3.0'},
+        }
+        self.task = asyncio.ensure_future(application(scope, self.inbound.get, self.outbound.put))
+
+    async def connect(self):
+        await self.inbound.put({'type': 'websocket.connect'})
+        message = await self.outbound.get()
+        if message['type'] != 'websocket.accept':
+            raise ConnectionError(f"rejected with code {message.get('code')}")
+
+    async def send_json(self, data):
+        await self.inbound.put({'type': 'websocket.receive', 'text': json.dumps(data)})
+
+    async def receive_json(self):
+        message = await self.outbound.get()
+        if message['type'] != 'websocket.send':
+            raise ConnectionError(f"closed with code {message.get('code')}")
+        return json.loads(message['text'])
+
+    async def close(self):
+        await self.inbound.put({'type': 'websocket.disconnect', 'code': 1000})
+        await self.task
+
+class NetworkSocket:
+    """Connects to a running ASGI server (sharing this database) over the network."""
+
+    def __init__(self, session, url, token):
+        self.session = session
+        self.url = f"{url}?token={token}"
+
+    async def connect(self):
+        self.ws = await self.session.ws_connect(self.url, heartbeat=None)
+
+    async def send_json(self, data):
+        await self.ws.send_json(data)
+
+    async def receive_json(self):
+        import aiohttp
+
+        message = await self.ws.receive()
+        if message.type != aiohttp.WSMsgType.TEXT:
+            raise ConnectionError(f"closed ({message.type.name})")
+        return json.loads(message.data)
+
+    async def close(self):
+        await self.ws.close()
+
+def _rss_kb():
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+
+def _percentiles(samples):
+    if not samples:
+        return "n/a"
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {statistics.median(samples) * 1000:.1f}ms, p99 {p99 * 1000:.1f}ms"
+
+class Command(BaseCommand):
+    help = (
+        "Open many concurrent rider sockets (/ws/riders/) as temporary test riders, "
+        "then measure connect cost, heartbeat round trips and offer/decline latency. "
+        "Runs against the ASGI application in-process unless --url is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sockets', type=int, default=1000, help='Concurrent rider sockets to open.')
+        parser.add_argument('--rounds', type=int, default=3, help='Heartbeat rounds across every socket.')
+        parser.add_argument('--offers', type=int, default=100, help='Offers to send to random riders, which decline them.')
+        parser.add_argument('--hold', type=float, default=0, help='Seconds to keep the sockets open idle before closing.')
+        parser.add_argument('--url', help='ws:// URL of /ws/riders/ on a server using this database.')
+
+    def handle(self, *args, **options):
+        if options['sockets'] < 1:
+            raise CommandError("--sockets must be at least 1.")
+        riders, tokens, delivery_request = self.create_riders(options['sockets'])
+        try:
+            asyncio.run(self.run(riders, tokens, delivery_request, options))
+        finally:
+            User.objects.filter(email__endswith=f"@{LOADTEST_DOMAIN}").delete()
+
+    def create_riders(self, count):
+        User.objects.filter(email__endswith=f"@{LOADTEST_DOMAIN}").delete()
+        with transaction.atomic():
+            users = User.objects.bulk_create([
+                User(
+                    name=f"Load Test Rider {i}", email=f"rider-{i}@{LOADTEST_DOMAIN}",
+                    username=f"loadtest-rider-{i}", phone_number=f"+999{i:09d}",
+                )
+                for i in range(count)
+            ])
+            users = list(User.objects.filter(email__endswith=f"@{LOADTEST_DOMAIN}").order_by('id'))
+            riders = Rider.objects.bulk_create([
+                Rider(user=user, name=user.name, code=f"LT{i:07d}", phone_number=user.phone_number)
+                for i, user in enumerate(users)
+            ])
+            riders = list(Rider.objects.filter(user__in=users).order_by('id'))
+            tokens = Token.objects.bulk_create([Token(user=user, key=Token.generate_key()) for user in users])
+            delivery_request = DeliveryRequest.objects.create(
+                client=users[0], pickup_address='Load test pickup', delivery_address='Load test drop-off',
+                delivery_price='1000', status='Pending',
+            )
+        return riders, [token.key for token in tokens], delivery_request
+
+    async def run(self, riders, tokens, delivery_request, options):
+        session = None
+        if options['url']:
+            import aiohttp
+
+            session = aiohttp.ClientSession()
+            make_socket = lambda token: NetworkSocket(session, options['url'], token)
+        else:
+            from api.asgi import application
+
+            make_socket = lambda token: InProcessSocket(application, token)
+
+        pongs = asyncio.Queue()
+        offers_received = {}
+        results = asyncio.Queue()
+
+        async def consume(index, socket):
+            try:
+                while True:
+                    message = await socket.receive_json()
+                    now = time.perf_counter()
+                    if message['type'] == 'pong':
+                        await pongs.put(now - message['ts'])
+                    elif message['type'] == 'offer':
+                        offers_received[index] = now
+                        await socket.send_json({'type': 'decline', 'offer_id': message['offer']['id']})
+                    elif message['type'] == 'offer_result':
+                        await results.put((index, now))
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+        rss_before = _rss_kb()
+        started = time.perf_counter()
+        sockets = [make_socket(token) for token in tokens]
+        await asyncio.gather(*(socket.connect() for socket in sockets))
+        connect_elapsed = time.perf_counter() - started
+        consumers = [asyncio.ensure_future(consume(i, socket)) for i, socket in enumerate(sockets)]
+        rss_after = _rss_kb()
+
+        self.stdout.write(f"connected {len(sockets)} socket(s) in {connect_elapsed:.2f}s ({len(sockets) / connect_elapsed:.0f}/s)")
+        if not options['url']:
+            self.stdout.write(f"registry: {get_broker().subscriber_count()} subscription(s)")
+            if rss_before and rss_after:
+                per_socket = (rss_after - rss_before) / len(sockets)
+                self.stdout.write(
+                    f"RSS {rss_before / 1024:.1f} MB -> {rss_after / 1024:.1f} MB, "
+                    f"~{per_socket:.1f} KB per socket (server and client side)"
+                )
+
+        for round_number in range(options['rounds']):
+            started = time.perf_counter()
+            for socket in sockets:
+                await socket.send_json({'type': 'heartbeat', 'ts': time.perf_counter()})
+            latencies = [await pongs.get() for _ in sockets]
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"heartbeat round {round_number + 1}: {len(sockets)} pong(s) in {elapsed:.2f}s, {_percentiles(latencies)}"
+            )
+
+        offer_count = min(options['offers'], len(sockets))
+        if offer_count:
+            chosen = random.sample(range(len(sockets)), offer_count)
+            offer_latencies, decline_latencies = [], []
+            started = time.perf_counter()
+            for index in chosen:
+                sent = time.perf_counter()
+                await sync_to_async(send_offer)(riders[index], delivery_request=delivery_request)
+                index_done, done_at = await results.get()
+                offer_latencies.append(offers_received[index_done] - sent)
+                decline_latencies.append(done_at - offers_received[index_done])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"offers: {offer_count} sent and declined in {elapsed:.2f}s")
+            self.stdout.write(f"  offer created -> received: {_percentiles(offer_latencies)}")
+            self.stdout.write(f"  decline sent -> result: {_percentiles(decline_latencies)}")
+
+        if options['hold']:
+            await asyncio.sleep(options['hold'])
+
+        for consumer in consumers:
+            consumer.cancel()
+        await asyncio.gather(*consumers, return_exceptions=True)
+        await asyncio.gather(*(socket.close() for socket in sockets), return_exceptions=True)
+        if session:
+            await session.close()
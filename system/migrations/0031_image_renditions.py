@@ -0,0 +1,64 @@
+# Generated by Django 5.0 on 2026-10-19 01:00
+
+import django.db.models.deletion
+import django.utils.timezone
+import system.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('system', '0030_ridercodesequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='deliveryrequest',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Generated renditions per image field, written by the process_images worker'),
+        ),
+        migrations.AddField(
+            model_name='rider',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Generated renditions per image field, written by the process_images worker'),
+        ),
+        migrations.AlterField(
+            model_name='deliveryrequest',
+            name='image',
+            field=models.ImageField(blank=True, help_text='An optional image of the package, stored as uploaded', null=True, upload_to=system.models.delivery_request_image_path),
+        ),
+        migrations.AlterField(
+            model_name='rider',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to=system.models.rider_image_path),
+        ),
+        migrations.AlterField(
+            model_name='rider',
+            name='permit_image',
+            field=models.ImageField(blank=True, null=True, upload_to=system.models.rider_permit_image_path),
+        ),
+        migrations.CreateModel(
+            name='ImageJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('field', models.CharField(help_text='Name of the image field on the object', max_length=50)),
+                ('source', models.CharField(help_text='Storage name of the upload to render', max_length=255)),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Done', 'Done'), ('Failed', 'Failed')], default='Pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the worker may (re)try this job')),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+            ],
+            options={
+                'verbose_name': 'Image Job',
+                'verbose_name_plural': 'Image Jobs',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='image_job_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-19 01:02
+
+import api.renditions
+import system.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0031_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deliveryrequest',
+            name='image',
+            field=api.renditions.RenditionImageField(blank=True, help_text='An optional image of the package, stored as uploaded', null=True, upload_to=system.models.delivery_request_image_path),
+        ),
+        migrations.AlterField(
+            model_name='rider',
+            name='image',
+            field=api.renditions.RenditionImageField(blank=True, null=True, upload_to=system.models.rider_image_path),
+        ),
+        migrations.AlterField(
+            model_name='rider',
+            name='permit_image',
+            field=api.renditions.RenditionImageField(blank=True, null=True, upload_to=system.models.rider_permit_image_path),
+        ),
+    ]
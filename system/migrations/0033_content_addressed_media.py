@@ -0,0 +1,49 @@
+# Generated by Django 5.0 on 2026-10-19 01:04
+
+import api.renditions
+import django.utils.timezone
+import system.models
+import system.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0032_rendition_image_fields'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='deliveryrequest',
+            name='image',
+            field=api.renditions.RenditionImageField(blank=True, help_text='An optional image of the package, stored as uploaded', null=True, storage=system.storage.content_addressed_storage, upload_to=system.models.delivery_request_image_path),
+        ),
+        migrations.AlterField(
+            model_name='rider',
+            name='image',
+            field=api.renditions.RenditionImageField(blank=True, null=True, storage=system.storage.content_addressed_storage, upload_to=system.models.rider_image_path),
+        ),
+        migrations.AlterField(
+            model_name='rider',
+            name='permit_image',
+            field=api.renditions.RenditionImageField(blank=True, null=True, storage=system.storage.content_addressed_storage, upload_to=system.models.rider_permit_image_path),
+        ),
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Storage name, derived from the SHA-256 of the content', max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField(default=0)),
+                ('refcount', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Media Blob',
+                'verbose_name_plural': 'Media Blobs',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['refcount', 'updated_at'], name='media_blob_unused_idx')],
+            },
+        ),
+    ]
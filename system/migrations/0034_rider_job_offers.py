@@ -0,0 +1,40 @@
+# Generated by Django 5.0 on 2026-10-19 01:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0033_content_addressed_media'),
+        ('web', '0009_outboxmessage_coalesce_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rider',
+            name='last_seen_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='Last heartbeat from the rider app over the rider socket', null=True),
+        ),
+        migrations.CreateModel(
+            name='JobOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('Pending', 'Pending'), ('Accepted', 'Accepted'), ('Declined', 'Declined'), ('Expired', 'Expired'), ('Withdrawn', 'Withdrawn')], default='Pending', max_length=10)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expires_at', models.DateTimeField(help_text='The offer can no longer be accepted after this time')),
+                ('responded_at', models.DateTimeField(blank=True, null=True)),
+                ('book_rider', models.ForeignKey(blank=True, help_text='The offered rider booking', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='job_offers', to='web.bookrider')),
+                ('delivery_request', models.ForeignKey(blank=True, help_text='The offered delivery request', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='job_offers', to='system.deliveryrequest')),
+                ('rider', models.ForeignKey(help_text='The rider the job is offered to', on_delete=django.db.models.deletion.CASCADE, related_name='job_offers', to='system.rider')),
+            ],
+            options={
+                'verbose_name': 'Job Offer',
+                'verbose_name_plural': 'Job Offers',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['rider', 'status'], name='job_offer_rider_status_idx')],
+            },
+        ),
+    ]
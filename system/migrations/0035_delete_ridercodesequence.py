@@ -0,0 +1,16 @@
+# Generated by Django 5.0 on 2026-10-19 01:44
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('system', '0034_rider_job_offers'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='RiderCodeSequence',
+        ),
+    ]
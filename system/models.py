@@ -5,8 +5,10 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from django.utils.text import slugify
-from imagekit.processors import ResizeToFill
-from imagekit.models import ProcessedImageField
+from django.contrib.contenttypes.models import ContentType
+from api.tracking import DirtyFieldsMixin
+from api.renditions import RenditionImageField
+from system.storage import content_addressed_storage
 
 def rider_image_path(instance, filename):
     base_filename, file_extension = os.path.splitext(filename)
@@ -16,7 +18,7 @@ def rider_permit_image_path(instance, filename):
     base_filename, file_extension = os.path.splitext(filename)
     return f'riders/permits/rider_{slugify(instance.name)}_{instance.plate_number}_{instance.phone_number}_{instance.code}{file_extension}'
 
-class Rider(models.Model):
+class Rider(DirtyFieldsMixin, models.Model):
     name = models.CharField(max_length=100, null=True, blank=True)
     email = models.CharField(max_length=100, unique=True, null=True, blank=True)
     phone_number = models.CharField(max_length=20, unique=True, null=True, blank=True)
@@ -24,23 +26,11 @@ class Rider(models.Model):
     code = models.CharField(max_length=20, unique=True, null=True, blank=True)
     nid = models.CharField(max_length=20, unique=True, null=True, blank=True)
     plate_number = models.CharField(max_length=255, null=True, blank=True)
-    permit_image = ProcessedImageField(
-        upload_to=rider_permit_image_path,
-        processors=[ResizeToFill(1270, 1270)],
-        format='JPEG',
-        options={'quality': 90},
-        null=True,
-        blank=True
-    )
+    # Images are stored as uploaded, once per distinct content; see image_renditions.
+    permit_image = RenditionImageField(upload_to=rider_permit_image_path, storage=content_addressed_storage, null=True, blank=True)
     insurance = models.CharField(max_length=255, null=True, blank=True)
-    image = ProcessedImageField(
-        upload_to=rider_image_path,
-        processors=[ResizeToFill(1270, 1270)],
-        format='JPEG',
-        options={'quality': 90},
-        null=True,
-        blank=True
-    )
+    image = RenditionImageField(upload_to=rider_image_path, storage=content_addressed_storage, null=True, blank=True)
+    image_renditions = models.JSONField(default=dict, blank=True, help_text='Generated renditions per image field, written by the process_images worker')
     # NEW fields:
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
@@ -66,12 +56,68 @@ class Rider(models.Model):
         related_name='boss_riders',
         help_text="Optional: The boss agent for this rider."
     )
+    last_seen_at = models.DateTimeField(null=True, blank=True, db_index=True, help_text='Last heartbeat from the rider app over the rider socket')
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
 
+class MediaBlob(models.Model):
+    """
+    A content-addressed file (see system/storage.py) and the number of model
+    fields referencing it. Unreferenced blobs are removed by `collect_media`.
+    """
+    name = models.CharField(max_length=255, unique=True, help_text='Storage name, derived from the SHA-256 of the content')
+    size = models.PositiveBigIntegerField(default=0)
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Media Blob'
+        verbose_name_plural = 'Media Blobs'
+        indexes = [
+            models.Index(fields=['refcount', 'updated_at'], name='media_blob_unused_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.refcount})"
+
+class ImageJob(models.Model):
+    """
+    Rendition work for one uploaded image, queued when an image field changes
+    and processed by the `process_images` worker (see system/images.py).
+    """
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('Done', 'Done'),
+        ('Failed', 'Failed'),
+    ]
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    field = models.CharField(max_length=50, help_text='Name of the image field on the object')
+    source = models.CharField(max_length=255, help_text='Storage name of the upload to render')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text='Earliest time the worker may (re)try this job')
+    last_error = models.TextField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Image Job'
+        verbose_name_plural = 'Image Jobs'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='image_job_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} - {self.status}"
+
 class DistancePricing(models.Model):
     BASE_DISTANCE = 5  # kilometers
     BASE_PRICE = 1000  # RWF
@@ -97,7 +143,7 @@ def delivery_request_image_path(instance, filename):
     base_filename, file_extension = os.path.splitext(filename)
     return f'delivery_requests/request_{slugify(instance.client.name)}_{instance.created_at}{file_extension}'
 
-class DeliveryRequest(models.Model):
+class DeliveryRequest(DirtyFieldsMixin, models.Model):
     REQUEST_STATUS_CHOICES = [
         ('Pending', 'Pending'),
         ('Accepted', 'Accepted'),
@@ -133,15 +179,8 @@ class DeliveryRequest(models.Model):
     delivery_price = models.CharField(max_length=100, null=True, blank=True, help_text='The calculated price for the delivery in RWF')
     payment_type = models.CharField(blank=True, null=True, max_length=255, help_text='The payment method for this delivery')
     
-    image = ProcessedImageField(
-        upload_to=delivery_request_image_path,
-        processors=[ResizeToFill(1000, 1000)],
-        format='JPEG',
-        options={'quality': 90},
-        null=True,
-        blank=True,
-        help_text='An optional image of the package'
-    )
+    image = RenditionImageField(upload_to=delivery_request_image_path, storage=content_addressed_storage, null=True, blank=True, help_text='An optional image of the package, stored as uploaded')
+    image_renditions = models.JSONField(default=dict, blank=True, help_text='Generated renditions per image field, written by the process_images worker')
     
     payment_status = models.CharField(max_length=20, choices=PAYMENT_STATUS_CHOICES, default='Pending', help_text='Status of the payment')
     tx_ref = models.CharField(max_length=255, null=True, blank=True, unique=True, help_text='Unique transaction reference from Flutterwave')
@@ -197,3 +236,37 @@ class BookRiderAssignment(models.Model):
 
     def __str__(self):
         return f"Assignment for {self.book_rider} to Rider: {self.rider.name} - Status: {self.status}"
+
+class JobOffer(models.Model):
+    """
+    A delivery request or rider booking offered to one rider, who accepts or
+    declines it over the rider socket (see system/offers.py). Accepting runs
+    the same assignment as AddRiderDeliveryView / AddBookRiderAssignmentView.
+    """
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('Accepted', 'Accepted'),
+        ('Declined', 'Declined'),
+        ('Expired', 'Expired'),
+        ('Withdrawn', 'Withdrawn'),
+    ]
+
+    rider = models.ForeignKey(Rider, on_delete=models.CASCADE, related_name='job_offers', help_text='The rider the job is offered to')
+    delivery_request = models.ForeignKey(DeliveryRequest, on_delete=models.CASCADE, null=True, blank=True, related_name='job_offers', help_text='The offered delivery request')
+    book_rider = models.ForeignKey(BookRider, on_delete=models.CASCADE, null=True, blank=True, related_name='job_offers', help_text='The offered rider booking')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Pending')
+    created_at = models.DateTimeField(default=timezone.now)
+    expires_at = models.DateTimeField(help_text='The offer can no longer be accepted after this time')
+    responded_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Job Offer'
+        verbose_name_plural = 'Job Offers'
+        indexes = [
+            models.Index(fields=['rider', 'status'], name='job_offer_rider_status_idx'),
+        ]
+
+    def __str__(self):
+        job = f"delivery #{self.delivery_request_id}" if self.delivery_request_id else f"booking #{self.book_rider_id}"
+        return f"{job} to {self.rider} - {self.status}"
@@ -0,0 +1,96 @@
+import logging
+from django.conf import settings
+from web.models import BookRider
+from web.outbox import enqueue_coalesced
+from system.models import DeliveryRequest, Rider
+from system.events import BookingStatusChanged, DeliveryStatusChanged, subscribe
+
+logger = logging.getLogger(__name__)
+
+DELIVERY_MESSAGES = {
+    'Accepted': "Your delivery request #{id} has been accepted. Rider {rider} ({rider_phone}) will pick up your package.",
+    'In Progress': "Your delivery #{id} is on its way to {destination}.",
+    'Completed': "Your delivery #{id} has been completed. Thank you for using our service.",
+    'Cancelled': "Your delivery request #{id} has been cancelled.",
+}
+
+BOOKING_MESSAGES = {
+    'Accepted': "Your rider booking #{id} has been accepted. Rider {rider} ({rider_phone}) has been assigned.",
+    'In Progress': "Your rider booking #{id} is now in progress.",
+    'Completed': "Your rider booking #{id} has been completed. Thank you for using our service.",
+    'Cancelled': "Your rider booking #{id} has been cancelled.",
+}
+
+RIDER_MESSAGES = {
+    'delivery': "You have been assigned delivery #{id}: pick up at {pickup}, deliver to {destination}.",
+    'booking': "You have been assigned rider booking #{id}.",
+}
+
+def notify(subject, message, coalesce_key, email=None, phone_number=None, user_id=None):
+    """
+    Queue `message` on every NOTIFICATION_CHANNELS channel the recipient can be
+    reached on. Messages with the same `coalesce_key` that have not been sent
+    yet are replaced, so a burst of transitions sends only the latest one.
+    """
+    addresses = {'email': email, 'sms': phone_number, 'push': str(user_id) if user_id else None}
+    for channel in getattr(settings, 'NOTIFICATION_CHANNELS', ['sms', 'email', 'push']):
+        if addresses.get(channel):
+            enqueue_coalesced(channel, addresses[channel], message, coalesce_key, subject=subject)
+
+def _rider_context(rider):
+    return {'rider': rider.name or rider.code, 'rider_phone': rider.phone_number or '-'} if rider else {'rider': '-', 'rider_phone': '-'}
+
+def _notify_rider(rider, kind, context):
+    if rider is None:
+        return
+    notify(
+        f"New {kind} #{context['id']}",
+        RIDER_MESSAGES[kind].format(**context),
+        f"{kind}:{context['id']}:rider",
+        email=rider.email,
+        phone_number=rider.phone_number,
+        user_id=rider.user_id,
+    )
+
+@subscribe(DeliveryStatusChanged, durable=True)
+def notify_delivery_status(event):
+    if event.status not in DELIVERY_MESSAGES or event.status == event.previous_status:
+        return
+    delivery_request = DeliveryRequest.objects.select_related('client').get(pk=event.delivery_request_id)
+    rider = Rider.objects.filter(pk=event.rider_id).first() if event.rider_id else None
+    context = {
+        'id': delivery_request.pk,
+        'pickup': delivery_request.pickup_address or '-',
+        'destination': delivery_request.delivery_address or 'its destination',
+        **_rider_context(rider),
+    }
+    client = delivery_request.client
+    notify(
+        f"Delivery #{delivery_request.pk}: {event.status}",
+        DELIVERY_MESSAGES[event.status].format(**context),
+        f"delivery:{delivery_request.pk}",
+        email=client.email,
+        phone_number=client.phone_number,
+        user_id=client.pk,
+    )
+    if event.status == 'Accepted':
+        _notify_rider(rider, 'delivery', context)
+
+@subscribe(BookingStatusChanged, durable=True)
+def notify_booking_status(event):
+    if event.status not in BOOKING_MESSAGES or event.status == event.previous_status:
+        return
+    book_rider = BookRider.objects.select_related('client').get(pk=event.book_rider_id)
+    rider = Rider.objects.filter(pk=event.rider_id).first() if event.rider_id else None
+    context = {'id': book_rider.pk, **_rider_context(rider)}
+    client = book_rider.client
+    notify(
+        f"Rider booking #{book_rider.pk}: {event.status}",
+        BOOKING_MESSAGES[event.status].format(**context),
+        f"booking:{book_rider.pk}",
+        email=client.email,
+        phone_number=client.phone_number,
+        user_id=client.pk,
+    )
+    if event.status == 'Accepted':
+        _notify_rider(rider, 'booking', context)
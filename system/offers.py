@@ -0,0 +1,147 @@
+import logging
+from datetime import timedelta
+from collections import defaultdict
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from api.pubsub import get_broker
+from system.models import DeliveryRequest, JobOffer, Rider
+from system.assignments import RiderUnavailable, assign_booking, assign_delivery
+from web.models import BookRider
+
+logger = logging.getLogger(__name__)
+
+class OfferError(Exception):
+    """An offer cannot be made or answered. `message` is safe to show the rider."""
+
+    def __init__(self, message):
+        super().__init__(message)
+        self.message = message
+
+def rider_channel(rider_id):
+    return f"rider:{rider_id}"
+
+def offer_payload(offer):
+    job = offer.delivery_request or offer.book_rider
+    return {
+        'id': offer.pk,
+        'kind': 'delivery' if offer.delivery_request_id else 'booking',
+        'job_id': job.pk,
+        'status': offer.status,
+        'pickup_address': job.pickup_address,
+        'delivery_address': job.delivery_address,
+        'estimated_distance_km': job.estimated_distance_km,
+        'estimated_delivery_time': job.estimated_delivery_time,
+        'price': offer.delivery_request.delivery_price if offer.delivery_request_id else offer.book_rider.booking_price,
+        'expires_at': offer.expires_at.isoformat(),
+    }
+
+def _notify_rider(rider_id, message):
+    """Push `message` to the rider's open sockets once the transaction commits."""
+    transaction.on_commit(lambda: get_broker().publish(rider_channel(rider_id), message))
+
+def send_offer(rider, delivery_request=None, book_rider=None, ttl=None):
+    """
+    Offer a pending delivery request or rider booking to `rider` for `ttl`
+    seconds (RIDER_OFFER_TTL_SECONDS) and push it to their open sockets.
+    Riders who are not connected receive it when they next connect.
+    """
+    job = delivery_request or book_rider
+    if (delivery_request is None) == (book_rider is None):
+        raise OfferError("Offer either a delivery request or a rider booking.")
+    if job.status != 'Pending':
+        raise OfferError(f"This job is already {job.status.lower()}.")
+
+    ttl = ttl or getattr(settings, 'RIDER_OFFER_TTL_SECONDS', 60)
+    offer = JobOffer.objects.create(
+        rider=rider,
+        delivery_request=delivery_request,
+        book_rider=book_rider,
+        expires_at=timezone.now() + timedelta(seconds=ttl),
+    )
+    _notify_rider(rider.pk, {'type': 'offer', 'offer': offer_payload(offer)})
+    return offer
+
+def pending_offers(rider_ids, batch_size=500):
+    """
+    Unanswered, unexpired offers per rider ID, oldest first, sent when the
+    riders' sockets connect. Looked up `batch_size` riders per query.
+    """
+    rider_ids = list(rider_ids)
+    offers = defaultdict(list)
+    for start in range(0, len(rider_ids), batch_size):
+        for offer in (
+            JobOffer.objects.filter(
+                rider_id__in=rider_ids[start:start + batch_size], status='Pending', expires_at__gt=timezone.now(),
+            )
+            .select_related('delivery_request', 'book_rider')
+            .order_by('created_at')
+        ):
+            offers[offer.rider_id].append(offer)
+    return offers
+
+def respond_to_offer(rider_id, offer_id, accept):
+    """
+    Accept or decline an offer on behalf of the rider. Accepting assigns the
+    rider through the same path as the admin endpoints and withdraws every other
+    pending offer for the job. Returns the offer with its final status, which is
+    'Expired' or 'Withdrawn' if it could no longer be accepted. Raises OfferError
+    for unknown or already answered offers, or if the rider is busy.
+    """
+    with transaction.atomic():
+        offer = (
+            JobOffer.objects.select_for_update()
+            .select_related('delivery_request', 'book_rider')
+            .filter(pk=offer_id, rider_id=rider_id)
+            .first()
+        )
+        if offer is None:
+            raise OfferError("Offer not found.")
+        if offer.status != 'Pending':
+            raise OfferError(f"This offer is already {offer.status.lower()}.")
+
+        offer.responded_at = timezone.now()
+        if offer.expires_at <= offer.responded_at:
+            offer.status = 'Expired'
+        elif not accept:
+            offer.status = 'Declined'
+        else:
+            offer.status = _accept(offer)
+        offer.save(update_fields=['status', 'responded_at'])
+    return offer
+
+def _accept(offer):
+    if offer.delivery_request_id:
+        job = DeliveryRequest.objects.select_for_update().get(pk=offer.delivery_request_id)
+    else:
+        job = BookRider.objects.select_for_update().get(pk=offer.book_rider_id)
+    if job.status != 'Pending':
+        return 'Withdrawn'
+
+    rider = Rider.objects.select_related('user', 'commissioner', 'boss').get(pk=offer.rider_id)
+    try:
+        if offer.delivery_request_id:
+            assign_delivery(rider, job)
+        else:
+            assign_booking(rider, job)
+    except RiderUnavailable as e:
+        raise OfferError(e.message)
+
+    job_filter = {'delivery_request_id': job.pk} if offer.delivery_request_id else {'book_rider_id': job.pk}
+    others = JobOffer.objects.filter(status='Pending', **job_filter).exclude(pk=offer.pk)
+    for other_id, other_rider_id in others.values_list('id', 'rider_id'):
+        _notify_rider(other_rider_id, {'type': 'offer_withdrawn', 'offer_id': other_id})
+    others.update(status='Withdrawn', responded_at=offer.responded_at)
+    return 'Accepted'
+
+def record_heartbeats(rider_ids, batch_size=500):
+    """Mark the riders as seen now, in one UPDATE per `batch_size` riders."""
+    rider_ids = list(rider_ids)
+    now = timezone.now()
+    for start in range(0, len(rider_ids), batch_size):
+        Rider.objects.filter(pk__in=rider_ids[start:start + batch_size]).update(last_seen_at=now)
+
+def online_riders():
+    """Riders whose app sent a heartbeat within RIDER_ONLINE_SECONDS."""
+    cutoff = timezone.now() - timedelta(seconds=getattr(settings, 'RIDER_ONLINE_SECONDS', 90))
+    return Rider.objects.filter(last_seen_at__gte=cutoff)
@@ -0,0 +1,97 @@
+import logging
+from django.conf import settings
+from django.core.cache import caches
+from system.models import Rider
+from api.renditions import rendition_url, rendition_urls
+
+logger = logging.getLogger(__name__)
+
+PROFILE_KEY = 'rider-profile:{code}'
+
+# Columns needed for the compact profile; history is served separately.
+PROFILE_FIELDS = (
+    'id', 'name', 'phone_number', 'address', 'code', 'nid', 'image', 'permit_image', 'image_renditions',
+    'plate_number', 'insurance', 'user_id', 'commissioner_id', 'boss_id',
+)
+
+def _cache():
+    return caches[getattr(settings, 'RIDER_PROFILE_CACHE_ALIAS', 'shared')]
+
+def build_rider_profile(rider):
+    """
+    Compact, request-independent rider payload. Image fields hold relative
+    rendition URLs so the payload can be cached and made absolute per request.
+    """
+    return {
+        'id': rider.id,
+        'name': rider.name,
+        'phone_number': rider.phone_number,
+        'address': rider.address,
+        'code': rider.code,
+        'nid': rider.nid,
+        'image': rendition_url(rider.image, 'full'),
+        'permit_image': rendition_url(rider.permit_image, 'full'),
+        'image_renditions': rendition_urls(rider, 'image'),
+        'permit_image_renditions': rendition_urls(rider, 'permit_image'),
+        'plate_number': rider.plate_number,
+        'insurance': rider.insurance,
+        'user_id': rider.user_id,
+        'commissioner_id': rider.commissioner_id,
+        'boss_id': rider.boss_id,
+    }
+
+def get_rider_profile(code):
+    """Return the cached profile for `code`, loading it with one query on a miss; None if unknown."""
+    key = PROFILE_KEY.format(code=code)
+    cache = _cache()
+    try:
+        profile = cache.get(key)
+    except Exception as e:
+        logger.warning(f"Rider profile cache lookup failed: {e}")
+        cache, profile = None, None
+    if profile is not None:
+        return profile
+
+    rider = Rider.objects.filter(code=code).only(*PROFILE_FIELDS).first()
+    if rider is None:
+        return None
+    profile = build_rider_profile(rider)
+    if cache is not None:
+        try:
+            cache.set(key, profile, getattr(settings, 'RIDER_PROFILE_CACHE_TTL', 300))
+        except Exception as e:
+            logger.warning(f"Failed to cache rider profile: {e}")
+    return profile
+
+def invalidate_rider_profile(*codes):
+    keys = [PROFILE_KEY.format(code=code) for code in codes if code]
+    if not keys:
+        return
+    try:
+        _cache().delete_many(keys)
+    except Exception as e:
+        logger.error(f"Failed to invalidate rider profile cache: {e}", exc_info=True)
+
+def _absolute_srcset(value, request):
+    candidates = (candidate.rsplit(' ', 1) for candidate in value.split(', '))
+    return ', '.join(f"{request.build_absolute_uri(url)} {width}" for url, width in candidates)
+
+def absolute_profile(profile, request):
+    """Copy of `profile` with image URLs made absolute for `request`."""
+    profile = dict(profile)
+    if request is None:
+        return profile
+    for field in ('image', 'permit_image'):
+        if profile.get(field):
+            profile[field] = request.build_absolute_uri(profile[field])
+        renditions = profile.get(f'{field}_renditions')
+        if renditions:
+            profile[f'{field}_renditions'] = {
+                name: {
+                    key: (_absolute_srcset(value, request) if name == 'srcset' else request.build_absolute_uri(value))
+                    if isinstance(value, str) else value
+                    for key, value in entry.items()
+                }
+                for name, entry in renditions.items()
+            }
+    return profile
@@ -1,5 +1,7 @@
-import random
 from system.models import *
+from system.codes import create_with_rider_code
+from api.renditions import rendition_url
+from api.fields import ImageRenditionsField, RenditionURLField
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 
@@ -13,6 +15,8 @@ class DeliveryRequestSerializer(serializers.ModelSerializer):
     rider_code = serializers.SerializerMethodField()
     rider_nid = serializers.SerializerMethodField()
     rider_image = serializers.SerializerMethodField()
+    image = RenditionURLField(required=False, allow_null=True)
+    image_renditions = ImageRenditionsField('image')
 
     class Meta:
         model = DeliveryRequest
@@ -20,13 +24,12 @@ class DeliveryRequestSerializer(serializers.ModelSerializer):
             'id', 'client', 'client_name', 'client_phone', 'pickup_address', 'pickup_lat', 'pickup_lng',
             'delivery_address', 'delivery_lat', 'delivery_lng', 'package_name', 'package_description',
             'recipient_name', 'recipient_phone', 'estimated_distance_km', 'estimated_delivery_time', 
-            'value_of_product', 'delivery_price', 'image', 'status', 'rider_name', 'rider_phone_number', 'rider_address', 
+            'value_of_product', 'delivery_price', 'image', 'image_renditions', 'status', 'rider_name', 'rider_phone_number', 'rider_address', 
             'rider_code', 'rider_nid', 'rider_image', 'payment_type', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
         extra_kwargs = {
             'client': {'write_only': True},
-            'image': {'required': False, 'allow_null': True},
         }
 
     def get_rider_info(self, obj, attribute):
@@ -41,7 +44,7 @@ class DeliveryRequestSerializer(serializers.ModelSerializer):
         if image:
             request = self.context.get('request')
             if request is not None:
-                return request.build_absolute_uri(image.url)
+                return rendition_url(image, 'thumbnail', request=request)
         return None
 
     def get_rider_name(self, obj):
@@ -93,7 +96,7 @@ class RiderDeliverySerializer(serializers.ModelSerializer):
     rider_address = serializers.ReadOnlyField(source='rider.address', help_text='The address of the rider')
     rider_code = serializers.ReadOnlyField(source='rider.code', help_text='The unique code of the rider')
     rider_nid = serializers.ReadOnlyField(source='rider.nid', help_text='The national ID of the rider')
-    rider_image = serializers.ImageField(source='rider.image', help_text='The image of the rider', read_only=True)
+    rider_image = RenditionURLField(source='rider.image', detail_rendition='medium', help_text='The image of the rider', read_only=True)
     
     # New fields to retrieve associated User, Commissioner, and Boss IDs
     rider_user_id = serializers.ReadOnlyField(source='rider.user.id', help_text="The ID of the rider's associated User account")
@@ -212,8 +215,10 @@ class RiderSerializer(serializers.ModelSerializer):
     Also automatically creates a corresponding User record using the provided name, email, and phone_number.
     """
     # Include the images, making them optional.
-    image = serializers.ImageField(required=False)
-    permit_image = serializers.ImageField(required=False)
+    image = RenditionURLField(required=False)
+    permit_image = RenditionURLField(required=False)
+    image_renditions = ImageRenditionsField('image')
+    permit_image_renditions = ImageRenditionsField('permit_image')
     code = serializers.CharField(read_only=True)  # Code is auto-generated and read-only.
 
     # For output, include delivery history if needed.
@@ -234,42 +239,26 @@ class RiderSerializer(serializers.ModelSerializer):
         model = Rider
         fields = [
             'id', 'name', 'email', 'phone_number', 'address', 'code', 'nid',
-            'image', 'permit_image', 'plate_number', 'insurance', 'delivery_history',
+            'image', 'permit_image', 'image_renditions', 'permit_image_renditions',
+            'plate_number', 'insurance', 'delivery_history',
             # New nested data fields:
             'user_data', 'commissioner_data', 'boss_data',
         ]
         read_only_fields = ['code', 'delivery_history', 'user_data', 'commissioner_data', 'boss_data']
 
-    def generate_unique_code(self, name):
-        """
-        Generates a unique code based on the first two initials of the name and a random 8-digit number.
-        Ensures uniqueness by checking against existing codes in the Rider model.
-        """
-        # Extract the first two initials from the provided name
-        initials = ''.join([part[0].upper() for part in name.split() if part])[:2]
-        # Attempt generating a unique code in a loop
-        while True:
-            random_number = ''.join([str(random.randint(0, 9)) for _ in range(8)])
-            code = f"{initials}{random_number}"
-            if not Rider.objects.filter(code=code).exists():
-                return code
-
     def create(self, validated_data):
         """
         Overrides the default create behavior:
           - Extracts the required fields for the User model.
           - Creates a corresponding User record with default password "Password!7".
           - Associates the created user with the new Rider.
-          - Generates a unique code for the Rider.
+          - Allocates a unique code for the Rider (see system/codes.py).
         """
         # Extract required fields for creating the User record.
         name = validated_data.get('name', '')
         phone_number = validated_data.get('phone_number', '')
         email = validated_data.pop('email')  # Remove email from validated_data as Rider model doesn't use it.
 
-        # Generate the unique rider code.
-        validated_data['code'] = self.generate_unique_code(name)
-
         # Create the corresponding user record.
         User = get_user_model()
         try:
@@ -288,9 +277,12 @@ class RiderSerializer(serializers.ModelSerializer):
         # Link the created user to the Rider.
         validated_data['user'] = user
 
-        # Create and return the Rider instance.
-        rider = super().create(validated_data)
-        return rider
+        # Create and return the Rider instance with an allocated code,
+        # retrying with the next code if the insert hits a collision.
+        def create(code):
+            return super(RiderSerializer, self).create({**validated_data, 'code': code})
+
+        return create_with_rider_code(name, create)
 
     def update(self, instance, validated_data):
         """
@@ -303,7 +295,7 @@ class RiderSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        instance.save()
+        instance.save_dirty()
         return instance
 
     def to_representation(self, instance):
@@ -0,0 +1,39 @@
+from django.dispatch import receiver
+from account.models import User
+from system.models import DeliveryRequest, Rider
+from system.images import enqueue_changed_images
+from system.blobs import release_deleted_blobs, track_saved_blobs
+from system.profiles import invalidate_rider_profile
+from django.db.models.signals import post_save, post_delete
+
+@receiver(post_save, sender=Rider)
+def invalidate_saved_rider_profile(sender, instance, created, raw=False, **kwargs):
+    """Drop the cached profile under the current code and, if it changed, the old one."""
+    if created or raw:
+        return
+    invalidate_rider_profile(instance.code, instance.get_dirty_fields().get('code'))
+
+@receiver(post_delete, sender=Rider)
+def invalidate_deleted_rider_profile(sender, instance, **kwargs):
+    invalidate_rider_profile(instance.code)
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Rider)
+@receiver(post_save, sender=DeliveryRequest)
+def queue_image_renditions(sender, instance, created, raw=False, **kwargs):
+    """Queue rendition jobs for new uploads; the request only stores the original."""
+    if not raw:
+        enqueue_changed_images(instance, created)
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Rider)
+@receiver(post_save, sender=DeliveryRequest)
+def count_saved_blob_references(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        track_saved_blobs(instance, created, update_fields)
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Rider)
+@receiver(post_delete, sender=DeliveryRequest)
+def release_deleted_blob_references(sender, instance, **kwargs):
+    release_deleted_blobs(instance)
@@ -0,0 +1,232 @@
+import json
+import asyncio
+import logging
+from urllib.parse import parse_qs
+from django.conf import settings
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from rest_framework.exceptions import AuthenticationFailed
+from account.authentication import CachedTokenAuthentication
+from system.offers import OfferError, offer_payload, pending_offers, record_heartbeats, respond_to_offer, rider_channel
+from system.models import Rider
+from api.pubsub import get_broker
+
+logger = logging.getLogger(__name__)
+
+# Application close codes (4000-4999).
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_IDLE = 4408
+CLOSE_TOO_SLOW = 4429
+
+def database_sync_to_async(fn):
+    """
+    Run `fn` on a thread of the loop's executor. This app is plain ASGI, so no
+    request signals close connections for it: stale or broken connections are
+    closed before and after each call, as Django does around a request.
+    Calls are independent, so they do not share asgiref's single sync thread.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)
+
+def _token(scope):
+    """Token from ?token= (browsers cannot set WebSocket headers) or the Authorization header."""
+    token = parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+    if token:
+        return token
+    for name, value in scope.get('headers', ()):
+        if name == b'authorization':
+            scheme, _, key = value.decode().partition(' ')
+            if scheme.lower() == 'token':
+                return key
+    return None
+
+def _authenticate(token):
+    """The rider ID for a valid token belonging to a rider account, else None."""
+    if not token:
+        return None
+    try:
+        user, _ = CachedTokenAuthentication().authenticate_credentials(token)
+    except AuthenticationFailed:
+        return None
+    return Rider.objects.filter(user=user).values_list('pk', flat=True).first()
+
+class HeartbeatRecorder:
+    """
+    Collects the riders seen on this event loop and writes Rider.last_seen_at
+    for all of them in one batched UPDATE every RIDER_HEARTBEAT_FLUSH_SECONDS,
+    so thousands of sockets cost one query per interval, not one per heartbeat.
+    """
+
+    def __init__(self):
+        self.pending = set()
+        self.task = None
+
+    def mark(self, rider_id):
+        self.pending.add(rider_id)
+        loop = asyncio.get_running_loop()
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            self.task = loop.create_task(self.flush_later())
+
+    async def flush_later(self):
+        await asyncio.sleep(getattr(settings, 'RIDER_HEARTBEAT_FLUSH_SECONDS', 5))
+        rider_ids, self.pending = self.pending, set()
+        try:
+            await database_sync_to_async(record_heartbeats)(rider_ids)
+        except Exception as e:
+            logger.error(f"Failed to record heartbeats for {len(rider_ids)} rider(s): {e}", exc_info=True)
+
+heartbeats = HeartbeatRecorder()
+
+def _pending_offer_messages(rider_ids):
+    return {
+        rider_id: [{'type': 'offer', 'offer': offer_payload(offer)} for offer in offers]
+        for rider_id, offers in pending_offers(rider_ids).items()
+    }
+
+class PendingOfferLoader:
+    """
+    Looks up the pending offers of connecting riders. Lookups that arrive while
+    a query is running are answered together by the next one, so a reconnect
+    storm (every rider after a deploy) costs a few batched queries instead of
+    one queued query per socket.
+    """
+
+    def __init__(self):
+        self.waiting = {}
+        self.task = None
+
+    async def load(self, rider_id):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.waiting.setdefault(rider_id, []).append(future)
+        if self.task is None or self.task.done() or self.task.get_loop() is not loop:
+            self.task = loop.create_task(self.run())
+        return await future
+
+    async def run(self):
+        # Let sockets connecting in the same loop iteration join the first batch.
+        await asyncio.sleep(0)
+        while self.waiting:
+            batch, self.waiting = self.waiting, {}
+            try:
+                messages = await database_sync_to_async(_pending_offer_messages)(list(batch))
+            except Exception as e:
+                logger.error(f"Failed to load pending offers for {len(batch)} rider(s): {e}", exc_info=True)
+                messages = {}
+            for rider_id, futures in batch.items():
+                for future in futures:
+                    if not future.done():
+                        future.set_result(messages.get(rider_id, []))
+
+offer_loader = PendingOfferLoader()
+
+class RiderConnection:
+    """
+    One accepted rider socket. Outgoing messages (offers published for the
+    rider and replies) go through a bounded broker subscription drained by a
+    single writer, so a client that stops reading is disconnected once its
+    queue fills rather than growing memory; it gets its pending offers again
+    on reconnect. The reader handles heartbeats and offer answers and closes
+    the socket if the client goes quiet for RIDER_SOCKET_IDLE_SECONDS.
+    """
+
+    def __init__(self, rider_id, receive, send):
+        self.rider_id = rider_id
+        self.receive = receive
+        self.send = send
+
+    async def run(self):
+        """Serve the socket until either side ends it. Returns a close code, or None if the client left."""
+        self.subscription = get_broker().subscribe(
+            rider_channel(self.rider_id),
+            max_queue=getattr(settings, 'RIDER_SOCKET_QUEUE_SIZE', 32),
+            drop_oldest=False,
+        )
+        try:
+            heartbeats.mark(self.rider_id)
+            for message in await offer_loader.load(self.rider_id):
+                self.subscription.put(message)
+
+            tasks = {asyncio.ensure_future(self.read()), asyncio.ensure_future(self.write())}
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            return done.pop().result()
+        finally:
+            self.subscription.close()
+
+    def reply(self, message):
+        self.subscription.put(message)
+
+    async def read(self):
+        idle = getattr(settings, 'RIDER_SOCKET_IDLE_SECONDS', 60)
+        while True:
+            try:
+                message = await asyncio.wait_for(self.receive(), idle)
+            except asyncio.TimeoutError:
+                return CLOSE_IDLE
+            if message['type'] == 'websocket.disconnect':
+                return None
+            try:
+                data = json.loads(message.get('text') or message.get('bytes') or '')
+                kind = data['type']
+            except (ValueError, TypeError, KeyError):
+                self.reply({'type': 'error', 'message': "Messages must be JSON objects with a 'type'."})
+                continue
+            await self.handle(kind, data)
+
+    async def handle(self, kind, data):
+        if kind == 'heartbeat':
+            self.reply({'type': 'pong', 'ts': data.get('ts')})
+            heartbeats.mark(self.rider_id)
+        elif kind in ('accept', 'decline'):
+            offer_id = data.get('offer_id')
+            if not isinstance(offer_id, int):
+                self.reply({'type': 'error', 'message': "'offer_id' must be an integer."})
+                return
+            try:
+                offer = await database_sync_to_async(respond_to_offer)(self.rider_id, offer_id, kind == 'accept')
+            except OfferError as e:
+                self.reply({'type': 'error', 'offer_id': offer_id, 'message': e.message})
+            else:
+                self.reply({'type': 'offer_result', 'offer_id': offer_id, 'status': offer.status})
+        else:
+            self.reply({'type': 'error', 'message': f"Unknown message type '{kind}'."})
+
+    async def write(self):
+        while True:
+            message = await self.subscription.get()
+            if self.subscription.overflowed:
+                logger.warning(f"Rider {self.rider_id} socket fell behind; disconnecting.")
+                return CLOSE_TOO_SLOW
+            await self.send({'type': 'websocket.send', 'text': json.dumps(message)})
+
+async def rider_socket(scope, receive, send):
+    """
+    ASGI WebSocket application for /ws/riders/ (routed in api/asgi.py).
+
+    Riders connect with their auth token and receive JSON messages:
+    {"type": "offer", "offer": {...}}, {"type": "offer_withdrawn", "offer_id"},
+    {"type": "offer_result", "offer_id", "status"}, {"type": "pong", "ts"} and
+    {"type": "error", "message"}. They send {"type": "heartbeat", "ts"} about
+    every 20 seconds, which also marks them online (Rider.last_seen_at), and
+    {"type": "accept" | "decline", "offer_id"} to answer offers.
+    """
+    message = await receive()
+    if message['type'] != 'websocket.connect':
+        return
+    rider_id = await database_sync_to_async(_authenticate)(_token(scope))
+    if rider_id is None:
+        await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+        return
+
+    await send({'type': 'websocket.accept'})
+    code = await RiderConnection(rider_id, receive, send).run()
+    if code is not None:
+        await send({'type': 'websocket.close', 'code': code})
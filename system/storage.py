@@ -0,0 +1,68 @@
+import os
+import re
+import hashlib
+import tempfile
+from django.core.files.storage import FileSystemStorage
+
+CAS_PREFIX = 'cas/'
+_EXTENSION = re.compile(r'^\.[a-z0-9]{1,8}$')
+
+def is_content_addressed(name):
+    return bool(name) and name.startswith(CAS_PREFIX)
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    FileSystemStorage that stores each file once under its SHA-256 digest:
+    cas/<d[:2]>/<d[2:4]>/<digest><ext>. The name chosen by upload_to only
+    contributes the extension. Content is hashed while it is streamed to a
+    temporary file, which is then renamed into place, or discarded if a blob
+    with the same digest already exists. Identical uploads therefore share one
+    file and every name is immutable. Blobs are reference-counted by
+    system/blobs.py and removed by the collect_media command, never by delete()
+    on a shared name.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is derived from the content in _save(); never add suffixes.
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        if not _EXTENSION.match(extension):
+            extension = ''
+
+        tmp_dir = self.path(os.path.join(CAS_PREFIX, 'tmp'))
+        os.makedirs(tmp_dir, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            with os.fdopen(fd, 'wb') as tmp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            hexdigest = digest.hexdigest()
+            final_name = f"{CAS_PREFIX}{hexdigest[:2]}/{hexdigest[2:4]}/{hexdigest}{extension}"
+            final_path = self.path(final_name)
+            if os.path.exists(final_path):
+                os.unlink(tmp_path)
+                # Mark the blob as recently used so garbage collection leaves it alone.
+                os.utime(final_path)
+            else:
+                os.makedirs(os.path.dirname(final_path), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(tmp_path, self.file_permissions_mode)
+                os.replace(tmp_path, final_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return final_name
+
+_storage = ContentAddressedStorage()
+
+def content_addressed_storage():
+    """Storage callable for model fields, so migrations don't serialize the instance."""
+    return _storage
@@ -12,12 +12,15 @@ urlpatterns = [
     path('permissions/', PermissionListView.as_view(), name='permissionList'),
     path('assign-permission/', AssignPermissionView.as_view(), name='assignPermission'),
     path('remove-permission/', RemovePermissionView.as_view(), name='removePermission'),
+    path('bulk-assign-permissions/', BulkAssignPermissionView.as_view(), name='bulkAssignPermissions'),
+    path('bulk-remove-permissions/', BulkRemovePermissionView.as_view(), name='bulkRemovePermissions'),
     path('permissions/<int:user_id>/', UserPermissionsView.as_view(), name='userPermissions'),
 
     path('users/', UserListView.as_view(), name='UserList'),
     path('user/<int:user_id>/', UserDetailView.as_view(), name='UserDetail'),
 
     path('riders/', RiderListCreateView.as_view(), name='RiderListCreate'),
+    path('riders/import/', RiderImportView.as_view(), name='RiderImport'),
     path('riders/<int:pk>/', RiderRetrieveUpdateDeleteView.as_view(), name='RiderRetrieveUpdateDelete'),
 
     path('delivery-requests/', DeliveryRequestListView.as_view(), name='deliveryRequestList'),
@@ -30,6 +33,7 @@ urlpatterns = [
     path('rider-deliveries/', RiderDeliveryListView.as_view(), name='riderDeliveryList'),
     path('rider-delivery/', AddRiderDeliveryView.as_view(), name='addRiderDelivery'),
     path('rider-delivery/<int:pk>/', RiderDeliveryDetailView.as_view(), name='riderDeliveryDetail'),
+    path('job-offers/', SendJobOfferView.as_view(), name='sendJobOffer'),
 
     path('book-riders/', BookRiderListView.as_view(), name='bookRiderList'),
     path('book-rider/', BookRiderCreateView.as_view(), name='bookRiderCreate'),
@@ -43,4 +47,4 @@ urlpatterns = [
     path('book-rider-assignment/<int:pk>/', BookRiderAssignmentDetailView.as_view(), name='bookRiderAssignmentDetail'),
     path('book-rider-assignment/update/<int:pk>/', UpdateBookRiderAssignmentView.as_view(), name='updateBookRiderAssignment'),
     path('book-rider-assignment/delete/<int:pk>/', DeleteBookRiderAssignmentView.as_view(), name='deleteBookRiderAssignment'),
-]  + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]  + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
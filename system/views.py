@@ -1,9 +1,14 @@
 import logging
-from decimal import Decimal
+import tempfile
 from system.models import *
 from system.serializers import *
 from transactions.models import *
 from account.serializers import *
+from system.imports import DEFAULT_PASSWORD, import_riders, iter_rows, schedule_import_images
+from system.events import BookingStatusChanged, DeliveryStatusChanged, publish
+from system.assignments import RiderUnavailable, assign_booking, assign_delivery
+from system.offers import OfferError, offer_payload, send_offer
+from account.utils import resolve_permission_codenames, grant_user_permissions, revoke_user_permissions
 from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -186,6 +191,70 @@ class RemovePermissionView(APIView):
 
         return Response({"results": results}, status=status.HTTP_200_OK)
 
+class BulkPermissionView(APIView):
+    """
+    Base view for granting (`grant = True`) or revoking many permissions for many
+    users at once. Expects 'user_ids' and 'permission_codenames' lists; codenames
+    may be given as 'codename' or 'app_label.codename'.
+    """
+    permission_classes = [permissions.IsAdminUser]  # Restricted to admin users
+    grant = True
+    denied_message = "You do not have permission to change permissions."
+    success_message = "Permissions changed successfully."
+
+    def apply(self, user_ids, permission_ids):
+        change = grant_user_permissions if self.grant else revoke_user_permissions
+        return change(user_ids, permission_ids)
+
+    def post(self, request, *args, **kwargs):
+        if not request.user.is_superuser and not request.user.has_perm('auth.change_user'):
+            raise PermissionDenied({'message': self.denied_message})
+
+        user_ids = request.data.get('user_ids')
+        codenames = request.data.get('permission_codenames')
+        if not isinstance(user_ids, list) or not user_ids or not isinstance(codenames, list) or not codenames:
+            return Response(
+                {'message': "'user_ids' and 'permission_codenames' must be non-empty lists."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            user_ids = {int(user_id) for user_id in user_ids}
+        except (TypeError, ValueError):
+            return Response({'message': "'user_ids' must contain integers."}, status=status.HTTP_400_BAD_REQUEST)
+        codenames = list(dict.fromkeys(str(codename) for codename in codenames))
+
+        found_ids = set(User.objects.filter(id__in=user_ids).values_list('id', flat=True))
+        resolved, errors = resolve_permission_codenames(codenames)
+
+        affected = 0
+        if found_ids and resolved:
+            with transaction.atomic():
+                affected = self.apply(found_ids, set(resolved.values()))
+
+        return Response({
+            'message': self.success_message,
+            'affected': affected,
+            'users': len(found_ids),
+            'permissions': sorted(resolved),
+            'missing_user_ids': sorted(user_ids - found_ids),
+            'errors': [{'codename': codename, 'status': error} for codename, error in errors.items()],
+        }, status=status.HTTP_200_OK)
+
+class BulkAssignPermissionView(BulkPermissionView):
+    """
+    API view to assign permissions to many users in one request. Only superusers or users with 'change_user' permission can access.
+    """
+    denied_message = "You do not have permission to assign permissions."
+    success_message = "Permissions assigned successfully."
+
+class BulkRemovePermissionView(BulkPermissionView):
+    """
+    API view to remove permissions from many users in one request. Only superusers or users with 'change_user' permission can access.
+    """
+    grant = False
+    denied_message = "You do not have permission to remove permissions."
+    success_message = "Permissions removed successfully."
+
 class UserPermissionsView(APIView):
     """
     API view to retrieve all permissions of a specific user. Restricted to superusers or users with 'view_permission' permission.
@@ -320,6 +389,52 @@ class RiderListCreateView(generics.ListCreateAPIView):
             'data': RiderSerializer(rider).data
         }, status=status.HTTP_201_CREATED)
 
+class RiderImportView(APIView):
+    """
+    API view to bulk-create riders from a CSV/XLSX upload ('file') and an optional
+    zip of images ('images'). Rows are validated and inserted in chunks; images
+    are processed in the background after the response.
+    - Accessible to users with 'add_rider' permission.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        if not request.user.is_superuser and not request.user.has_perm('system.add_rider'):
+            raise PermissionDenied({'message': "You do not have permission to add riders."})
+
+        upload = request.FILES.get('file')
+        if not upload:
+            return Response({'message': "A CSV or XLSX 'file' is required."}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+
+        try:
+            result = import_riders(
+                iter_rows(upload.file, upload.name),
+                password=request.data.get('password') or DEFAULT_PASSWORD,
+                dry_run=dry_run,
+            )
+        except ValueError as e:
+            return Response({'message': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        images = request.FILES.get('images')
+        image_jobs = result['image_jobs']
+        if image_jobs and images:
+            with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as archive:
+                for chunk in images.chunks():
+                    archive.write(chunk)
+            schedule_import_images(archive.name, image_jobs)
+
+        logger.info(f"Rider import by user {request.user.id}: {result['created']} created, {len(result['errors'])} invalid row(s).")
+        return Response({
+            'message': 'Import validated.' if dry_run else 'Import completed.',
+            'rows': result['rows'],
+            'valid': result['valid'],
+            'created': result['created'],
+            'images_queued': len(image_jobs) if images else 0,
+            'errors': result['errors'][:100],
+            'error_count': len(result['errors']),
+        }, status=status.HTTP_200_OK)
+
 class RiderRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
     """
     API view to retrieve, update, or delete a Rider.
@@ -556,8 +671,13 @@ class CompleteDeliveryRequestView(generics.UpdateAPIView):
             )
 
         # Set status to 'Completed'
+        previous_status = delivery_request.status
         delivery_request.status = 'Completed'
-        delivery_request.save()
+        with transaction.atomic():
+            delivery_request.save()
+            publish(DeliveryStatusChanged(
+                delivery_request_id=delivery_request.pk, status='Completed', previous_status=previous_status,
+            ))
 
         # Update related RiderDelivery records
         rider_deliveries = RiderDelivery.objects.filter(
@@ -631,92 +751,10 @@ class AddRiderDeliveryView(generics.CreateAPIView):
         except DeliveryRequest.DoesNotExist:
             raise NotFound({'message': "Delivery request not found."})
 
-        # Check if the rider is available (no active, undelivered RiderDelivery)
-        if RiderDelivery.objects.filter(rider=rider, delivered=False).exists():
-            return Response(
-                {'message': "This rider is not available at the moment."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Wrap the entire operation in an atomic transaction.
         try:
-            with transaction.atomic():
-                # Create the RiderDelivery entry
-                rider_delivery = RiderDelivery.objects.create(
-                    rider=rider,
-                    delivery_request=delivery_request,
-                    delivered=False,
-                    assigned_at=timezone.now(),
-                    last_assigned_at=timezone.now()
-                )
-
-                # Update the delivery request's status to "Accepted"
-                delivery_request.status = 'Accepted'
-                delivery_request.save()
-
-                # --- TRANSACTION DISPATCH LOGIC ---
-                # Convert delivery_price into a Decimal; default to 0 if not set
-                try:
-                    if delivery_request.delivery_price:
-                        price = Decimal(str(delivery_request.delivery_price))
-                    else:
-                        price = Decimal('0.00')
-                except (InvalidOperation, TypeError) as conv_err:
-                    logger.error(f"Error converting delivery_price '{delivery_request.delivery_price}' to Decimal: {conv_err}")
-                    price = Decimal('0.00')
-
-                logger.debug(f"Delivery price converted to Decimal: {price}")
-
-                # Calculate shares based on whether a commissioner is assigned.
-                rider_share = (price * Decimal('0.90')).quantize(Decimal('0.01'))
-                commissioner_obj = rider.commissioner  # already a User instance (or None)
-                boss_obj = rider.boss                # already a User instance (or None)
-
-                if commissioner_obj:
-                    commission_share = (price * Decimal('0.03')).quantize(Decimal('0.01'))
-                    boss_share = (price * Decimal('0.07')).quantize(Decimal('0.01'))
-                else:
-                    commission_share = Decimal('0.00')
-                    boss_share = (price * Decimal('0.10')).quantize(Decimal('0.01'))
-
-                logger.debug(f"Calculated shares: rider_share={rider_share}, commission_share={commission_share}, boss_share={boss_share}")
-
-                # Retrieve associated User objects.
-                # rider.user is the associated user from the Rider model.
-                rider_user = rider.user
-                commissioner_user = commissioner_obj  if commissioner_obj else None  # Use directly
-                boss_user = boss_obj if boss_obj else None  # Use directly
-
-                # Get or create the Transaction record (wallet) for this combination
-                transaction_obj, created = Transaction.objects.get_or_create(
-                    rider=rider_user,
-                    commissioner=commissioner_user,
-                    boss=boss_user,
-                    defaults={
-                        'rider_total': Decimal('0.00'),
-                        'commissioner_total': Decimal('0.00'),
-                        'boss_total': Decimal('0.00')
-                    }
-                )
-                # Update wallet totals
-                transaction_obj.rider_total += rider_share
-                if commissioner_user:
-                    transaction_obj.commissioner_total += commission_share
-                    transaction_obj.boss_total += boss_share
-                else:
-                    transaction_obj.boss_total += boss_share
-                transaction_obj.save()
-                logger.debug(f"Transaction record updated: {transaction_obj}")
-
-                # Create a TransactionHistory record for this event
-                TransactionHistory.objects.create(
-                    transaction=transaction_obj,
-                    delivery_request=delivery_request,
-                    rider_amount=rider_share,
-                    commissioner_amount=commission_share,
-                    boss_amount=boss_share
-                )
-                logger.debug("TransactionHistory record created successfully.")
+            rider_delivery = assign_delivery(rider, delivery_request)
+        except RiderUnavailable as e:
+            return Response({'message': e.message}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error dispatching transaction amounts: {e}", exc_info=True)
             raise e
@@ -967,8 +1005,11 @@ class CompleteBookRiderView(generics.UpdateAPIView):
             )
 
         # Set status to 'Completed'
+        previous_status = book_rider.status
         book_rider.status = 'Completed'
-        book_rider.save()
+        with transaction.atomic():
+            book_rider.save()
+            publish(BookingStatusChanged(book_rider_id=book_rider.pk, status='Completed', previous_status=previous_status))
 
         # Update related BookRiderAssignment records
         rider_assignment = BookRiderAssignment.objects.filter(
@@ -1057,91 +1098,10 @@ class AddBookRiderAssignmentView(generics.CreateAPIView):
         except BookRider.DoesNotExist:
             raise NotFound({'message': "booking rider not found."})
 
-        # Check if the rider is available (no active, undelivered BookRiderAssignment)
-        if BookRiderAssignment.objects.filter(rider=rider, delivered=False).exists():
-            return Response(
-                {'message': "This rider is not available at the moment."},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-
-        # Wrap the entire operation in an atomic transaction.
         try:
-            with transaction.atomic():
-                # Create the BookRiderAssignment entry
-                rider_booking = BookRiderAssignment.objects.create(
-                    rider=rider,
-                    book_rider=book_rider,
-                    delivered=False,
-                    assigned_at=timezone.now(),
-                )
-
-                # Update the booking rider's status to "Accepted"
-                book_rider.status = 'Accepted'
-                book_rider.save()
-
-                # --- TRANSACTION DISPATCH LOGIC ---
-                # Convert booking_price into a Decimal; default to 0 if not set
-                try:
-                    if book_rider.booking_price:
-                        price = Decimal(str(book_rider.booking_price))
-                    else:
-                        price = Decimal('0.00')
-                except (InvalidOperation, TypeError) as conv_err:
-                    logger.error(f"Error converting booking_price '{book_rider.booking_price}' to Decimal: {conv_err}")
-                    price = Decimal('0.00')
-
-                logger.debug(f"Booking price converted to Decimal: {price}")
-
-                # Calculate shares based on whether a commissioner is assigned.
-                rider_share = (price * Decimal('0.90')).quantize(Decimal('0.01'))
-                commissioner_obj = rider.commissioner  # already a User instance (or None)
-                boss_obj = rider.boss                # already a User instance (or None)
-
-                if commissioner_obj:
-                    commission_share = (price * Decimal('0.03')).quantize(Decimal('0.01'))
-                    boss_share = (price * Decimal('0.07')).quantize(Decimal('0.01'))
-                else:
-                    commission_share = Decimal('0.00')
-                    boss_share = (price * Decimal('0.10')).quantize(Decimal('0.01'))
-
-                logger.debug(f"Calculated shares: rider_share={rider_share}, commission_share={commission_share}, boss_share={boss_share}")
-
-                # Retrieve associated User objects.
-                # rider.user is the associated user from the Rider model.
-                rider_user = rider.user
-                commissioner_user = commissioner_obj  if commissioner_obj else None  # Use directly
-                boss_user = boss_obj if boss_obj else None  # Use directly
-
-                # Get or create the Transaction record (wallet) for this combination
-                transaction_obj, created = Transaction.objects.get_or_create(
-                    rider=rider_user,
-                    commissioner=commissioner_user,
-                    boss=boss_user,
-                    defaults={
-                        'rider_total': Decimal('0.00'),
-                        'commissioner_total': Decimal('0.00'),
-                        'boss_total': Decimal('0.00')
-                    }
-                )
-                # Update wallet totals
-                transaction_obj.rider_total += rider_share
-                if commissioner_user:
-                    transaction_obj.commissioner_total += commission_share
-                    transaction_obj.boss_total += boss_share
-                else:
-                    transaction_obj.boss_total += boss_share
-                transaction_obj.save()
-                logger.debug(f"Transaction record updated: {transaction_obj}")
-
-                # Create a TransactionHistory record for this event
-                TransactionHistory.objects.create(
-                    transaction=transaction_obj,
-                    book_rider=book_rider,
-                    rider_amount=rider_share,
-                    commissioner_amount=commission_share,
-                    boss_amount=boss_share
-                )
-                logger.debug("TransactionHistory record created successfully.")
+            rider_booking = assign_booking(rider, book_rider)
+        except RiderUnavailable as e:
+            return Response({'message': e.message}, status=status.HTTP_400_BAD_REQUEST)
         except Exception as e:
             logger.error(f"Error dispatching transaction amounts: {e}", exc_info=True)
             raise e
@@ -1156,6 +1116,49 @@ class AddBookRiderAssignmentView(generics.CreateAPIView):
             status=status.HTTP_201_CREATED
         )
 
+class SendJobOfferView(APIView):
+    """
+    API view to offer a pending delivery request or rider booking to a rider.
+    - Accessible only to authenticated users with the 'add_riderdelivery' or
+      'add_bookriderassignment' permission.
+    - The offer is pushed to the rider's open sockets (/ws/riders/); accepting
+      it assigns the rider like AddRiderDeliveryView / AddBookRiderAssignmentView.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        rider_id = request.data.get('rider_id')
+        delivery_request_id = request.data.get('delivery_request_id')
+        book_rider_id = request.data.get('book_rider_id')
+
+        if not rider_id or bool(delivery_request_id) == bool(book_rider_id):
+            return Response(
+                {'message': "'rider_id' and exactly one of 'delivery_request_id' or 'book_rider_id' are required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        permission = 'system.add_riderdelivery' if delivery_request_id else 'system.add_bookriderassignment'
+        if not request.user.is_superuser and not request.user.has_perm(permission):
+            raise PermissionDenied({'message': "You do not have permission to offer jobs to riders."})
+
+        try:
+            rider = Rider.objects.get(id=rider_id)
+        except Rider.DoesNotExist:
+            raise NotFound({'message': "Rider not found."})
+        try:
+            delivery_request = DeliveryRequest.objects.get(id=delivery_request_id) if delivery_request_id else None
+            book_rider = BookRider.objects.get(id=book_rider_id) if book_rider_id else None
+        except (DeliveryRequest.DoesNotExist, BookRider.DoesNotExist):
+            raise NotFound({'message': "Job not found."})
+
+        try:
+            offer = send_offer(rider, delivery_request=delivery_request, book_rider=book_rider)
+        except OfferError as e:
+            return Response({'message': e.message}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {'message': "Job offered to rider successfully.", 'offer': offer_payload(offer)},
+            status=status.HTTP_201_CREATED
+        )
+
 class BookRiderAssignmentDetailView(generics.RetrieveAPIView):
     """
     API view to retrieve details of a BookRiderAssignment by its ID.
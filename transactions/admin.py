@@ -16,3 +16,19 @@ class TransactionHistoryAdmin(admin.ModelAdmin):
         'rider_amount', 'commissioner_amount', 'boss_amount', 'created_at'
     )
     ordering = ('-created_at',)
+
+@admin.register(EarningsRollup)
+class EarningsRollupAdmin(admin.ModelAdmin):
+    list_display = ('id', 'party', 'role', 'period', 'period_start', 'amount', 'count', 'updated_at')
+    list_filter = ('role', 'period')
+    search_fields = ('party__name', 'party__email')
+    ordering = ('-period_start',)
+    list_select_related = ('party',)
+
+@admin.register(PaymentEvent)
+class PaymentEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'provider', 'event_type', 'tx_ref', 'status', 'attempts', 'received_at', 'processed_at')
+    list_filter = ('provider', 'status', 'processed_at')
+    search_fields = ('tx_ref', 'event_key')
+    ordering = ('-received_at',)
+    readonly_fields = ('received_at',)
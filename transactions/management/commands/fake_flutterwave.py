@@ -0,0 +1,113 @@
+import json
+import time
+import zlib
+import random
+import requests
+from django.conf import settings
+from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from django.core.management.base import BaseCommand, CommandError
+
+class Command(BaseCommand):
+    help = (
+        "Local stand-in for Flutterwave. 'webhooks' replays signed charge.completed "
+        "events (with duplicate retries) against a webhook URL; 'serve' runs a mock "
+        "verify_by_reference API for reconcile_pending_payments --api-url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=['webhooks', 'serve'])
+        parser.add_argument('--url', default='http://127.0.0.1:8000/api/transactions/webhooks/flutterwave/', help='Webhook endpoint to call.')
+        parser.add_argument('--tx-ref', action='append', dest='tx_refs', default=[], help='tx_ref to report (repeatable). Defaults to random references.')
+        parser.add_argument('--count', type=int, default=100, help='Number of distinct events when no --tx-ref is given.')
+        parser.add_argument('--status', default='successful', help='Charge status to report.')
+        parser.add_argument('--retries', type=int, default=3, help='Times each event is delivered, simulating provider retry storms.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Number of concurrent deliveries.')
+        parser.add_argument('--port', type=int, default=8099, help="Port for 'serve'.")
+        parser.add_argument('--latency-ms', type=int, default=50, help="Simulated provider latency for 'serve'.")
+
+    def handle(self, *args, **options):
+        if options['action'] == 'serve':
+            return self.serve(options)
+
+        secret_hash = settings.FLUTTERWAVE_SECRET_HASH
+        if not secret_hash:
+            raise CommandError("FLUTTERWAVE_SECRET_HASH must be set to sign fake webhooks.")
+        self.send_webhooks(secret_hash, options)
+
+    def send_webhooks(self, secret_hash, options):
+        tx_refs = options['tx_refs'] or [f"fake-{random.randint(10**8, 10**9)}" for _ in range(options['count'])]
+        events = []
+        for tx_ref in tx_refs:
+            charge_id = zlib.crc32(tx_ref.encode())
+            payload = {
+                'event': 'charge.completed',
+                'data': {
+                    'id': charge_id,
+                    'tx_ref': tx_ref,
+                    'flw_ref': f"FLW-FAKE-{charge_id}",
+                    'status': options['status'],
+                },
+            }
+            events.extend([payload] * options['retries'])
+        random.shuffle(events)
+
+        session = requests.Session()
+        headers = {'verif-hash': secret_hash, 'Content-Type': 'application/json'}
+
+        def deliver(payload):
+            return session.post(options['url'], data=json.dumps(payload), headers=headers, timeout=10).status_code
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            codes = list(pool.map(deliver, events))
+        elapsed = time.monotonic() - started
+
+        failures = sum(1 for code in codes if code != 200)
+        self.stdout.write(
+            f"Delivered {len(codes)} webhook(s) for {len(tx_refs)} tx_ref(s) in {elapsed:.2f}s "
+            f"({len(codes) / elapsed:.0f}/s), {failures} non-200 response(s)."
+        )
+
+    def serve(self, options):
+        """
+        Answer GET /transactions/verify_by_reference like Flutterwave. Every
+        reference reports --status, except tx_refs containing 'unknown' (404).
+        """
+        charge_status = options['status']
+        latency = options['latency_ms'] / 1000
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                tx_ref = (parse_qs(url.query).get('tx_ref') or [''])[0]
+                time.sleep(latency)
+                if not url.path.endswith('/transactions/verify_by_reference') or not tx_ref or 'unknown' in tx_ref:
+                    code, body = 404, {'status': 'error', 'message': 'No transaction was found for this id', 'data': None}
+                else:
+                    code, body = 200, {
+                        'status': 'success',
+                        'message': 'Transaction fetched successfully',
+                        'data': {'id': zlib.crc32(tx_ref.encode()), 'tx_ref': tx_ref, 'status': charge_status},
+                    }
+                payload = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(f"Fake Flutterwave API listening on http://127.0.0.1:{options['port']} (status={charge_status}).")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from transactions.payments import process_payment_events
+
+class Command(BaseCommand):
+    help = "Apply queued payment webhook events to DeliveryRequest and BookRider payment statuses."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Number of events claimed per transaction.')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the inbox instead of exiting once it is empty.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep between polls when the inbox is empty.')
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            processed = process_payment_events(batch_size=options['batch_size'])
+            total += processed
+            if processed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} payment event(s)."))
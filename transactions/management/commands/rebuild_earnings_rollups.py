@@ -0,0 +1,15 @@
+import time
+from django.core.management.base import BaseCommand
+from transactions.utils import rebuild_rollups
+
+class Command(BaseCommand):
+    help = "Recompute all EarningsRollup buckets from TransactionHistory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Number of buckets inserted per bulk_create.')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        written = rebuild_rollups(batch_size=options['batch_size'])
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} earnings bucket(s) ({elapsed:.1f}s)."))
@@ -0,0 +1,41 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from transactions.payments import FlutterwaveClient, reconcile_pending_payments
+
+class Command(BaseCommand):
+    help = (
+        "Query Flutterwave for DeliveryRequest/BookRider payments stuck in 'Pending' "
+        "and bulk-apply the reported statuses."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stale-minutes', type=int, default=30, help='Only check payments pending for longer than this.')
+        parser.add_argument('--batch-size', type=int, default=200, help='Number of tx_refs selected and updated per batch.')
+        parser.add_argument('--concurrency', type=int, default=16, help='Maximum concurrent provider lookups.')
+        parser.add_argument('--api-url', default=None, help='Override FLUTTERWAVE_API_URL, e.g. a local fake_flutterwave server.')
+        parser.add_argument('--loop', action='store_true', help='Repeat the reconciliation every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=300.0, help='Seconds between runs when --loop is set.')
+
+    def handle(self, *args, **options):
+        client = FlutterwaveClient(api_url=options['api_url'], concurrency=options['concurrency'])
+        try:
+            while True:
+                started = time.monotonic()
+                result = reconcile_pending_payments(
+                    client,
+                    stale_after=timedelta(minutes=options['stale_minutes']),
+                    batch_size=options['batch_size'],
+                    concurrency=options['concurrency'],
+                )
+                elapsed = time.monotonic() - started
+                rate = result['checked'] / elapsed * 60 if elapsed else 0
+                self.stdout.write(self.style.SUCCESS(
+                    f"Checked {result['checked']} pending payment(s), updated {result['updated']} "
+                    f"in {elapsed:.2f}s ({rate:.0f}/min)."
+                ))
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        finally:
+            client.close()
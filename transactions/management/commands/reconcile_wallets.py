@@ -0,0 +1,36 @@
+import time
+from django.core.management.base import BaseCommand
+from transactions.utils import reconcile_wallets
+
+class Command(BaseCommand):
+    help = (
+        "Verify that Transaction wallet totals match the sum of their TransactionHistory "
+        "rows. Wallets are streamed in chunks; use --repair to overwrite drifted totals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Number of wallets checked per grouped query.')
+        parser.add_argument('--repair', action='store_true', help='Overwrite mismatching totals with the history sums.')
+        parser.add_argument('--limit', type=int, default=0, help='Stop reporting after this many mismatches (0 = no limit).')
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        mismatches = 0
+
+        for mismatch in reconcile_wallets(chunk_size=options['chunk_size'], repair=options['repair']):
+            mismatches += 1
+            if options['limit'] and mismatches > options['limit']:
+                continue
+            details = ', '.join(
+                f"{field}: stored={stored} expected={expected}"
+                for field, (stored, expected) in mismatch['diffs'].items()
+            )
+            self.stdout.write(f"Transaction {mismatch['transaction_id']}: {details}")
+
+        elapsed = time.monotonic() - started
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS(f"All wallets are consistent ({elapsed:.1f}s)."))
+        elif options['repair']:
+            self.stdout.write(self.style.WARNING(f"Repaired {mismatches} wallet(s) ({elapsed:.1f}s)."))
+        else:
+            self.stdout.write(self.style.ERROR(f"Found {mismatches} inconsistent wallet(s) ({elapsed:.1f}s)."))
@@ -0,0 +1,37 @@
+# Generated by Django 5.0 on 2026-10-19 00:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_transactionhistory_book_rider_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EarningsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('rider', 'Rider'), ('commissioner', 'Commissioner'), ('boss', 'Boss')], max_length=20)),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week'), ('month', 'Month')], max_length=10)),
+                ('period_start', models.DateField(help_text='First day of the bucket (weeks start on Monday)')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('count', models.PositiveIntegerField(default=0, help_text='Number of histories aggregated in this bucket')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('party', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='earnings_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Earnings Rollup',
+                'verbose_name_plural': 'Earnings Rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='earningsrollup',
+            constraint=models.UniqueConstraint(fields=('party', 'role', 'period', 'period_start'), name='unique_earnings_rollup_bucket'),
+        ),
+    ]
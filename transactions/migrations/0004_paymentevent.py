@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-19 00:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_earningsrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('flutterwave', 'Flutterwave')], default='flutterwave', max_length=20)),
+                ('event_key', models.CharField(help_text='Provider event identity used to drop duplicate deliveries', max_length=255, unique=True)),
+                ('event_type', models.CharField(blank=True, max_length=100, null=True)),
+                ('tx_ref', models.CharField(blank=True, db_index=True, max_length=255, null=True)),
+                ('status', models.CharField(blank=True, help_text='Payment status reported by the provider', max_length=50, null=True)),
+                ('payload', models.JSONField(default=dict)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('received_at', models.DateTimeField(auto_now_add=True)),
+                ('processed_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Payment Event',
+                'verbose_name_plural': 'Payment Events',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -62,4 +62,72 @@ class TransactionHistory(models.Model):
         elif self.book_rider:
             return f"History for Transaction {self.transaction.id} (BookRider {self.book_rider.id})"
         else:
-            return f"History for Transaction {self.transaction.id}"
\ No newline at end of file
+            return f"History for Transaction {self.transaction.id}"
+
+class EarningsRollup(models.Model):
+    """
+    Pre-aggregated earnings per party, role and time bucket.
+    Maintained incrementally whenever a TransactionHistory row is inserted.
+    """
+    ROLE_CHOICES = [
+        ('rider', 'Rider'),
+        ('commissioner', 'Commissioner'),
+        ('boss', 'Boss'),
+    ]
+
+    PERIOD_CHOICES = [
+        ('day', 'Day'),
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+
+    party = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='earnings_rollups'
+    )
+    role = models.CharField(max_length=20, choices=ROLE_CHOICES)
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    period_start = models.DateField(help_text='First day of the bucket (weeks start on Monday)')
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0, help_text='Number of histories aggregated in this bucket')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Earnings Rollup'
+        verbose_name_plural = 'Earnings Rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['party', 'role', 'period', 'period_start'], name='unique_earnings_rollup_bucket'),
+        ]
+
+    def __str__(self):
+        return f"{self.role} {self.party_id} - {self.period} {self.period_start}: {self.amount}"
+
+class PaymentEvent(models.Model):
+    """
+    Inbox of raw payment provider webhook events.
+    Rows are written by the webhook endpoint and applied later by the
+    process_payment_events worker; `event_key` makes provider retries no-ops.
+    """
+    PROVIDER_CHOICES = [
+        ('flutterwave', 'Flutterwave'),
+    ]
+
+    provider = models.CharField(max_length=20, choices=PROVIDER_CHOICES, default='flutterwave')
+    event_key = models.CharField(max_length=255, unique=True, help_text='Provider event identity used to drop duplicate deliveries')
+    event_type = models.CharField(max_length=100, null=True, blank=True)
+    tx_ref = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    status = models.CharField(max_length=50, null=True, blank=True, help_text='Payment status reported by the provider')
+    payload = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(null=True, blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Payment Event'
+        verbose_name_plural = 'Payment Events'
+
+    def __str__(self):
+        return f"{self.provider} {self.event_type} - {self.tx_ref} ({self.status})"
@@ -0,0 +1,238 @@
+import hmac
+import logging
+import requests
+from datetime import timedelta
+from collections import defaultdict
+from web.models import BookRider
+from django.conf import settings
+from django.utils import timezone
+from django.db import transaction
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
+from system.models import DeliveryRequest
+from transactions.models import PaymentEvent
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Flutterwave charge status -> payment_status choice on DeliveryRequest/BookRider.
+FLUTTERWAVE_STATUS_MAP = {
+    'successful': 'Successful',
+    'succeeded': 'Successful',
+    'failed': 'Failed',
+    'cancelled': 'Cancelled',
+    'refunded': 'Refunded',
+}
+
+# Precedence of payment statuses. A status only replaces one ranked below it,
+# so a late or redelivered event never moves a payment backwards.
+PAYMENT_STATUS_RANK = {
+    'Pending': 0,
+    'Failed': 1,
+    'Cancelled': 1,
+    'Successful': 2,
+    'Refunded': 3,
+}
+
+# Models whose payment_status is driven by a Flutterwave tx_ref.
+PAYABLE_MODELS = [DeliveryRequest, BookRider]
+
+def verify_flutterwave_signature(request):
+    """
+    Check the 'verif-hash' header against FLUTTERWAVE_SECRET_HASH in constant time.
+    """
+    secret_hash = getattr(settings, 'FLUTTERWAVE_SECRET_HASH', None)
+    signature = request.headers.get('verif-hash')
+    if not secret_hash or not signature:
+        return False
+    return hmac.compare_digest(signature.encode(), secret_hash.encode())
+
+def build_payment_event(payload):
+    """
+    Build an unsaved PaymentEvent from a Flutterwave webhook payload.
+    The event key combines the event type, provider id and status so a
+    retried delivery maps onto the row that was already stored.
+    """
+    data = payload.get('data') or {}
+    event_type = payload.get('event') or payload.get('event.type')
+    tx_ref = data.get('tx_ref') or data.get('txRef')
+    provider_status = (data.get('status') or '').lower() or None
+    identity = data.get('id') or data.get('flw_ref') or tx_ref
+    return PaymentEvent(
+        provider='flutterwave',
+        event_key=f"flutterwave:{event_type}:{identity}:{provider_status}",
+        event_type=event_type,
+        tx_ref=tx_ref,
+        status=provider_status,
+        payload=payload,
+    )
+
+def record_payment_event(payload):
+    """
+    Store a webhook payload in the inbox. Duplicate deliveries are dropped
+    by the unique event_key constraint in the same INSERT.
+    """
+    PaymentEvent.objects.bulk_create([build_payment_event(payload)], ignore_conflicts=True)
+
+def apply_payment_statuses(statuses, pending_only=False):
+    """
+    Set payment_status for every DeliveryRequest/BookRider whose tx_ref is in
+    `statuses` ({tx_ref: payment_status}). Each UPDATE is conditional on the
+    current status ranking below the new one (PAYMENT_STATUS_RANK), so a
+    Successful payment is never turned back into Failed or Pending. With
+    `pending_only`, only rows still 'Pending' are changed. Returns the set of
+    tx_refs that matched a record and the number of rows updated.
+    """
+    now = timezone.now()
+    by_status = defaultdict(list)
+    for tx_ref, payment_status in statuses.items():
+        by_status[payment_status].append(tx_ref)
+
+    matched = set()
+    updated = 0
+    for model in PAYABLE_MODELS:
+        matched.update(model.objects.filter(tx_ref__in=list(statuses)).values_list('tx_ref', flat=True))
+        for payment_status, tx_refs in by_status.items():
+            lower = [status for status, rank in PAYMENT_STATUS_RANK.items() if rank < PAYMENT_STATUS_RANK[payment_status]]
+            if pending_only:
+                lower = [status for status in lower if status == 'Pending']
+            updated += model.objects.filter(tx_ref__in=tx_refs, payment_status__in=lower).update(
+                payment_status=payment_status, updated_at=now,
+            )
+    return matched, updated
+
+def process_payment_events(batch_size=500):
+    """
+    Apply one batch of unprocessed inbox events.
+
+    Events are claimed with SKIP LOCKED so several workers can drain the inbox
+    concurrently. Only the highest-ranked status per tx_ref is applied, and
+    every claimed event is marked processed in the same transaction. Returns
+    the number of events consumed.
+    """
+    with transaction.atomic():
+        events = list(
+            PaymentEvent.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return 0
+
+        statuses = {}
+        for event in events:
+            payment_status = FLUTTERWAVE_STATUS_MAP.get(event.status or '')
+            if event.tx_ref and payment_status:
+                current = statuses.get(event.tx_ref)
+                if current is None or PAYMENT_STATUS_RANK[payment_status] > PAYMENT_STATUS_RANK[current]:
+                    statuses[event.tx_ref] = payment_status
+
+        matched, _ = apply_payment_statuses(statuses) if statuses else (set(), 0)
+
+        now = timezone.now()
+        for event in events:
+            event.attempts += 1
+            event.processed_at = now
+            if not event.tx_ref:
+                event.last_error = 'Event has no tx_ref.'
+            elif event.tx_ref not in statuses:
+                event.last_error = f"Ignored provider status '{event.status}'."
+            elif event.tx_ref not in matched:
+                event.last_error = 'No delivery request or booking with this tx_ref.'
+            else:
+                event.last_error = None
+        PaymentEvent.objects.bulk_update(events, ['attempts', 'processed_at', 'last_error'])
+
+    logger.info(f"Processed {len(events)} payment event(s); {len(matched)} tx_ref(s) matched.")
+    return len(events)
+
+class FlutterwaveClient:
+    """
+    Thin Flutterwave API client backed by one pooled, keep-alive requests.Session.
+    The connection pool is sized to `concurrency` so parallel lookups reuse sockets.
+    """
+
+    def __init__(self, api_url=None, secret_key=None, concurrency=16, timeout=10):
+        self.api_url = (api_url or settings.FLUTTERWAVE_API_URL).rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=concurrency,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], allowed_methods=['GET']),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        secret_key = secret_key or settings.FLUTTERWAVE_SECRET_KEY
+        if secret_key:
+            self.session.headers['Authorization'] = f"Bearer {secret_key}"
+
+    def verify_by_reference(self, tx_ref):
+        """
+        Return the payment_status Flutterwave reports for `tx_ref`, or None when
+        the charge is unknown, still pending, or the lookup failed.
+        """
+        try:
+            response = self.session.get(
+                f"{self.api_url}/transactions/verify_by_reference",
+                params={'tx_ref': tx_ref},
+                timeout=self.timeout,
+            )
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            data = response.json().get('data') or {}
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Failed to verify Flutterwave tx_ref {tx_ref}: {e}")
+            return None
+        return FLUTTERWAVE_STATUS_MAP.get((data.get('status') or '').lower())
+
+    def close(self):
+        self.session.close()
+
+def iter_stale_pending_tx_refs(model, older_than, batch_size=200):
+    """
+    Yield lists of tx_refs for `model` rows still 'Pending' and created before
+    `older_than`, walking the table by primary key.
+    """
+    last_id = 0
+    while True:
+        rows = list(
+            model.objects.filter(
+                id__gt=last_id,
+                payment_status='Pending',
+                tx_ref__isnull=False,
+                created_at__lt=older_than,
+            ).order_by('id').values_list('id', 'tx_ref')[:batch_size]
+        )
+        if not rows:
+            return
+        yield [tx_ref for _, tx_ref in rows]
+        last_id = rows[-1][0]
+
+def reconcile_pending_payments(client, stale_after=timedelta(minutes=30), batch_size=200, concurrency=16):
+    """
+    Ask the provider for the status of every stale pending payment and apply
+    the answers with conditional updates that only touch rows still 'Pending',
+    so a slow answer cannot overwrite a status the webhook worker applied in
+    the meantime. Lookups run on a bounded thread pool that shares the
+    client's connection pool.
+
+    Returns a dict with the number of references checked and rows updated.
+    """
+    older_than = timezone.now() - stale_after
+    checked = updated = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for model in PAYABLE_MODELS:
+            for tx_refs in iter_stale_pending_tx_refs(model, older_than, batch_size):
+                results = pool.map(client.verify_by_reference, tx_refs)
+                statuses = {
+                    tx_ref: payment_status
+                    for tx_ref, payment_status in zip(tx_refs, results)
+                    if payment_status
+                }
+                checked += len(tx_refs)
+                if statuses:
+                    _, changed = apply_payment_statuses(statuses, pending_only=True)
+                    updated += changed
+    return {'checked': checked, 'updated': updated}
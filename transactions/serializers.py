@@ -24,3 +24,8 @@ class TransactionSerializer(serializers.ModelSerializer):
         model = Transaction
         exclude = ['created_at', 'updated_at']
         fields = ['__all__']
+
+class EarningsRollupSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = EarningsRollup
+        fields = ['period_start', 'amount', 'count']
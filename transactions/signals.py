@@ -0,0 +1,10 @@
+from django.dispatch import receiver
+from django.db.models.signals import post_save
+from transactions.models import TransactionHistory
+from transactions.utils import apply_history_to_rollups
+
+@receiver(post_save, sender=TransactionHistory)
+def update_earnings_rollups(sender, instance, created, raw=False, **kwargs):
+    """Keep EarningsRollup buckets in step with every new TransactionHistory."""
+    if created and not raw:
+        apply_history_to_rollups(instance)
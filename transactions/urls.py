@@ -7,4 +7,6 @@ app_name = 'transactions'
 
 urlpatterns = [
     path('', TransactionListView.as_view(), name='transaction_list'),
-]  + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    path('earnings/', EarningsView.as_view(), name='earnings'),
+    path('webhooks/flutterwave/', FlutterwaveWebhookView.as_view(), name='flutterwave_webhook'),
+]  + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
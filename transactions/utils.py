@@ -0,0 +1,163 @@
+from decimal import Decimal
+from datetime import timedelta
+from django.utils import timezone
+from django.db.models import F, Sum, Count
+from django.db import IntegrityError, transaction
+from django.db.models.functions import TruncDay, TruncWeek, TruncMonth
+from transactions.models import Transaction, TransactionHistory, EarningsRollup
+
+# Wallet total field -> the TransactionHistory column it is the running sum of.
+WALLET_FIELDS = {
+    'rider_total': 'rider_amount',
+    'commissioner_total': 'commissioner_amount',
+    'boss_total': 'boss_amount',
+}
+
+def iter_wallet_chunks(chunk_size=1000):
+    """
+    Yield Transaction wallets in primary-key order, `chunk_size` at a time.
+    Uses keyset pagination so memory stays bounded regardless of table size.
+    """
+    last_id = 0
+    fields = ['id', *WALLET_FIELDS]
+    while True:
+        chunk = list(
+            Transaction.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .only(*fields)[:chunk_size]
+        )
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].id
+
+def history_sums(transaction_ids):
+    """
+    Return {transaction_id: {wallet_field: Decimal}} for the given wallets,
+    computed with a single grouped query.
+    """
+    rows = (
+        TransactionHistory.objects.filter(transaction_id__in=transaction_ids)
+        .values('transaction_id')
+        .order_by()
+        .annotate(**{field: Sum(column) for field, column in WALLET_FIELDS.items()})
+    )
+    return {
+        row['transaction_id']: {field: row[field] or Decimal('0.00') for field in WALLET_FIELDS}
+        for row in rows
+    }
+
+def reconcile_wallets(chunk_size=1000, repair=False):
+    """
+    Compare every wallet's stored totals against the sum of its histories.
+
+    Yields one dict per mismatching wallet with the stored and expected values.
+    When `repair` is True the stored totals of each chunk are overwritten with
+    the expected values using a single bulk update.
+    """
+    for chunk in iter_wallet_chunks(chunk_size):
+        sums = history_sums([wallet.id for wallet in chunk])
+        to_repair = []
+        for wallet in chunk:
+            expected = sums.get(wallet.id, {field: Decimal('0.00') for field in WALLET_FIELDS})
+            diffs = {
+                field: (getattr(wallet, field), expected[field])
+                for field in WALLET_FIELDS
+                if getattr(wallet, field) != expected[field]
+            }
+            if not diffs:
+                continue
+            yield {'transaction_id': wallet.id, 'diffs': diffs}
+            if repair:
+                for field, (stored, value) in diffs.items():
+                    setattr(wallet, field, value)
+                to_repair.append(wallet)
+        if to_repair:
+            # bulk_update bypasses auto_now, so updated_at keeps its last business change.
+            Transaction.objects.bulk_update(to_repair, list(WALLET_FIELDS), batch_size=chunk_size)
+
+# Rollup role -> (party column on Transaction, amount column on TransactionHistory).
+ROLLUP_ROLES = {
+    'rider': ('rider_id', 'rider_amount'),
+    'commissioner': ('commissioner_id', 'commissioner_amount'),
+    'boss': ('boss_id', 'boss_amount'),
+}
+
+ROLLUP_TRUNCATORS = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+}
+
+def period_start(day, period):
+    """Return the first day of the `period` bucket containing `day`."""
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+def _increment_rollup(party_id, role, period, start, amount):
+    """Add `amount` to one rollup bucket, creating it on first use."""
+    lookup = {'party_id': party_id, 'role': role, 'period': period, 'period_start': start}
+    updates = {'amount': F('amount') + amount, 'count': F('count') + 1, 'updated_at': timezone.now()}
+    if EarningsRollup.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            EarningsRollup.objects.create(amount=amount, count=1, **lookup)
+    except IntegrityError:
+        # Another writer created the bucket between our update and insert.
+        EarningsRollup.objects.filter(**lookup).update(**updates)
+
+def apply_history_to_rollups(history):
+    """
+    Fold a newly inserted TransactionHistory into the day, week and month
+    buckets of each party that earned from it.
+    """
+    wallet = history.transaction
+    day = timezone.localdate(history.created_at)
+    for role, (party_column, amount_column) in ROLLUP_ROLES.items():
+        party_id = getattr(wallet, party_column)
+        amount = getattr(history, amount_column) or Decimal('0.00')
+        if not party_id or not amount:
+            continue
+        for period in ROLLUP_TRUNCATORS:
+            _increment_rollup(party_id, role, period, period_start(day, period), amount)
+
+def rebuild_rollups(batch_size=1000):
+    """
+    Recompute every rollup bucket from TransactionHistory.
+    Returns the number of buckets written.
+    """
+    written = 0
+    with transaction.atomic():
+        EarningsRollup.objects.all().delete()
+        for role, (party_column, amount_column) in ROLLUP_ROLES.items():
+            for period, truncator in ROLLUP_TRUNCATORS.items():
+                rows = (
+                    TransactionHistory.objects.filter(**{f'transaction__{party_column}__isnull': False})
+                    .exclude(**{amount_column: 0})
+                    .annotate(bucket=truncator('created_at'))
+                    .values('bucket', party=F(f'transaction__{party_column}'))
+                    .order_by()
+                    .annotate(total=Sum(amount_column), histories=Count('id'))
+                )
+                batch = []
+                for row in rows.iterator(chunk_size=batch_size):
+                    batch.append(EarningsRollup(
+                        party_id=row['party'],
+                        role=role,
+                        period=period,
+                        period_start=timezone.localdate(row['bucket']),
+                        amount=row['total'],
+                        count=row['histories'],
+                    ))
+                    if len(batch) >= batch_size:
+                        EarningsRollup.objects.bulk_create(batch)
+                        written += len(batch)
+                        batch = []
+                if batch:
+                    EarningsRollup.objects.bulk_create(batch)
+                    written += len(batch)
+    return written
@@ -1,8 +1,82 @@
+from django.utils import timezone
 from transactions.models import *
 from transactions.serializers import *
-from rest_framework import generics, permissions
+from transactions.utils import period_start
+from transactions.payments import record_payment_event, verify_flutterwave_signature
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework.exceptions import PermissionDenied
+from rest_framework import generics, permissions, status
 
 class TransactionListView(generics.ListAPIView):
     queryset = Transaction.objects.all().order_by('-created_at')
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
+
+class EarningsView(APIView):
+    """
+    API view to retrieve daily, weekly or monthly earnings from the rollup tables.
+    - Query params: role (rider, boss, commissioner), period (day, week, month), limit (default 12).
+    - Users see their own earnings; superusers or users with 'view_transaction' may pass user_id.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    MAX_LIMIT = 366
+
+    def get(self, request, *args, **kwargs):
+        role = request.query_params.get('role', 'rider')
+        period = request.query_params.get('period', 'day')
+        if role not in dict(EarningsRollup.ROLE_CHOICES):
+            return Response({'message': f"Invalid role '{role}'."}, status=status.HTTP_400_BAD_REQUEST)
+        if period not in dict(EarningsRollup.PERIOD_CHOICES):
+            return Response({'message': f"Invalid period '{period}'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            limit = min(max(int(request.query_params.get('limit', 12)), 1), self.MAX_LIMIT)
+        except ValueError:
+            return Response({'message': "'limit' must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            party_id = int(request.query_params.get('user_id') or request.user.id)
+        except ValueError:
+            return Response({'message': "'user_id' must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        if party_id != request.user.id:
+            if not request.user.is_superuser and not request.user.has_perm('transactions.view_transaction'):
+                raise PermissionDenied({'message': "You do not have permission to view other users' earnings."})
+
+        # Served from the (party, role, period, period_start) unique index.
+        buckets = list(
+            EarningsRollup.objects.filter(party_id=party_id, role=role, period=period)
+            .order_by('-period_start')[:limit]
+        )
+        current_start = period_start(timezone.localdate(), period)
+        current = next((bucket for bucket in buckets if bucket.period_start == current_start), None)
+
+        return Response({
+            'role': role,
+            'period': period,
+            'current': {
+                'period_start': current_start,
+                'amount': str(current.amount) if current else '0.00',
+                'count': current.count if current else 0,
+            },
+            'results': EarningsRollupSerializer(buckets, many=True).data
+        }, status=status.HTTP_200_OK)
+
+class FlutterwaveWebhookView(APIView):
+    """
+    API view to receive Flutterwave payment webhooks.
+    - Verifies the 'verif-hash' header, stores the raw event in the PaymentEvent inbox and returns immediately.
+    - Duplicate deliveries are ignored; payment statuses are applied by the process_payment_events worker.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        if not verify_flutterwave_signature(request):
+            return Response({'message': 'Invalid signature.'}, status=status.HTTP_401_UNAUTHORIZED)
+
+        if not isinstance(request.data, dict) or not isinstance(request.data.get('data'), dict):
+            return Response({'message': 'Malformed payload.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        record_payment_event(request.data)
+        return Response({'message': 'Event received.'}, status=status.HTTP_200_OK)
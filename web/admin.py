@@ -68,3 +68,17 @@ class BookRiderAssignmentAdmin(admin.ModelAdmin):
     )
     list_filter = ('status', 'assigned_at', 'in_progress_at', 'completed_at', 'cancelled_at')
     ordering = ('-assigned_at',)
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'channel', 'recipient', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    search_fields = ('recipient', 'subject', 'coalesce_key')
+    list_filter = ('channel', 'status', 'sensitive')
+    ordering = ('-id',)
+
+    def get_fields(self, request, obj=None):
+        # Never show the secret in a sensitive message, even while it is queued.
+        fields = super().get_fields(request, obj)
+        if obj is not None and obj.sensitive:
+            fields = [field for field in fields if field != 'body']
+        return fields
@@ -0,0 +1,100 @@
+import json
+import random
+import threading
+import socketserver
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from django.core.management.base import BaseCommand
+
+class Command(BaseCommand):
+    help = (
+        "Run local stand-ins for the SMS provider and SMTP server. Point the app at "
+        "them with SMS_BACKEND=http, SMS_HTTP_URL=http://127.0.0.1:<sms-port>/ and "
+        "EMAIL_HOST=127.0.0.1, EMAIL_PORT=<smtp-port>, EMAIL_USE_TLS=False."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sms-port', type=int, default=8098, help='Port for the HTTP SMS sink.')
+        parser.add_argument('--smtp-port', type=int, default=1025, help='Port for the SMTP sink.')
+        parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of deliveries to reject, to exercise retries.')
+
+    def handle(self, *args, **options):
+        fail_rate = options['fail_rate']
+        stdout = self.stdout
+        lock = threading.Lock()
+
+        class SMSHandler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                if random.random() < fail_rate:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                with lock:
+                    stdout.write(f"[sms] to={payload.get('to')} body={payload.get('body')!r}")
+                self.send_response(201)
+                self.send_header('Content-Type', 'application/json')
+                self.end_headers()
+                self.wfile.write(b'{"status": "queued"}')
+
+            def log_message(self, format, *args):
+                pass
+
+        class SMTPHandler(socketserver.StreamRequestHandler):
+            """Just enough SMTP for Django's smtp backend without TLS; any credentials are accepted."""
+
+            def reply(self, line):
+                self.wfile.write(f"{line}\r\n".encode())
+
+            def handle(self):
+                self.reply('220 fake-smtp ready')
+                recipients = []
+                while line := self.rfile.readline():
+                    command = line.decode(errors='replace').strip()
+                    verb = command[:4].upper()
+                    if verb == 'EHLO':
+                        self.reply('250-fake-smtp')
+                        self.reply('250 AUTH PLAIN')
+                    elif verb == 'HELO':
+                        self.reply('250 fake-smtp')
+                    elif verb == 'AUTH':
+                        self.reply('235 Authentication successful')
+                    elif verb == 'RCPT':
+                        recipients.append(command.split(':', 1)[-1].strip())
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        if random.random() < fail_rate:
+                            self.reply('451 Temporary failure')
+                            continue
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        lines = []
+                        while (data := self.rfile.readline()) not in (b'.\r\n', b'.\n', b''):
+                            lines.append(data)
+                        subject = next((l.decode(errors='replace').strip() for l in lines if l.lower().startswith(b'subject:')), '')
+                        with lock:
+                            stdout.write(f"[smtp] to={','.join(recipients)} {subject}")
+                        recipients = []
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('250 OK')
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        smtp = socketserver.ThreadingTCPServer(('127.0.0.1', options['smtp_port']), SMTPHandler)
+        smtp.daemon_threads = True
+        threading.Thread(target=smtp.serve_forever, daemon=True).start()
+
+        sms = ThreadingHTTPServer(('127.0.0.1', options['sms_port']), SMSHandler)
+        self.stdout.write(
+            f"SMS sink on http://127.0.0.1:{options['sms_port']}/, SMTP sink on 127.0.0.1:{options['smtp_port']} "
+            f"(fail rate {fail_rate:.0%}). Ctrl+C to stop."
+        )
+        try:
+            sms.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sms.server_close()
+            smtp.shutdown()
+            smtp.server_close()
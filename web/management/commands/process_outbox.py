@@ -0,0 +1,45 @@
+import time
+import logging
+from web.outbox import process_outbox
+from django.db import close_old_connections
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+MAX_ERROR_BACKOFF = 60
+
+class Command(BaseCommand):
+    help = "Deliver queued email and SMS outbox messages with retries and dead-lettering."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Number of messages leased per batch.')
+        parser.add_argument('--loop', action='store_true', help='Keep polling the outbox instead of exiting once nothing is due.')
+        parser.add_argument('--interval', type=float, default=1.0, help='Seconds to sleep between polls when nothing is due.')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        errors = 0
+        while True:
+            # Drop connections past CONN_MAX_AGE or broken by a database restart,
+            # as the request cycle would between requests.
+            close_old_connections()
+            try:
+                sent, failed = process_outbox(batch_size=options['batch_size'])
+            except Exception:
+                if not options['loop']:
+                    raise
+                errors += 1
+                delay = min(options['interval'] * 2 ** errors, MAX_ERROR_BACKOFF)
+                logger.exception(f"Outbox batch failed; retrying in {delay:.0f}s.")
+                time.sleep(delay)
+                continue
+            errors = 0
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Sent {total_sent} message(s); {total_failed} failed attempt(s)."))
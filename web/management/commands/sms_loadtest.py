@@ -0,0 +1,89 @@
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from django.core.management.base import BaseCommand
+from web.sms import HTTPTransport
+
+class Command(BaseCommand):
+    help = (
+        "Measure SMS send throughput through the pooled HTTP transport, against an "
+        "in-process fake provider (or --url), optionally compared with a new "
+        "connection per message."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500, help='Messages to send.')
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight.')
+        parser.add_argument('--latency-ms', type=int, default=50, help='Simulated provider latency per request.')
+        parser.add_argument('--url', help='Send to this endpoint instead of the in-process fake provider.')
+        parser.add_argument('--baseline', action='store_true', help='Also run with a new session per message.')
+
+    def handle(self, *args, **options):
+        server = None
+        url = options['url']
+        if not url:
+            server = self.start_fake_provider(options['latency_ms'])
+            url = f"http://127.0.0.1:{server.server_address[1]}/"
+
+        messages = [(f"+1555{i:07d}", f"Load test message {i}") for i in range(options['count'])]
+        try:
+            transport = HTTPTransport(url, concurrency=options['concurrency'])
+            try:
+                self.report('pooled', messages, transport.send_many)
+            finally:
+                transport.close()
+
+            if options['baseline']:
+                def unpooled(batch):
+                    def send(message):
+                        to, body = message
+                        try:
+                            with requests.Session() as session:
+                                session.post(url, json={'to': to, 'body': body}, timeout=10).raise_for_status()
+                        except Exception as e:
+                            return e
+                    with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+                        return list(pool.map(send, batch))
+                self.report('unpooled', messages, unpooled)
+        finally:
+            if server:
+                server.shutdown()
+                server.server_close()
+
+    def report(self, label, messages, send_many):
+        started = time.perf_counter()
+        results = send_many(messages)
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for result in results if result is not None)
+        self.stdout.write(
+            f"{label}: {len(messages)} message(s) in {elapsed:.2f}s, "
+            f"{len(messages) / elapsed:.1f} msg/s, {failed} failed"
+        )
+
+    def start_fake_provider(self, latency_ms):
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 so clients can keep connections alive between requests.
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are written separately; without this, Nagle plus
+            # delayed ACKs add ~40ms to every reused connection.
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                time.sleep(latency_ms / 1000)
+                body = b'{"status": "queued"}'
+                self.send_response(201)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
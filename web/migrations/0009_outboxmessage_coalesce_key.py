@@ -0,0 +1,27 @@
+# Generated by Django 5.0 on 2026-10-19 00:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0008_outboxmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='coalesce_key',
+            field=models.CharField(blank=True, help_text='Unsent messages with the same key and recipient are merged', max_length=100, null=True),
+        ),
+        migrations.AlterField(
+            model_name='outboxmessage',
+            name='channel',
+            field=models.CharField(choices=[('sms', 'SMS'), ('email', 'Email'), ('push', 'Push')], max_length=10),
+        ),
+        migrations.AddConstraint(
+            model_name='outboxmessage',
+            constraint=models.UniqueConstraint(condition=models.Q(('attempts', 0), ('coalesce_key__isnull', False), ('status', 'Pending')), fields=('channel', 'recipient', 'coalesce_key'), name='outbox_unsent_coalesce_key'),
+        ),
+    ]
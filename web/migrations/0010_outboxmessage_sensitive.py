@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 01:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0009_outboxmessage_coalesce_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxmessage',
+            name='sensitive',
+            field=models.BooleanField(default=False, help_text='Body holds a secret and is redacted after delivery'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.0 on 2026-10-19 01:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('web', '0011_create_cache_table'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OneTimePassword',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('purpose', models.CharField(max_length=50)),
+                ('digest', models.CharField(max_length=64)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('expires_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='one_time_passwords', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'One-Time Password',
+                'verbose_name_plural': 'One-Time Passwords',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='onetimepassword',
+            constraint=models.UniqueConstraint(fields=('user', 'purpose'), name='unique_otp_per_purpose'),
+        ),
+    ]
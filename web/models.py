@@ -86,4 +86,81 @@ class BookRider(models.Model):
         verbose_name_plural = 'Book Riders'
 
     def __str__(self):
-        return f"Book Rider by {self.client} - {self.status}"
\ No newline at end of file
+        return f"Book Rider by {self.client} - {self.status}"
+
+class OutboxMessage(models.Model):
+    """
+    Email, SMS or push notification waiting to be delivered by the
+    `process_outbox` worker. Rows are written in the same transaction as the
+    change that triggers them. Messages sharing a `coalesce_key` replace each
+    other until the worker first picks them up. The body of a `sensitive`
+    message (one carrying a secret such as an OTP) is blanked once it is sent
+    or dead-lettered.
+    """
+    REDACTED_BODY = '[redacted]'
+
+    CHANNEL_CHOICES = [
+        ('sms', 'SMS'),
+        ('email', 'Email'),
+        ('push', 'Push'),
+    ]
+
+    STATUS_CHOICES = [
+        ('Pending', 'Pending'),
+        ('Sent', 'Sent'),
+        ('Dead', 'Dead'),
+    ]
+
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255, null=True, blank=True)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text='Earliest time the worker may (re)try this message')
+    coalesce_key = models.CharField(max_length=100, null=True, blank=True, help_text='Unsent messages with the same key and recipient are merged')
+    last_error = models.TextField(null=True, blank=True)
+    sensitive = models.BooleanField(default=False, help_text='Body holds a secret and is redacted after delivery')
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Outbox Message'
+        verbose_name_plural = 'Outbox Messages'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['channel', 'recipient', 'coalesce_key'],
+                condition=models.Q(status='Pending', attempts=0, coalesce_key__isnull=False),
+                name='outbox_unsent_coalesce_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} - {self.status}"
+
+class OneTimePassword(models.Model):
+    """
+    Keyed digest of the current OTP for one user and purpose (see web/otp.py).
+    Attempts are counted on the locked row, so concurrent guesses cannot get
+    past OTP_MAX_ATTEMPTS.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='one_time_passwords')
+    purpose = models.CharField(max_length=50)
+    digest = models.CharField(max_length=64)
+    attempts = models.PositiveIntegerField(default=0)
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'One-Time Password'
+        verbose_name_plural = 'One-Time Passwords'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'purpose'], name='unique_otp_per_purpose'),
+        ]
+
+    def __str__(self):
+        return f"{self.purpose} OTP for user {self.user_id}"
@@ -0,0 +1,69 @@
+import hmac
+import hashlib
+import logging
+from datetime import timedelta
+from web.utils import generate_otp
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.core.exceptions import ImproperlyConfigured
+from web.models import OneTimePassword
+
+logger = logging.getLogger(__name__)
+
+def _digest(user_id, purpose, otp):
+    # Only a keyed digest is stored, so a database dump does not leak live
+    # codes. The key is dedicated: SECRET_KEY is not secret in this project.
+    key = getattr(settings, 'OTP_SECRET_KEY', None)
+    if not key:
+        raise ImproperlyConfigured('Set OTP_SECRET_KEY to issue or verify OTPs.')
+    message = f"{purpose}:{user_id}:{otp}".encode()
+    return hmac.new(key.encode(), message, hashlib.sha256).hexdigest()
+
+def issue_otp(user, purpose='password_reset'):
+    """
+    Generate an OTP for `user`, store its digest with OTP_TTL_SECONDS expiry
+    and reset the attempt counter. A new OTP replaces any earlier one.
+    Returns the plain OTP to be sent to the user.
+    """
+    otp = generate_otp()
+    ttl = getattr(settings, 'OTP_TTL_SECONDS', 600)
+    OneTimePassword.objects.update_or_create(
+        user=user,
+        purpose=purpose,
+        defaults={
+            'digest': _digest(user.pk, purpose, otp),
+            'attempts': 0,
+            'expires_at': timezone.now() + timedelta(seconds=ttl),
+            'created_at': timezone.now(),
+        },
+    )
+    return otp
+
+def verify_otp(user, otp, purpose='password_reset'):
+    """
+    Check `otp` for `user` in constant time. Every check counts as an attempt
+    under a row lock; after OTP_MAX_ATTEMPTS the OTP is discarded. A matching
+    OTP is consumed.
+    """
+    expected = _digest(user.pk, purpose, otp)
+    with transaction.atomic():
+        stored = OneTimePassword.objects.select_for_update().filter(user=user, purpose=purpose).first()
+        if stored is None:
+            return False
+        if stored.expires_at <= timezone.now():
+            stored.delete()
+            return False
+
+        stored.attempts += 1
+        if stored.attempts > getattr(settings, 'OTP_MAX_ATTEMPTS', 5):
+            logger.warning(f"OTP attempts exhausted for user ID: {user.pk}")
+            stored.delete()
+            return False
+
+        if not hmac.compare_digest(stored.digest, expected):
+            stored.save(update_fields=['attempts'])
+            return False
+
+        stored.delete()
+        return True
@@ -0,0 +1,144 @@
+import random
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from django.db import IntegrityError, transaction
+from web.models import OutboxMessage
+from web.utils import deliver_email
+from web.sms import get_sms_transport
+from web.push import get_push_transport
+from django.core.mail import get_connection
+
+logger = logging.getLogger(__name__)
+
+def enqueue_sms(phone_number, message, sensitive=False):
+    """
+    Queue an SMS. Call inside the transaction that makes the change it announces.
+    Pass sensitive=True for secrets such as OTPs so the body is not kept once delivered.
+    """
+    return OutboxMessage.objects.create(channel='sms', recipient=phone_number, body=message, sensitive=sensitive)
+
+def enqueue_email(subject, message, recipient_list, sensitive=False):
+    """Queue one email per recipient. Call inside the triggering transaction."""
+    return OutboxMessage.objects.bulk_create([
+        OutboxMessage(channel='email', recipient=recipient, subject=subject, body=message, sensitive=sensitive)
+        for recipient in recipient_list
+    ])
+
+def enqueue_coalesced(channel, recipient, body, coalesce_key, subject=None, hold_seconds=None):
+    """
+    Queue a message that supersedes any unsent one with the same channel,
+    recipient and `coalesce_key`, so a burst of updates reaches the recipient
+    as its latest state. New messages are held for NOTIFICATION_COALESCE_SECONDS
+    to gather the burst; replacing one does not extend the hold.
+    """
+    if hold_seconds is None:
+        hold_seconds = getattr(settings, 'NOTIFICATION_COALESCE_SECONDS', 10)
+    unsent = OutboxMessage.objects.filter(
+        channel=channel, recipient=recipient, coalesce_key=coalesce_key, status='Pending', attempts=0,
+    )
+    for _ in range(2):
+        if unsent.update(subject=subject, body=body):
+            return
+        try:
+            with transaction.atomic():
+                OutboxMessage.objects.create(
+                    channel=channel, recipient=recipient, subject=subject, body=body, coalesce_key=coalesce_key,
+                    next_attempt_at=timezone.now() + timedelta(seconds=hold_seconds),
+                )
+            return
+        except IntegrityError:
+            # Another worker queued the same key first; replace its message instead.
+            continue
+
+def backoff_delay(attempts):
+    """Exponential backoff with jitter: base * 2^(attempts-1), capped, +/-20%."""
+    base = getattr(settings, 'OUTBOX_BACKOFF_BASE', 30)
+    cap = getattr(settings, 'OUTBOX_BACKOFF_MAX', 3600)
+    delay = min(base * 2 ** (attempts - 1), cap)
+    return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+def deliver_batch(messages):
+    """
+    Send a batch and return one entry per message: None on success, else the
+    exception. SMS and push go out concurrently through the shared transports;
+    emails reuse one SMTP connection for the whole batch.
+    """
+    results = {}
+    for channel, get_transport in (('sms', get_sms_transport), ('push', get_push_transport)):
+        batch = [message for message in messages if message.channel == channel]
+        if batch:
+            errors = get_transport().send_many([(message.recipient, message.body) for message in batch])
+            results.update(zip((message.id for message in batch), errors))
+
+    emails = [message for message in messages if message.channel == 'email']
+    if emails:
+        try:
+            with get_connection() as connection:
+                for message in emails:
+                    try:
+                        deliver_email(message.subject or '', message.body, [message.recipient], connection=connection)
+                        results[message.id] = None
+                    except Exception as e:
+                        results[message.id] = e
+        except Exception as e:
+            # Connecting or closing failed; anything not yet sent is retried.
+            for message in emails:
+                results.setdefault(message.id, e)
+    return [results[message.id] for message in messages]
+
+def claim_batch(batch_size):
+    """
+    Lease up to `batch_size` due messages. Rows are locked with SKIP LOCKED only
+    long enough to push next_attempt_at past the lease, so several workers can
+    drain the outbox without holding locks during network I/O.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=getattr(settings, 'OUTBOX_LEASE_SECONDS', 300))
+    with transaction.atomic():
+        messages = list(
+            OutboxMessage.objects.select_for_update(skip_locked=True)
+            .filter(status='Pending', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        for message in messages:
+            message.attempts += 1
+            message.next_attempt_at = now + lease
+        OutboxMessage.objects.bulk_update(messages, ['attempts', 'next_attempt_at'])
+    return messages
+
+def process_outbox(batch_size=100):
+    """
+    Deliver one batch of due messages. Failures are retried with exponential
+    backoff; after OUTBOX_MAX_ATTEMPTS a message is marked Dead. Sensitive
+    bodies are redacted once a message is Sent or Dead. Returns (sent, failed)
+    counts.
+    """
+    messages = claim_batch(batch_size)
+    if not messages:
+        return 0, 0
+
+    max_attempts = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 8)
+    sent = failed = 0
+    for message, error in zip(messages, deliver_batch(messages)):
+        if error is not None:
+            failed += 1
+            message.last_error = str(error)[:2000]
+            if message.attempts >= max_attempts:
+                message.status = 'Dead'
+                logger.error(f"Outbox message {message.id} dead-lettered after {message.attempts} attempt(s): {error}")
+            else:
+                message.next_attempt_at = timezone.now() + backoff_delay(message.attempts)
+                logger.warning(f"Outbox message {message.id} failed (attempt {message.attempts}): {error}")
+        else:
+            sent += 1
+            message.status = 'Sent'
+            message.sent_at = timezone.now()
+            message.last_error = None
+        if message.sensitive and message.status != 'Pending':
+            message.body = OutboxMessage.REDACTED_BODY
+
+    OutboxMessage.objects.bulk_update(messages, ['status', 'sent_at', 'next_attempt_at', 'last_error', 'body'])
+    logger.info(f"Outbox batch: {sent} sent, {failed} failed.")
+    return sent, failed
@@ -0,0 +1,27 @@
+import threading
+from django.conf import settings
+from web.sms import HTTPTransport, SMSTransport
+
+def build_push_transport(backend=None, concurrency=None):
+    """
+    Create a push transport for PUSH_BACKEND: 'http' POSTs {'to', 'body'} to
+    PUSH_HTTP_URL (a push gateway that maps user IDs to devices), 'console'
+    only logs. Push transports share the SMS transport interface.
+    """
+    backend = backend or getattr(settings, 'PUSH_BACKEND', 'console')
+    concurrency = concurrency or getattr(settings, 'SMS_CONCURRENCY', 8)
+    if backend == 'http':
+        return HTTPTransport(settings.PUSH_HTTP_URL, concurrency)
+    return SMSTransport(concurrency)
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_push_transport():
+    """Per-process push transport, created on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = build_push_transport()
+    return _transport
@@ -1,5 +1,9 @@
 import re
 from web.models import *
+from web.otp import verify_otp
+from system.codes import create_with_rider_code
+from api.renditions import rendition_url
+from api.fields import ImageRenditionsField, RenditionURLField
 from system.models import *
 from django.db.models import Q
 from datetime import timedelta
@@ -31,12 +35,13 @@ class LoginSerializer(serializers.Serializer):
 
 class UserSerializer(serializers.ModelSerializer):
     role_name = serializers.CharField(source='role.name', read_only=True)
-    image = serializers.ImageField(required=False)
+    image = RenditionURLField(required=False, detail_rendition='medium')
+    image_renditions = ImageRenditionsField('image')
 
     class Meta:
         model = User
         fields = (
-            'id', 'name', 'email', 'phone_number', 'role', 'role_name', 'image', 'password'
+            'id', 'name', 'email', 'phone_number', 'role', 'role_name', 'image', 'image_renditions', 'password'
         )
         extra_kwargs = {
             'password': {'write_only': True}
@@ -102,13 +107,10 @@ class RiderCodeSearchSerializer(serializers.Serializer):
         if not rider:
             return {}
         
-        # Function to build absolute URL if image exists
+        # Function to build the absolute URL of the full-size rendition if the image exists
         def build_absolute_url(image_field):
-            if image_field and hasattr(image_field, 'url'):
-                if request:
-                    return request.build_absolute_uri(image_field.url)
-                else:
-                    return image_field.url  # Fallback to relative URL if request is None
+            if image_field:
+                return rendition_url(image_field, 'full', request=request)  # Relative URL if request is None
             return None
 
         # Manually construct the representation with all required fields
@@ -138,6 +140,8 @@ class UserDeliveryRequestSerializer(serializers.ModelSerializer):
     rider_code = serializers.SerializerMethodField()
     rider_nid = serializers.SerializerMethodField()
     rider_image = serializers.SerializerMethodField()
+    image = RenditionURLField(required=False, allow_null=True)
+    image_renditions = ImageRenditionsField('image')
 
     class Meta:
         model = DeliveryRequest
@@ -145,7 +149,7 @@ class UserDeliveryRequestSerializer(serializers.ModelSerializer):
             'id', 'client', 'client_name', 'client_phone', 'pickup_address', 'pickup_lat', 'pickup_lng',
             'delivery_address', 'delivery_lat', 'delivery_lng', 'package_name', 'package_description',
             'recipient_name', 'recipient_phone', 'estimated_distance_km', 'estimated_delivery_time', 
-            'value_of_product', 'delivery_price', 'image', 'status', 'payment_type', 'payment_status', 'tx_ref', 
+            'value_of_product', 'delivery_price', 'image', 'image_renditions', 'status', 'payment_type', 'payment_status', 'tx_ref', 
             'created_at', 'updated_at', 'rider_name', 'rider_phone_number', 'rider_address', 
             'rider_code', 'rider_nid', 'rider_image'
         ]
@@ -156,7 +160,6 @@ class UserDeliveryRequestSerializer(serializers.ModelSerializer):
         ]
         extra_kwargs = {
             'client': {'write_only': True},
-            'image': {'required': False, 'allow_null': True},
             'payment_status': {'required': False, 'allow_null': True},
             'tx_ref': {'write_only': True},
         }
@@ -173,7 +176,7 @@ class UserDeliveryRequestSerializer(serializers.ModelSerializer):
         if image:
             request = self.context.get('request')
             if request is not None:
-                return request.build_absolute_uri(image.url)
+                return rendition_url(image, 'thumbnail', request=request)
         return None
 
     def get_rider_name(self, obj):
@@ -218,7 +221,7 @@ class RiderDeliverySerializer(serializers.ModelSerializer):
     rider_address = serializers.ReadOnlyField(source='rider.address', help_text='The address of the rider')
     rider_code = serializers.ReadOnlyField(source='rider.code', help_text='The unique code of the rider')
     rider_nid = serializers.ReadOnlyField(source='rider.nid', help_text='The national ID of the rider')
-    rider_image = serializers.ImageField(source='rider.image', help_text='The image of the rider', read_only=True)
+    rider_image = RenditionURLField(source='rider.image', detail_rendition='medium', help_text='The image of the rider', read_only=True)
 
     # Delivery request details
     package_name = serializers.ReadOnlyField(source='delivery_request.package_name', help_text='Name of the package')
@@ -352,7 +355,7 @@ class UserBookRiderSerializer(serializers.ModelSerializer):
         if image:
             request = self.context.get('request')
             if request is not None:
-                return request.build_absolute_uri(image.url)
+                return rendition_url(image, 'thumbnail', request=request)
         return None
 
     def get_rider_name(self, obj):
@@ -391,43 +394,30 @@ class RiderSerializer(serializers.ModelSerializer):
     Includes auto-generated, read-only code based on name initials and a unique 8-digit number.
     Also includes delivery history with detailed information.
     """
-    image = serializers.ImageField(required=False)
-    permit_image = serializers.ImageField(required=False)
+    image = RenditionURLField(required=False)
+    permit_image = RenditionURLField(required=False)
+    image_renditions = ImageRenditionsField('image')
+    permit_image_renditions = ImageRenditionsField('permit_image')
     code = serializers.CharField(read_only=True)  # Code is read-only
     delivery_history = RiderDeliverySerializer(source='rider_delivery', many=True, read_only=True, help_text='The delivery history of the rider')
 
     class Meta:
         model = Rider
-        fields = ['id', 'name', 'phone_number', 'address', 'code', 'nid', 'image', 'permit_image', 'plate_number', 'insurance', 'delivery_history']
+        fields = [
+            'id', 'name', 'phone_number', 'address', 'code', 'nid', 'image', 'permit_image',
+            'image_renditions', 'permit_image_renditions', 'plate_number', 'insurance', 'delivery_history',
+        ]
         read_only_fields = ['code', 'delivery_history']
 
-    def generate_unique_code(self, name):
-        """
-        Generates a unique code based on name initials and a random 8-digit number.
-        Ensures uniqueness by checking against existing codes in the Rider model.
-        """
-        # Extract initials (first letters of each name)
-        initials = ''.join([part[0].upper() for part in name.split() if part])[:2]  # Only the first 2 initials
-
-        # Generate a unique code by appending an 8-digit random number
-        while True:
-            random_number = ''.join([str(random.randint(0, 9)) for _ in range(8)])
-            code = f"{initials}{random_number}"
-
-            # Check if the generated code is unique
-            if not Rider.objects.filter(code=code).exists():
-                return code
-
     def create(self, validated_data):
         """
         Overrides create method to generate and set a unique code for each Rider.
         """
-        # Extract name from validated data to generate the code
-        name = validated_data.get('name', '')
-        validated_data['code'] = self.generate_unique_code(name)
+        # Create the Rider with an allocated code, retrying on a code collision
+        def create(code):
+            return super(RiderSerializer, self).create({**validated_data, 'code': code})
 
-        # Create and return the Rider instance
-        return super().create(validated_data)
+        return create_with_rider_code(validated_data.get('name', ''), create)
 
     def update(self, instance, validated_data):
         # Handle image upload separately if provided
@@ -438,7 +428,7 @@ class RiderSerializer(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         
-        instance.save()
+        instance.save_dirty()
         return instance
 
     def to_representation(self, instance):
@@ -527,13 +517,8 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         email_or_phone = attrs.get('email_or_phone')
         otp = attrs.get('otp')
 
-        try:
-            user = User.objects.get(
-                Q(email=email_or_phone) | Q(phone_number=email_or_phone),
-                reset_otp=otp,
-                otp_created_at__gte=timezone.now() - timedelta(minutes=10)
-            )
-        except User.DoesNotExist:
+        user = User.objects.filter(Q(email=email_or_phone) | Q(phone_number=email_or_phone)).first()
+        if not user or not verify_otp(user, otp):
             raise serializers.ValidationError('Invalid OTP or OTP has expired.')
 
         self.context['user'] = user
@@ -543,13 +528,9 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         user = self.context['user']
         password = self.validated_data['password']
 
-        # Set the new password
+        # Set the new password; the OTP was consumed during validation
         user.set_password(password)
-
-        # Clear OTP fields
-        user.reset_otp = None
-        user.otp_created_at = None
-        user.save()
+        user.save(update_fields=['password'])
 
         return user
 
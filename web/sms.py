@@ -0,0 +1,107 @@
+import logging
+import threading
+import requests
+from twilio.rest import Client
+from django.conf import settings
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
+from twilio.http.http_client import TwilioHttpClient
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+class SMSTransport:
+    """
+    Long-lived SMS sender. send_many() fans a batch out over a bounded thread
+    pool that is reused for the life of the process. Subclasses deliver through
+    a provider in send(); this base only logs messages (SMS_BACKEND='console').
+    """
+
+    def __init__(self, concurrency=8):
+        self.concurrency = concurrency
+        self._pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='sms')
+
+    def send(self, to, body):
+        # Bodies may carry OTPs (sensitive outbox messages); never log them.
+        logger.info(f"SMS to {to}: [{len(body)} characters redacted]")
+
+    def _send_safely(self, message):
+        to, body = message
+        try:
+            self.send(to, body)
+            return None
+        except Exception as e:
+            return e
+
+    def send_many(self, messages):
+        """
+        Send (to, body) pairs with at most `concurrency` requests in flight.
+        Returns one entry per message: None on success, else the exception.
+        """
+        return list(self._pool.map(self._send_safely, messages))
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+def _pooled_adapter(concurrency):
+    # Only connection failures are retried here: a POST that reached the provider
+    # may have been accepted, and the outbox worker owns retries beyond that.
+    return HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=concurrency,
+        max_retries=Retry(connect=2, read=0, redirect=0, status=0, other=0, backoff_factor=0.2),
+    )
+
+class TwilioTransport(SMSTransport):
+    """Twilio REST client built once, with a keep-alive pool sized to `concurrency`."""
+
+    def __init__(self, concurrency=8, timeout=10):
+        super().__init__(concurrency)
+        http_client = TwilioHttpClient(pool_connections=True, timeout=timeout)
+        http_client.session.mount('https://', _pooled_adapter(concurrency))
+        self.client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN, http_client=http_client)
+        self.from_ = settings.TWILIO_PHONE_NUMBER
+
+    def send(self, to, body):
+        self.client.messages.create(body=body, from_=self.from_, to=to)
+
+class HTTPTransport(SMSTransport):
+    """POSTs {'to', 'body'} as JSON to `url` over a pooled keep-alive session."""
+
+    def __init__(self, url, concurrency=8, timeout=10):
+        super().__init__(concurrency)
+        self.url = url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.mount('http://', _pooled_adapter(concurrency))
+        self.session.mount('https://', _pooled_adapter(concurrency))
+
+    def send(self, to, body):
+        response = self.session.post(self.url, json={'to': to, 'body': body}, timeout=self.timeout)
+        response.raise_for_status()
+
+    def close(self):
+        super().close()
+        self.session.close()
+
+def build_sms_transport(backend=None, concurrency=None):
+    """Create a transport for SMS_BACKEND ('twilio', 'http' or 'console')."""
+    backend = backend or getattr(settings, 'SMS_BACKEND', 'twilio')
+    concurrency = concurrency or getattr(settings, 'SMS_CONCURRENCY', 8)
+    if backend == 'console':
+        return SMSTransport(concurrency)
+    if backend == 'http':
+        return HTTPTransport(settings.SMS_HTTP_URL, concurrency)
+    return TwilioTransport(concurrency)
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_sms_transport():
+    """Per-process transport shared by every caller, created on first use."""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = build_sms_transport()
+    return _transport
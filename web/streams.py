@@ -0,0 +1,134 @@
+import json
+import asyncio
+from django.conf import settings
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from rest_framework.exceptions import AuthenticationFailed
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from account.authentication import CachedTokenAuthentication
+from system.events import BookingStatusChanged, DeliveryStatusChanged, subscribe
+from system.models import DeliveryRequest, Rider
+from api.pubsub import get_broker
+from web.models import BookRider
+
+FINAL_STATUSES = ('Completed', 'Cancelled')
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+def _rider_payload(rider):
+    if rider is None:
+        return None
+    return {'id': rider.pk, 'name': rider.name, 'code': rider.code, 'phone_number': rider.phone_number}
+
+def _payload(kind, pk, status, rider, previous_status=None):
+    return {
+        'type': kind,
+        'id': pk,
+        'status': status,
+        'previous_status': previous_status,
+        'rider': _rider_payload(rider),
+    }
+
+@subscribe(DeliveryStatusChanged)
+def stream_delivery_status(event):
+    client_id = DeliveryRequest.objects.values_list('client_id', flat=True).get(pk=event.delivery_request_id)
+    rider = Rider.objects.filter(pk=event.rider_id).first() if event.rider_id else None
+    payload = _payload('delivery', event.delivery_request_id, event.status, rider, event.previous_status)
+    get_broker().publish(user_channel(client_id), payload)
+
+@subscribe(BookingStatusChanged)
+def stream_booking_status(event):
+    client_id = BookRider.objects.values_list('client_id', flat=True).get(pk=event.book_rider_id)
+    rider = Rider.objects.filter(pk=event.rider_id).first() if event.rider_id else None
+    payload = _payload('booking', event.book_rider_id, event.status, rider, event.previous_status)
+    get_broker().publish(user_channel(client_id), payload)
+
+def _active_snapshot(user):
+    """Current state of the user's open delivery requests and bookings."""
+    deliveries = (
+        DeliveryRequest.objects.filter(client=user, delete_status=False)
+        .exclude(status__in=FINAL_STATUSES)
+        .prefetch_related('rider_assignment__rider')
+    )
+    bookings = (
+        BookRider.objects.filter(client=user, delete_status=False)
+        .exclude(status__in=FINAL_STATUSES)
+        .prefetch_related('assignments__rider')
+    )
+    snapshot = []
+    for delivery_request in deliveries:
+        assignments = delivery_request.rider_assignment.all()
+        rider = assignments[0].rider if assignments else None
+        snapshot.append(_payload('delivery', delivery_request.pk, delivery_request.status, rider))
+    for book_rider in bookings:
+        assignments = book_rider.assignments.all()
+        rider = assignments[0].rider if assignments else None
+        snapshot.append(_payload('booking', book_rider.pk, book_rider.status, rider))
+    return snapshot
+
+def _authenticate(request):
+    """Token from ?token= (EventSource cannot set headers) or the Authorization header."""
+    key = request.GET.get('token')
+    if not key:
+        scheme, _, key = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() != 'token':
+            key = None
+    if not key:
+        raise AuthenticationFailed('Authentication credentials were not provided.')
+    user, _ = CachedTokenAuthentication().authenticate_credentials(key)
+    return user
+
+def _format(message):
+    return f"event: {message['type']}\ndata: {json.dumps(message)}\n\n"
+
+async def _event_stream(subscription, snapshot):
+    heartbeat = getattr(settings, 'EVENT_STREAM_HEARTBEAT_SECONDS', 15)
+    try:
+        yield f"retry: {getattr(settings, 'EVENT_STREAM_RETRY_MS', 3000)}\n\n"
+        for message in snapshot:
+            yield _format(message)
+        while True:
+            try:
+                message = await asyncio.wait_for(subscription.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # Keeps proxies from timing out idle connections and detects dead clients.
+                yield ": ping\n\n"
+                continue
+            yield _format(message)
+    finally:
+        subscription.close()
+
+@require_safe
+async def status_stream(request):
+    """
+    Server-Sent Events stream of status and rider-assignment changes for the
+    authenticated user's delivery requests and rider bookings. It opens with
+    the current state of every open request, then one event per change.
+
+    Served from the ASGI application (api/asgi.py), where each idle connection
+    is a suspended coroutine rather than a worker thread. Under WSGI a stream
+    would hold a whole worker, so it is refused with 501.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'Event streams are only served by the ASGI application.'}, status=501)
+
+    try:
+        user = await sync_to_async(_authenticate)(request)
+    except AuthenticationFailed as e:
+        return JsonResponse({'detail': str(e.detail)}, status=401)
+
+    # Subscribe before taking the snapshot so no change falls in between.
+    subscription = get_broker().subscribe(user_channel(user.pk))
+    try:
+        snapshot = await sync_to_async(_active_snapshot)(user)
+    except BaseException:
+        subscription.close()
+        raise
+
+    response = StreamingHttpResponse(_event_stream(subscription, snapshot), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Tell nginx not to buffer the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,12 +1,14 @@
 from django.urls import path
 from django.conf import settings
 from web.views import *
+from web.streams import status_stream
 from django.conf.urls.static import static
 
 app_name = 'web'
 
 urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
+    path('events/', status_stream, name='statusStream'),
     path('password-reset/', PasswordResetRequestView.as_view(), name='password_reset'),
     path('password-reset-confirm/', PasswordResetConfirmView.as_view(), name='password_reset_confirm'),
     path('register/', RegisterView.as_view(), name='register'),
@@ -14,6 +16,8 @@ urlpatterns = [
     path('profile-update/', UpdateUserView.as_view(), name='update'),
 
     path('riders/login/', RiderCodeSearchView.as_view(), name='rider-login'),
+    path('riders/session/', RiderSessionView.as_view(), name='rider-session'),
+    path('riders/history/', RiderDeliveryHistoryView.as_view(), name='rider-history'),
     path('riders/', RiderListView.as_view(), name='getRiders'),
     path('rider/<int:pk>/', RiderDetailView.as_view(), name='getRiderDetails'),
 
@@ -37,4 +41,4 @@ urlpatterns = [
 
     path('rider-delivery/<int:pk>/set-in-progress/', SetRiderDeliveryInProgressView.as_view(), name='setRiderDeliveryInProgress'),
     path('book-rider-assignment/<int:pk>/set-in-progress/', SetBookRiderAssignmentInProgressView.as_view(), name='setBookRiderAssignmentInProgress'),
-]  + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)+ static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+]  + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
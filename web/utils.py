@@ -1,20 +1,28 @@
 import random
+import secrets
 import logging
-from twilio.rest import Client
 from django.conf import settings
 from django.core.mail import send_mail
+from web.sms import get_sms_transport
 
 logger = logging.getLogger(__name__)
 
 def generate_otp(length=7):
     """Generate a numeric OTP of specified length."""
-    return ''.join([str(random.randint(0, 9)) for _ in range(length)])
+    return ''.join([str(secrets.randbelow(10)) for _ in range(length)])
+
+def deliver_email(subject, message, recipient_list, connection=None):
+    """Send email through EMAIL_BACKEND (or an open `connection`), raising on failure."""
+    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient_list, fail_silently=False, connection=connection)
+
+def deliver_sms(phone_number, message):
+    """Send an SMS through the per-process SMS transport (see web/sms.py), raising on failure."""
+    get_sms_transport().send(phone_number, message)
 
 def send_email(subject, message, recipient_list):
     """Send email using Django's send_mail function."""
-    from_email = settings.DEFAULT_FROM_EMAIL
     try:
-        send_mail(subject, message, from_email, recipient_list)
+        deliver_email(subject, message, recipient_list)
         return True
     except Exception as e:
         # Log the exception with detailed information
@@ -22,14 +30,9 @@ def send_email(subject, message, recipient_list):
         return False
 
 def send_sms(phone_number, message):
-    """Send SMS to the specified phone number using Twilio."""
-    client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
+    """Send SMS to the specified phone number using the configured SMS backend."""
     try:
-        client.messages.create(
-            body=message,
-            from_=settings.TWILIO_PHONE_NUMBER,
-            to=phone_number
-        )
+        deliver_sms(phone_number, message)
         return True
     except Exception as e:
         # Log the exception with detailed information
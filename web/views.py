@@ -1,5 +1,10 @@
 import logging
 from web.utils import *
+from web.otp import issue_otp
+from web.outbox import enqueue_email, enqueue_sms
+from system.events import BookingStatusChanged, DeliveryStatusChanged, publish
+from system.profiles import get_rider_profile, absolute_profile
+from rest_framework.pagination import PageNumberPagination
 from system.models import *
 from web.serializers import *
 from system.serializers import *
@@ -7,11 +12,13 @@ from django.db.models import Q
 from django.db import transaction
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from django.contrib.auth import authenticate
 from rest_framework.exceptions import NotFound
 from rest_framework.authtoken.models import Token
 from rest_framework.generics import GenericAPIView
 from rest_framework import generics, permissions, status
+from account.hashing import authenticate_user
+from account.authentication import rotate_token, revoke_token
+from api.throttling import ScopedIPThrottle, ScopedIdentifierThrottle
 from rest_framework.permissions import IsAuthenticated, AllowAny
 
 logger = logging.getLogger(__name__)
@@ -19,6 +26,8 @@ logger = logging.getLogger(__name__)
 class LoginView(generics.GenericAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = LoginSerializer
+    throttle_classes = [ScopedIPThrottle, ScopedIdentifierThrottle]
+    throttle_scope = 'login'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -30,25 +39,23 @@ class LoginView(generics.GenericAPIView):
         email_or_phone = serializer.validated_data['email_or_phone']
         password = serializer.validated_data['password']
 
-        # Determine if the identifier is an email or phone number
-        user = None
+        # Determine if the identifier is an email or phone number;
+        # hash verification runs on the bounded hashing pool
         if "@" in email_or_phone:
-            user = authenticate(username=email_or_phone, password=password)
+            user = authenticate_user(User.objects.filter(email=email_or_phone).first(), password)
             if not user:
                 logger.warning(f"Login failed for email: {email_or_phone}")
         else:
-            try:
-                user = User.objects.get(phone_number=email_or_phone)
-                if not user.check_password(password):
-                    user = None
-                    logger.warning(f"Login failed for phone number: {email_or_phone} due to incorrect password.")
-            except User.DoesNotExist:
+            user = User.objects.filter(phone_number=email_or_phone).first()
+            if not user:
                 logger.warning(f"Login failed: No user found with phone number: {email_or_phone}")
+            user = authenticate_user(user, password)
+            if not user:
+                logger.warning(f"Login failed for phone number: {email_or_phone}")
 
         if user:
-            # Delete old token and generate a new one
-            Token.objects.filter(user=user).delete()
-            token, created = Token.objects.get_or_create(user=user)
+            # Delete old token (and its cache entry) and generate a new one
+            token = rotate_token(user)
 
             logger.info(f"User {user.email or user.phone_number} logged in successfully.")
 
@@ -64,6 +71,8 @@ class LoginView(generics.GenericAPIView):
 class PasswordResetRequestView(generics.GenericAPIView):
     serializer_class = PasswordResetRequestSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedIPThrottle, ScopedIdentifierThrottle]
+    throttle_scope = 'password_reset'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -78,47 +87,24 @@ class PasswordResetRequestView(generics.GenericAPIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Generate a 7-digit OTP
-            otp = generate_otp()
-            user.reset_otp = otp
-            user.otp_created_at = timezone.now()
-            user.save()
+            # Generate a 7-digit OTP; it lives in the OTP store, not on the user row
+            otp = issue_otp(user)
 
-            # Send OTP via Email or SMS
+            # Queue the OTP via Email or SMS; the outbox worker delivers it
             if user.email and user.email == email_or_phone:
-                # Send Email
-                subject = 'Password Reset OTP'
-                message = f'Your password reset OTP is: {otp}'
-                recipient_list = [user.email]
-                email_sent = send_email(subject, message, recipient_list)
-                if email_sent:
-                    logger.info(f"Password reset OTP sent to email: {user.email}")
-                    return Response(
-                        {'message': 'OTP has been sent to your email.'},
-                        status=status.HTTP_200_OK
-                    )
-                else:
-                    logger.error(f"Failed to send OTP email to {user.email}")
-                    return Response(
-                        {'error': 'Failed to send OTP email. Please try again later.'},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                    )
+                enqueue_email('Password Reset OTP', f'Your password reset OTP is: {otp}', [user.email], sensitive=True)
+                logger.info(f"Password reset OTP queued for email: {user.email}")
+                return Response(
+                    {'message': 'OTP has been sent to your email.'},
+                    status=status.HTTP_200_OK
+                )
             elif user.phone_number and user.phone_number == email_or_phone:
-                # Send SMS
-                message = f'Your password reset OTP is: {otp}'
-                sms_sent = send_sms(user.phone_number, message)
-                if sms_sent:
-                    logger.info(f"Password reset OTP sent to phone number: {user.phone_number}")
-                    return Response(
-                        {'message': 'OTP has been sent to your phone number.'},
-                        status=status.HTTP_200_OK
-                    )
-                else:
-                    logger.error(f"Failed to send OTP SMS to {user.phone_number}")
-                    return Response(
-                        {'error': 'Failed to send OTP SMS. Please try again later.'},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                    )
+                enqueue_sms(user.phone_number, f'Your password reset OTP is: {otp}', sensitive=True)
+                logger.info(f"Password reset OTP queued for phone number: {user.phone_number}")
+                return Response(
+                    {'message': 'OTP has been sent to your phone number.'},
+                    status=status.HTTP_200_OK
+                )
             else:
                 logger.warning(f"Provided contact information does not match for user ID: {user.id}")
                 return Response(
@@ -132,6 +118,8 @@ class PasswordResetRequestView(generics.GenericAPIView):
 class PasswordResetConfirmView(generics.GenericAPIView):
     serializer_class = PasswordResetConfirmSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedIPThrottle, ScopedIdentifierThrottle]
+    throttle_scope = 'password_reset_confirm'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -185,8 +173,7 @@ class LogoutView(APIView):
 
     def post(self, request, *args, **kwargs):
         try:
-            if hasattr(request.user, 'auth_token'):
-                request.user.auth_token.delete()
+            revoke_token(request.user)
             return Response({
                 "message": "Logout successful."
             }, status=status.HTTP_200_OK)
@@ -230,6 +217,8 @@ class RiderCodeSearchView(APIView):
     API view to search for a rider using their unique code.
     """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedIPThrottle]
+    throttle_scope = 'rider_code_search'
 
     def post(self, request, format=None):
         serializer = RiderCodeSearchSerializer(data=request.data, context={'request': request})
@@ -237,6 +226,65 @@ class RiderCodeSearchView(APIView):
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+class RiderSessionView(APIView):
+    """
+    API view for rider login by code and password.
+    Returns a compact, cached rider profile and a token for the rider's user account;
+    delivery history is served separately by RiderDeliveryHistoryView.
+    Accessible to anyone; the code alone only identifies the rider.
+    """
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = [ScopedIPThrottle, ScopedIdentifierThrottle]
+    throttle_scope = 'rider_session'
+    throttle_identifier_fields = ('code',)
+
+    def post(self, request, format=None):
+        code = str(request.data.get('code') or '').strip()
+        password = request.data.get('password')
+        errors = {}
+        if not code:
+            errors['code'] = ['This field is required.']
+        if not isinstance(password, str) or not password:
+            errors['password'] = ['This field is required.']
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        profile = get_rider_profile(code)
+        user = User.objects.filter(pk=profile['user_id']).first() if profile and profile['user_id'] else None
+        # Hash verification runs on the bounded hashing pool.
+        if authenticate_user(user, password) is None:
+            logger.warning("Rider login failed for a code.")
+            return Response({'error': 'Invalid code or password.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        token, _ = Token.objects.get_or_create(user=user)
+        return Response({
+            'message': 'Login successful.',
+            'token': token.key,
+            'rider': absolute_profile(profile, request),
+        }, status=status.HTTP_200_OK)
+
+class RiderHistoryPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class RiderDeliveryHistoryView(generics.ListAPIView):
+    """
+    API view to list the authenticated rider's delivery history, newest first, paginated.
+    Accessible to users linked to a rider profile.
+    """
+    serializer_class = RiderDeliverySerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = RiderHistoryPagination
+
+    def get_queryset(self):
+        rider_id = Rider.objects.filter(user=self.request.user).values_list('id', flat=True).first()
+        if rider_id is None:
+            raise NotFound({'message': 'No rider profile is linked to this account.'})
+        return RiderDelivery.objects.filter(rider_id=rider_id).select_related(
+            'rider__user', 'rider__commissioner', 'rider__boss', 'delivery_request__client'
+        ).order_by('-id')
+
 class RiderListView(generics.ListAPIView):
     """
     API view to list all Riders.
@@ -257,14 +305,18 @@ class RiderDetailView(generics.RetrieveAPIView):
 
 class ContactUsView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [ScopedIPThrottle, ScopedIdentifierThrottle]
+    throttle_scope = 'contact'
 
     def post(self, request):
         serializer = ContactSerializer(data=request.data)
         if serializer.is_valid():
-            contact = serializer.save()
-            # Prepare email
-            subject = f"New Contact Us Submission: {contact.subject}"
-            message = f"""
+            # The notification is queued in the same transaction as the submission
+            with transaction.atomic():
+                contact = serializer.save()
+                # Prepare email
+                subject = f"New Contact Us Submission: {contact.subject}"
+                message = f"""
             You have received a new contact us message.
 
             Name: {contact.name}
@@ -275,20 +327,8 @@ class ContactUsView(APIView):
 
             Submitted at: {contact.submitted_at}
             """
-            from_email = settings.DEFAULT_FROM_EMAIL
-            recipient_list = [settings.CONTACT_EMAIL]
-
-            try:
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=from_email,
-                    recipient_list=recipient_list,
-                    fail_silently=False,
-                )
-                return Response({"detail": "Your message has been sent successfully."}, status=status.HTTP_201_CREATED)
-            except Exception as e:
-                return Response({"detail": f"Failed to send email: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                enqueue_email(subject, message, [settings.CONTACT_EMAIL])
+            return Response({"detail": "Your message has been sent successfully."}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class UserDeliveryRequestListView(generics.ListAPIView):
@@ -423,7 +463,9 @@ class UserCancelDeliveryRequestView(generics.UpdateAPIView):
             )
 
         delivery_request.status = 'Cancelled'
-        delivery_request.save()
+        with transaction.atomic():
+            delivery_request.save()
+            publish(DeliveryStatusChanged(delivery_request_id=delivery_request.pk, status='Cancelled', previous_status='Pending'))
 
         serializer = self.get_serializer(delivery_request)
         return Response({
@@ -453,8 +495,13 @@ class UserCompleteDeliveryRequestView(generics.UpdateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        previous_status = delivery_request.status
         delivery_request.status = 'Completed'
-        delivery_request.save()
+        with transaction.atomic():
+            delivery_request.save()
+            publish(DeliveryStatusChanged(
+                delivery_request_id=delivery_request.pk, status='Completed', previous_status=previous_status,
+            ))
 
         serializer = self.get_serializer(delivery_request)
         return Response({
@@ -594,7 +641,9 @@ class UserCancelBookRiderView(generics.UpdateAPIView):
             )
 
         book_rider.status = 'Cancelled'
-        book_rider.save()
+        with transaction.atomic():
+            book_rider.save()
+            publish(BookingStatusChanged(book_rider_id=book_rider.pk, status='Cancelled', previous_status='Pending'))
 
         serializer = self.get_serializer(book_rider)
         return Response({
@@ -623,8 +672,11 @@ class UserCompleteBookRiderView(generics.UpdateAPIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
+        previous_status = book_rider.status
         book_rider.status = 'Completed'
-        book_rider.save()
+        with transaction.atomic():
+            book_rider.save()
+            publish(BookingStatusChanged(book_rider_id=book_rider.pk, status='Completed', previous_status=previous_status))
 
         serializer = self.get_serializer(book_rider)
         return Response({
@@ -681,8 +733,14 @@ class SetRiderDeliveryInProgressView(APIView):
         rider_delivery.save()
 
         # Update the related DeliveryRequest status to 'In Progress'
+        previous_status = delivery_request.status
         delivery_request.status = 'In Progress'
-        delivery_request.save()
+        with transaction.atomic():
+            delivery_request.save()
+            publish(DeliveryStatusChanged(
+                delivery_request_id=delivery_request.pk, status='In Progress',
+                previous_status=previous_status, rider_id=rider_delivery.rider_id,
+            ))
 
         # Serialize the updated RiderDelivery instance
         serializer = RiderDeliverySerializer(rider_delivery, context={'request': request})
@@ -742,8 +800,14 @@ class SetBookRiderAssignmentInProgressView(APIView):
         assignment.save()
 
         # Update the related BookRider status to 'In Progress'
+        previous_status = book_rider.status
         book_rider.status = 'In Progress'
-        book_rider.save()
+        with transaction.atomic():
+            book_rider.save()
+            publish(BookingStatusChanged(
+                book_rider_id=book_rider.pk, status='In Progress',
+                previous_status=previous_status, rider_id=assignment.rider_id,
+            ))
 
         # Serialize the updated BookRiderAssignment instance
         serializer = BookRiderAssignmentSerializer(assignment, context={'request': request})